@@ -0,0 +1,23 @@
+"""Add provider_id to emails
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('emails', sa.Column('provider_id', sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('emails', 'provider_id')
@@ -0,0 +1,41 @@
+"""Add sender_category_stats table
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Create sender_category_stats table (historique de classification par expéditeur)
+    op.create_table(
+        'sender_category_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sender', sa.String(length=255), nullable=False),
+        sa.Column('category', postgresql.ENUM('INVOICE', 'RECEIPT', 'DOCUMENT', 'PROFESSIONAL', 'NEWSLETTER',
+                                              'PROMOTION', 'SOCIAL', 'NOTIFICATION', 'PERSONAL', 'SPAM', 'UNKNOWN',
+                                              name='emailcategory', create_type=False), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('confidence_sum', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_seen', sa.DateTime(), nullable=True, server_default=sa.func.now()),
+        sa.Column('created_at', sa.DateTime(), nullable=True, server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), nullable=True, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('sender', 'category', name='uq_sender_category_stats_sender_category')
+    )
+    op.create_index(op.f('ix_sender_category_stats_sender'), 'sender_category_stats', ['sender'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_sender_category_stats_sender'), table_name='sender_category_stats')
+    op.drop_table('sender_category_stats')
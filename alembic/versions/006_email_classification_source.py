@@ -0,0 +1,23 @@
+"""Add classification_source to emails
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('emails', sa.Column('classification_source', sa.String(length=20), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('emails', 'classification_source')
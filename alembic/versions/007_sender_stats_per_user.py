@@ -0,0 +1,41 @@
+"""Scope sender_category_stats by user
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Les compteurs globaux ne peuvent pas être attribués à un utilisateur :
+    # ils sont vidés et se reconstituent au fil de la classification
+    op.execute("DELETE FROM sender_category_stats")
+    op.drop_constraint('uq_sender_category_stats_sender_category', 'sender_category_stats', type_='unique')
+    op.add_column('sender_category_stats', sa.Column('user_id', sa.Integer(), nullable=False))
+    op.create_foreign_key(
+        'fk_sender_category_stats_user_id', 'sender_category_stats', 'users', ['user_id'], ['id']
+    )
+    op.create_index(op.f('ix_sender_category_stats_user_id'), 'sender_category_stats', ['user_id'], unique=False)
+    op.create_unique_constraint(
+        'uq_sender_category_stats_user_sender_category', 'sender_category_stats', ['user_id', 'sender', 'category']
+    )
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM sender_category_stats")
+    op.drop_constraint('uq_sender_category_stats_user_sender_category', 'sender_category_stats', type_='unique')
+    op.drop_index(op.f('ix_sender_category_stats_user_id'), table_name='sender_category_stats')
+    op.drop_constraint('fk_sender_category_stats_user_id', 'sender_category_stats', type_='foreignkey')
+    op.drop_column('sender_category_stats', 'user_id')
+    op.create_unique_constraint(
+        'uq_sender_category_stats_sender_category', 'sender_category_stats', ['sender', 'category']
+    )
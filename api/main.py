@@ -11,6 +11,7 @@
 from api.routers import accounts, emails, classification, stats, auth
 from api.database import engine, Base
 from shared.config import settings
+from worker.classifiers.ollama_classifier import classifier
 
 # Configuration du logging
 logging.basicConfig(
@@ -32,10 +33,14 @@ async def lifespan(app: FastAPI):
     logger.info("Database initialized")
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"Ollama host: {settings.OLLAMA_HOST}")
+
+    # Client HTTP Ollama partagé par les requêtes (keep-alive)
+    classifier.open_client()
     
     yield
     
     logger.info("Shutting down Email Agent API...")
+    await classifier.close_client()
 
 
 # Initialiser l'application FastAPI
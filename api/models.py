@@ -1,7 +1,7 @@
 """
 Database models pour Email Agent AI
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Enum, JSON, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
@@ -73,6 +73,33 @@ class EmailAccount(Base):
     # Relations
     user = relationship("User", back_populates="email_accounts")
     emails = relationship("Email", back_populates="account", cascade="all, delete-orphan")
+    sync_states = relationship("SyncState", back_populates="account", cascade="all, delete-orphan")
+
+
+class SyncState(Base):
+    """Curseur de synchronisation incrémentale par compte et par dossier"""
+    __tablename__ = "sync_states"
+    __table_args__ = (
+        UniqueConstraint("account_id", "folder", name="uq_sync_states_account_folder"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    account_id = Column(Integer, ForeignKey("email_accounts.id"), nullable=False)
+    folder = Column(String(255), nullable=False)
+
+    # Curseur opaque propre au connecteur
+    # Exemple IMAP: {"uid_validity": 1700000000, "last_uid": 4242}
+    state = Column(JSON, default=dict)
+
+    # Progression de l'import de l'historique (backfill)
+    # Exemple: {"cursor": {...}, "completed": false, "pages": 12, "imported": 1180}
+    backfill_state = Column(JSON, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relations
+    account = relationship("EmailAccount", back_populates="sync_states")
 
 
 class Email(Base):
@@ -84,6 +111,7 @@ class Email(Base):
     
     # Identifiants email
     message_id = Column(String(500), unique=True, index=True)
+    provider_id = Column(String(255), nullable=True)  # UID IMAP / ID Gmail / ID Graph (actions)
     thread_id = Column(String(255), nullable=True)
     
     # Contenu
@@ -96,6 +124,7 @@ class Email(Base):
     category = Column(Enum(EmailCategory), default=EmailCategory.UNKNOWN, index=True)
     classification_confidence = Column(Integer)  # 0-100
     classification_reason = Column(Text)
+    classification_source = Column(String(20), nullable=True)  # rule, llm, user, cache, embedding, sender_stats
     
     # Métadonnées
     has_attachments = Column(Boolean, default=False)
@@ -202,6 +231,27 @@ class ClassificationRule(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+class SenderCategoryStat(Base):
+    """Historique de classification par utilisateur et expéditeur (chemin rapide sans LLM)"""
+    __tablename__ = "sender_category_stats"
+    __table_args__ = (
+        UniqueConstraint("user_id", "sender", "category", name="uq_sender_category_stats_user_sender_category"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)  # Réputation propre à chaque utilisateur
+    sender = Column(String(255), nullable=False, index=True)  # Adresse normalisée (minuscules)
+    category = Column(Enum(EmailCategory), nullable=False)
+
+    # Classifications retenues (au-dessus du seuil de confiance)
+    count = Column(Integer, default=0, nullable=False)
+    confidence_sum = Column(Integer, default=0, nullable=False)
+
+    last_seen = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class ProcessingLog(Base):
     """Logs de traitement pour analyse et débogage"""
     __tablename__ = "processing_logs"
@@ -152,6 +152,36 @@ async def create_account(
     return new_account
 
 
+@router.post("/{account_id}/backfill")
+async def start_backfill(
+    account_id: int,
+    folder: str = "INBOX",
+    restart: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Lancer l'import de l'historique complet d'un compte.
+
+    L'import est fait page par page par le worker et reprend là où il
+    s'était arrêté (restart=true pour repartir du début).
+    """
+    query = select(EmailAccount).where(EmailAccount.id == account_id)
+    result = await db.execute(query)
+    account = result.scalar_one_or_none()
+
+    if not account:
+        raise HTTPException(status_code=404, detail="Account not found")
+
+    from worker.celery_app import celery_app
+    task = celery_app.send_task(
+        'worker.tasks.email_sync.backfill_account',
+        args=[account_id, folder],
+        kwargs={'restart': restart}
+    )
+
+    return {"message": "Backfill started", "task_id": task.id}
+
+
 @router.delete("/{account_id}")
 async def delete_account(
     account_id: int,
@@ -1,7 +1,7 @@
 """
 API Router pour la consultation des emails
 """
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
 from pydantic import BaseModel
@@ -30,6 +30,10 @@ class Config:
         from_attributes = True
 
 
+class EmailCategoryUpdate(BaseModel):
+    category: EmailCategory
+
+
 class EmailListResponse(BaseModel):
     total: int
     emails: List[EmailResponse]
@@ -105,7 +109,51 @@ async def get_email(
     email = result.scalar_one_or_none()
     
     if not email:
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Email not found")
     
     return email
+
+
+@router.patch("/{email_id}/category", response_model=EmailResponse)
+async def update_email_category(
+    email_id: int,
+    update: EmailCategoryUpdate,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Reclassifier un email manuellement
+
+    La correction est marquée comme venant de l'utilisateur : les workers la
+    reportent dans leur index de plus proches voisins au lot suivant.
+    L'historique de l'expéditeur chez le propriétaire du compte (chemin rapide sans LLM) est effacé et la
+    correction remplace le résultat en cache pour ce contenu.
+    """
+    from worker.classifiers.ollama_classifier import classifier
+    from worker.classifiers.sender_stats import USER_SOURCE, invalidate_sender
+
+    query = select(Email).where(Email.id == email_id)
+    result = await db.execute(query)
+    email = result.scalar_one_or_none()
+
+    if not email:
+        raise HTTPException(status_code=404, detail="Email not found")
+
+    email.category = update.category
+    email.classification_confidence = 100
+    email.classification_reason = "Reclassified by user"
+    email.classification_source = USER_SOURCE
+
+    await invalidate_sender(db, email.account_id, email.sender)
+    await classifier.remember_classification(
+        subject=email.subject,
+        sender=email.sender,
+        body_preview=email.body_preview or "",
+        has_attachments=email.has_attachments,
+        classification={
+            'category': email.category,
+            'confidence': email.classification_confidence,
+            'reason': email.classification_reason
+        }
+    )
+
+    return email
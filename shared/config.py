@@ -27,6 +27,41 @@ class Settings(BaseSettings):
     OLLAMA_HOST: str = "http://ollama:11434"
     OLLAMA_MODEL: str = "mistral"
     OLLAMA_TIMEOUT: int = 120  # seconds
+    OLLAMA_MAX_CONNECTIONS: int = 10  # connexions HTTP max par process
+    OLLAMA_MAX_KEEPALIVE_CONNECTIONS: int = 5  # connexions gardées ouvertes entre deux appels
+    OLLAMA_KEEPALIVE_EXPIRY: int = 60  # secondes avant fermeture d'une connexion inactive
+    OLLAMA_MAX_CONCURRENCY: int = 4  # requêtes de classification en vol max (cf. OLLAMA_NUM_PARALLEL)
+    OLLAMA_MIN_CONCURRENCY: int = 1  # fenêtre min quand Ollama ralentit
+    OLLAMA_TARGET_LATENCY: float = 20.0  # secondes ; au-delà, la fenêtre se réduit
+    OLLAMA_EXTRA_HOSTS: str = ""  # autres hôtes Ollama, séparés par des virgules
+    OPENAI_COMPAT_BASE_URL: str = ""  # serveur local compatible OpenAI, ex: http://llamacpp:8080/v1
+    OPENAI_COMPAT_MODEL: str = ""  # défaut : OLLAMA_MODEL
+    OPENAI_COMPAT_API_KEY: Optional[str] = None
+    LLM_HEDGE_AFTER: float = 15.0  # secondes min avant de doubler une requête lente (0 = jamais)
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = 3  # échecs consécutifs avant d'écarter un backend
+    LLM_CIRCUIT_RESET_TIMEOUT: float = 60.0  # secondes avant de retenter un backend écarté
+    CLASSIFY_COMMIT_BATCH_SIZE: int = 20  # résultats de classification par commit
+    CLASSIFY_PROCESSING_TIMEOUT: int = 3600  # secondes avant de remettre en attente un email bloqué en processing
+    OLLAMA_KEEP_ALIVE: str = "30m"  # durée de maintien du modèle en mémoire après un appel ("-1m" = toujours)
+    OLLAMA_STRUCTURED_OUTPUT: bool = True  # schéma JSON (format) imposé à la génération (Ollama >= 0.5)
+    OLLAMA_STREAM: bool = True  # lire la réponse en streaming et l'interrompre dès que le JSON est complet
+    OLLAMA_NUM_PREDICT: int = 256  # tokens générés max par email
+    OLLAMA_BATCH_SIZE: int = 1  # emails par prompt en classification groupée (1 = un prompt par email)
+    CLASSIFICATION_CACHE_ENABLED: bool = True  # cache Redis des résultats par contenu normalisé
+    CLASSIFICATION_CACHE_TTL: int = 604800  # secondes (7 jours)
+    CLASSIFICATION_CACHE_MAX_ENTRIES: int = 50000  # au-delà, éviction LRU
+    SENDER_FAST_PATH_ENABLED: bool = True  # classifier depuis l'historique de l'expéditeur, sans LLM
+    SENDER_FAST_PATH_MIN_COUNT: int = 5  # classifications concordantes min
+    SENDER_FAST_PATH_MIN_AGREEMENT: float = 0.9  # part min de la catégorie majoritaire
+    SENDER_STATS_MIN_CONFIDENCE: int = 80  # confiance min pour compter une classification
+    EMBEDDING_PRECLASSIFIER_ENABLED: bool = False  # k-NN sur embeddings avant le LLM (nécessite numpy)
+    OLLAMA_EMBEDDING_MODEL: str = "nomic-embed-text"
+    EMBEDDING_NEIGHBOURS: int = 5  # k voisins consultés
+    EMBEDDING_MIN_SIMILARITY: float = 0.85  # similarité cosinus min d'un voisin
+    EMBEDDING_MIN_AGREEMENT: float = 0.8  # part min des k voisins d'accord sur la catégorie
+    EMBEDDING_MIN_CONFIDENCE: int = 85  # confiance min pour entrer dans l'index
+    EMBEDDING_INDEX_MAX_SIZE: int = 5000  # emails gardés en mémoire par process
+    EMBEDDING_BOOTSTRAP_SIZE: int = 1000  # emails classifiés chargés au démarrage
     
     # API Options (fallback)
     USE_ANTHROPIC_FALLBACK: bool = False
@@ -35,6 +70,20 @@ class Settings(BaseSettings):
     
     # Email Processing
     EMAIL_POLL_INTERVAL: int = 5  # minutes
+    SYNC_MAX_EMAILS_PER_POLL: int = 500  # emails max par synchro de compte
+    SYNC_FETCH_CHUNK_SIZE: int = 50  # emails fetchés et sauvegardés par lot
+
+    # Backfill (import de l'historique complet, throttlé séparément du polling)
+    BACKFILL_PAGE_SIZE: int = 100  # emails par page
+    BACKFILL_PAGE_DELAY: int = 30  # secondes entre deux pages d'un même compte
+    BACKFILL_RATE_LIMIT: str = "10/m"  # pages max par worker (rate_limit Celery)
+
+    # Pool de connecteurs (par process worker)
+    CONNECTOR_POOL_MAX_PER_ACCOUNT: int = 2  # connexions ouvertes max par compte
+    CONNECTOR_POOL_IDLE_TIMEOUT: int = 300  # secondes avant fermeture d'une connexion inactive
+    CONNECTOR_POOL_HEALTH_CHECK_INTERVAL: int = 60  # secondes d'inactivité avant vérification
+    CONNECTOR_POOL_ACQUIRE_TIMEOUT: int = 30  # secondes d'attente max d'une connexion libre
+
     PROCESSING_MODE: str = "suggest"  # suggest ou auto
     QUARANTINE_DAYS: int = 7
     MAX_EMAIL_SIZE_MB: int = 25
@@ -6,6 +6,7 @@
 - ImapConnector: IMAP générique (Gmail via app password, Outlook, etc.)
 - GmailConnector: Gmail API avec OAuth2 (accès complet, recommandé)
 - MicrosoftConnector: Microsoft Graph API avec OAuth2 (Outlook/Office 365)
+- ConnectorPool: Pool de connecteurs connectés par compte (par process worker)
 
 Usage:
     from shared.integrations import ImapConnector, GmailConnector, MicrosoftConnector
@@ -23,5 +24,9 @@
 from .imap import ImapConnector
 from .gmail import GmailConnector
 from .microsoft import MicrosoftConnector
+from .pool import ConnectorPool, ConnectorPoolTimeout, get_connector_pool
 
-__all__ = ["BaseEmailConnector", "ImapConnector", "GmailConnector", "MicrosoftConnector"]
+__all__ = [
+    "BaseEmailConnector", "ImapConnector", "GmailConnector", "MicrosoftConnector",
+    "ConnectorPool", "ConnectorPoolTimeout", "get_connector_pool"
+]
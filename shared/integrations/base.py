@@ -2,7 +2,7 @@
 Base connector abstraction pour tous les email providers
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple, Iterator
 from datetime import datetime
 import logging
 
@@ -74,6 +74,105 @@ def fetch_emails(
         """
         pass
 
+    def iter_emails(
+        self,
+        folder: str = "INBOX",
+        limit: int = 50,
+        since: Optional[datetime] = None,
+        chunk_size: int = 50
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Variante générateur de fetch_emails, par lots de chunk_size emails.
+
+        Implémentation par défaut : un seul lot (fetch_emails). Les connecteurs
+        capables de fetcher par tranches surchargent cette méthode pour garder
+        une mémoire bornée quelle que soit la taille du backlog.
+
+        Yields:
+            Listes d'emails (même format que fetch_emails)
+        """
+        yield self.fetch_emails(folder=folder, limit=limit, since=since)
+
+    def fetch_incremental(
+        self,
+        folder: str = "INBOX",
+        limit: int = 50,
+        since: Optional[datetime] = None,
+        sync_state: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Récupérer les emails arrivés depuis le dernier curseur de synchronisation.
+
+        Version non streamée de iter_incremental (tous les lots concaténés).
+
+        Args:
+            folder: Dossier à scanner (INBOX par défaut)
+            limit: Nombre max d'emails à récupérer
+            since: Date de dernière synchro (utilisée sans curseur)
+            sync_state: État retourné par l'appel précédent (None = première synchro)
+
+        Returns:
+            Tuple (emails, nouvel état). L'état est un dict JSON-sérialisable,
+            opaque pour l'appelant, à persister et repasser au prochain appel.
+        """
+        results = []
+        new_state = dict(sync_state or {})
+        for chunk, state in self.iter_incremental(
+            folder=folder,
+            limit=limit,
+            since=since,
+            sync_state=sync_state,
+            chunk_size=limit
+        ):
+            results.extend(chunk)
+            if state is not None:
+                new_state = state
+        return results, new_state
+
+    def iter_incremental(
+        self,
+        folder: str = "INBOX",
+        limit: int = 50,
+        since: Optional[datetime] = None,
+        sync_state: Optional[Dict[str, Any]] = None,
+        chunk_size: int = 50
+    ) -> Iterator[Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+        """
+        Récupérer par lots les emails arrivés depuis le dernier curseur.
+
+        Chaque lot est accompagné de l'état à persister avec lui (None si le
+        curseur ne doit pas encore avancer).
+
+        Implémentation par défaut : un seul lot fetché par date (since), sans
+        curseur. Les connecteurs capables de suivre un curseur serveur (UID
+        IMAP, historyId Gmail, deltaLink Graph) surchargent cette méthode.
+
+        Yields:
+            Tuple (emails, état ou None)
+        """
+        emails = self.fetch_emails(folder=folder, limit=limit, since=since)
+        yield emails, dict(sync_state or {})
+
+    def fetch_backfill_page(
+        self,
+        folder: str = "INBOX",
+        cursor: Optional[Dict[str, Any]] = None,
+        page_size: int = 100
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Récupérer une page de l'historique, du plus récent au plus ancien.
+
+        Args:
+            folder: Dossier à parcourir
+            cursor: Curseur retourné par la page précédente (None = début)
+            page_size: Nombre d'emails par page
+
+        Returns:
+            Tuple (emails, curseur de la page suivante ou None si terminé).
+            Le curseur est un dict JSON-sérialisable à persister tel quel.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support backfill")
+
     @abstractmethod
     def move_email(self, message_id: str, destination_folder: str) -> bool:
         """
@@ -102,6 +201,56 @@ def delete_email(self, message_id: str, permanent: bool = False) -> bool:
         """
         pass
 
+    def check_health(self) -> bool:
+        """
+        Vérifier qu'une connexion ouverte est encore utilisable.
+
+        Utilisé par le pool de connecteurs avant de prêter un connecteur resté
+        inactif. Implémentation par défaut : toujours valide.
+
+        Returns:
+            True si la connexion peut être réutilisée
+        """
+        return True
+
+    def move_emails(self, message_ids: List[str], destination_folder: str) -> Dict[str, bool]:
+        """
+        Déplacer plusieurs emails vers un dossier.
+
+        Implémentation par défaut : un move_email par message. Les connecteurs
+        disposant d'une API groupée (UID MOVE, batchModify, $batch Graph)
+        surchargent cette méthode.
+
+        Args:
+            message_ids: IDs des messages
+            destination_folder: Nom du dossier de destination
+
+        Returns:
+            Dict {message_id: succès}
+        """
+        return {
+            message_id: self.move_email(message_id, destination_folder)
+            for message_id in message_ids
+        }
+
+    def delete_emails(self, message_ids: List[str], permanent: bool = False) -> Dict[str, bool]:
+        """
+        Supprimer plusieurs emails.
+
+        Implémentation par défaut : un delete_email par message.
+
+        Args:
+            message_ids: IDs des messages
+            permanent: Si True, suppression permanente. Sinon, déplace vers Trash.
+
+        Returns:
+            Dict {message_id: succès}
+        """
+        return {
+            message_id: self.delete_email(message_id, permanent=permanent)
+            for message_id in message_ids
+        }
+
     def test_connection(self) -> Dict[str, Any]:
         """
         Tester la connexion au service.
@@ -3,8 +3,10 @@
 """
 import base64
 import logging
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple, Iterator
 from email.utils import parsedate_to_datetime
 
 from google.auth.transport.requests import Request
@@ -38,6 +40,26 @@ class GmailConnector(BaseEmailConnector):
         'https://www.googleapis.com/auth/gmail.modify'
     ]
 
+    # Nombre max de sous-requêtes par batch HTTP Gmail
+    BATCH_SIZE = 100
+
+    # Nombre max d'IDs par appel batchModify / batchDelete
+    BATCH_MODIFY_SIZE = 1000
+
+    # Durée de vie (secondes) du cache nom de label -> ID
+    LABEL_CACHE_TTL = 3600
+
+    # Labels système : leur ID est leur nom, aucune résolution nécessaire
+    SYSTEM_LABELS = {
+        'INBOX', 'SENT', 'DRAFT', 'TRASH', 'SPAM', 'STARRED', 'IMPORTANT', 'UNREAD',
+        'CATEGORY_PERSONAL', 'CATEGORY_SOCIAL', 'CATEGORY_PROMOTIONS',
+        'CATEGORY_UPDATES', 'CATEGORY_FORUMS'
+    }
+
+    # Cache partagé entre instances : {email_address: (chargé_à, {nom: id})}
+    _label_cache: Dict[str, Tuple[float, Dict[str, str]]] = {}
+    _label_cache_lock = threading.Lock()
+
     def __init__(self, email_address: str, credentials: Dict[str, Any]):
         """
         Initialiser le connecteur Gmail.
@@ -144,6 +166,20 @@ def disconnect(self) -> None:
         self._creds = None
         self.logger.debug("Gmail connection closed")
 
+    def check_health(self) -> bool:
+        """
+        Vérifier que le service Gmail est utilisable.
+
+        Les credentials google-auth se rafraîchissent seuls à l'exécution des
+        requêtes ; il suffit qu'un refresh soit possible.
+
+        Returns:
+            True si le service est construit et les credentials valides ou rafraîchissables
+        """
+        if not self.service or not self._creds:
+            return False
+        return bool(self._creds.valid or self._creds.refresh_token)
+
     def fetch_emails(
         self,
         folder: str = "INBOX",
@@ -165,40 +201,16 @@ def fetch_emails(
             self.connect()
 
         try:
-            # Construire la query
-            query_parts = [f"label:{folder}"]
-            if since:
-                date_str = since.strftime('%Y/%m/%d')
-                query_parts.append(f"after:{date_str}")
-
-            query = ' '.join(query_parts)
-
-            self.logger.info(f"Fetching emails with query: {query}")
-
-            # List messages
-            results = self.service.users().messages().list(
-                userId='me',
-                q=query,
-                maxResults=limit
-            ).execute()
+            message_ids = self._list_message_ids(folder, limit, since)
 
-            messages = results.get('messages', [])
-
-            if not messages:
+            if not message_ids:
                 self.logger.info("No messages found")
                 return []
 
-            self.logger.info(f"Found {len(messages)} messages, fetching details...")
+            self.logger.info(f"Found {len(message_ids)} messages, fetching details...")
 
             # Fetch details en batch
-            emails = []
-            for msg in messages:
-                try:
-                    email_data = self._fetch_message_details(msg['id'])
-                    if email_data:
-                        emails.append(email_data)
-                except Exception as e:
-                    self.logger.error(f"Error parsing message {msg['id']}: {e}")
+            emails = self._fetch_messages_batch(message_ids)
 
             self.logger.info(f"Successfully parsed {len(emails)} emails")
             return emails
@@ -210,6 +222,262 @@ def fetch_emails(
             self.logger.error(f"Error fetching emails: {e}", exc_info=True)
             raise
 
+    def iter_incremental(
+        self,
+        folder: str = "INBOX",
+        limit: int = 50,
+        since: Optional[datetime] = None,
+        sync_state: Optional[Dict[str, Any]] = None,
+        chunk_size: int = 50
+    ) -> Iterator[Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+        """
+        Récupérer les nouveaux messages via la History API Gmail.
+
+        L'état est {"history_id": str}. Avec un historyId, un seul appel
+        users.history.list (paginé) donne les messages ajoutés au label ou
+        qui l'ont reçu depuis le dernier poll : un poll sans changement coûte
+        une requête. Sans historyId, ou s'il a expiré (404), on repart d'un
+        messages.list par date, en relevant le historyId du profil *avant*
+        de lister pour ne rien manquer.
+
+        Tous les messages de l'historique sont importés (limit ne s'applique
+        qu'au listing initial) ; seul le dernier lot porte le nouvel état.
+
+        Args:
+            folder: Label Gmail (ID, ex: INBOX)
+            limit: Nombre max d'emails lors d'un listing complet
+            since: Date utilisée uniquement lors d'un listing complet
+            sync_state: État retourné par l'appel précédent
+            chunk_size: Nombre de messages par lot
+
+        Yields:
+            Tuple (emails, état à persister avec le lot ou None)
+        """
+        if not self.service:
+            self.connect()
+
+        try:
+            state = dict(sync_state or {})
+            message_ids = None
+
+            if state.get('history_id'):
+                try:
+                    message_ids, new_history_id = self._list_history(folder, state['history_id'])
+                except HttpError as e:
+                    if e.resp.status != 404:
+                        raise
+                    self.logger.warning(
+                        f"History ID {state['history_id']} expired, falling back to full list"
+                    )
+
+            if message_ids is None:
+                profile = self.service.users().getProfile(userId='me').execute()
+                new_history_id = str(profile['historyId'])
+                message_ids = self._list_message_ids(folder, limit, since)
+
+            new_state = {'history_id': new_history_id}
+
+            if not message_ids:
+                self.logger.info("No new messages")
+                yield [], new_state
+                return
+
+            self.logger.info(f"Found {len(message_ids)} new messages, fetching details...")
+            for start in range(0, len(message_ids), max(1, chunk_size)):
+                chunk = message_ids[start:start + max(1, chunk_size)]
+                is_last = start + len(chunk) >= len(message_ids)
+                yield self._fetch_messages_batch(chunk), (new_state if is_last else None)
+
+        except HttpError as e:
+            self.logger.error(f"Gmail API error fetching emails: {e}", exc_info=True)
+            raise
+
+    def _list_history(self, label_id: str, start_history_id: str) -> Tuple[List[str], str]:
+        """
+        Lister les messages arrivés dans un label depuis un historyId.
+
+        Args:
+            label_id: ID du label (ex: INBOX)
+            start_history_id: Dernier historyId connu
+
+        Returns:
+            Tuple (IDs de messages dédupliqués dans l'ordre, nouveau historyId)
+
+        Raises:
+            HttpError: 404 si le historyId a expiré
+        """
+        message_ids = []
+        page_token = None
+        history_id = start_history_id
+
+        while True:
+            params = {
+                'userId': 'me',
+                'startHistoryId': start_history_id,
+                'labelId': label_id,
+                'historyTypes': ['messageAdded', 'labelAdded']
+            }
+            if page_token:
+                params['pageToken'] = page_token
+
+            response = self.service.users().history().list(**params).execute()
+
+            for record in response.get('history', []):
+                # Nouveaux messages (en filtrant SENT, DRAFT...)
+                for added in record.get('messagesAdded', []):
+                    message = added['message']
+                    if label_id in message.get('labelIds', []):
+                        message_ids.append(message['id'])
+                # Messages ayant reçu le label (ex: remis dans INBOX)
+                for added in record.get('labelsAdded', []):
+                    if label_id in added.get('labelIds', []):
+                        message_ids.append(added['message']['id'])
+
+            history_id = str(response.get('historyId', history_id))
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                break
+
+        return list(dict.fromkeys(message_ids)), history_id
+
+    def _list_message_ids(self, folder: str, limit: int, since: Optional[datetime]) -> List[str]:
+        """
+        Lister les IDs de messages d'un label par date (query Gmail).
+
+        Args:
+            folder: Label Gmail
+            limit: Nombre max de messages
+            since: Date à partir de laquelle lister
+
+        Returns:
+            Liste d'IDs de messages
+        """
+        query_parts = [f"label:{folder}"]
+        if since:
+            query_parts.append(f"after:{since.strftime('%Y/%m/%d')}")
+        query = ' '.join(query_parts)
+
+        self.logger.info(f"Listing messages with query: {query}")
+        results = self.service.users().messages().list(
+            userId='me',
+            q=query,
+            maxResults=limit
+        ).execute()
+
+        return [msg['id'] for msg in results.get('messages', [])]
+
+    def fetch_backfill_page(
+        self,
+        folder: str = "INBOX",
+        cursor: Optional[Dict[str, Any]] = None,
+        page_size: int = 100
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Récupérer une page de l'historique via messages.list et pageToken.
+
+        Gmail liste les messages du plus récent au plus ancien ; le curseur
+        est {"page_token": str}.
+
+        Args:
+            folder: Label Gmail
+            cursor: Curseur de la page précédente (None = début)
+            page_size: Nombre d'emails par page (max 500)
+
+        Returns:
+            Tuple (emails, curseur suivant ou None si l'historique est terminé)
+        """
+        if not self.service:
+            self.connect()
+
+        try:
+            params = {
+                'userId': 'me',
+                'q': f"label:{folder}",
+                'maxResults': min(page_size, 500)
+            }
+            if cursor and cursor.get('page_token'):
+                params['pageToken'] = cursor['page_token']
+
+            results = self.service.users().messages().list(**params).execute()
+            messages = results.get('messages', [])
+
+            self.logger.info(f"Backfill: fetching {len(messages)} messages from {folder}")
+
+            emails = self._fetch_messages_batch([msg['id'] for msg in messages])
+
+            next_token = results.get('nextPageToken')
+            return emails, ({'page_token': next_token} if next_token else None)
+
+        except HttpError as e:
+            self.logger.error(f"Gmail API error during backfill: {e}", exc_info=True)
+            raise
+
+    def _fetch_messages_batch(self, message_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Récupérer les détails de plusieurs messages via des batch HTTP Gmail.
+
+        Les messages().get sont groupés par BATCH_SIZE dans une seule requête
+        HTTP (N allers-retours -> ceil(N / BATCH_SIZE)). Les sous-requêtes en
+        échec (rate limit, erreur transitoire) sont rejouées une par une, puis
+        les résultats sont remis dans l'ordre des IDs.
+
+        Args:
+            message_ids: IDs des messages Gmail
+
+        Returns:
+            Liste de dicts avec les données parsées (dans l'ordre des IDs)
+        """
+        emails: Dict[str, Dict[str, Any]] = {}
+        failed = []
+
+        for start in range(0, len(message_ids), self.BATCH_SIZE):
+            chunk = message_ids[start:start + self.BATCH_SIZE]
+            responses = {}
+
+            def _on_response(request_id, response, exception):
+                if exception is not None:
+                    self.logger.debug(f"Batch get failed for message {request_id}: {exception}")
+                    failed.append(request_id)
+                else:
+                    responses[request_id] = response
+
+            batch = self.service.new_batch_http_request(callback=_on_response)
+            for message_id in chunk:
+                batch.add(
+                    self.service.users().messages().get(
+                        userId='me',
+                        id=message_id,
+                        format='full'
+                    ),
+                    request_id=message_id
+                )
+
+            try:
+                batch.execute()
+            except HttpError as e:
+                self.logger.warning(f"Batch request failed, retrying {len(chunk)} messages individually: {e}")
+                failed.extend(message_id for message_id in chunk if message_id not in responses)
+
+            for message_id in chunk:
+                if message_id in responses:
+                    try:
+                        emails[message_id] = self._parse_gmail_message(responses[message_id])
+                    except Exception as e:
+                        self.logger.error(f"Error parsing message {message_id}: {e}")
+
+        # Rejouer individuellement les sous-requêtes en échec
+        if failed:
+            self.logger.info(f"Retrying {len(failed)} failed batch requests individually")
+        for message_id in dict.fromkeys(failed):
+            try:
+                email_data = self._fetch_message_details(message_id)
+                if email_data:
+                    emails[message_id] = email_data
+            except Exception as e:
+                self.logger.error(f"Error parsing message {message_id}: {e}")
+
+        return [emails[message_id] for message_id in dict.fromkeys(message_ids) if message_id in emails]
+
     def _fetch_message_details(self, message_id: str) -> Optional[Dict[str, Any]]:
         """
         Récupérer les détails d'un message Gmail.
@@ -356,30 +624,246 @@ def move_email(self, message_id: str, destination_folder: str) -> bool:
         Returns:
             True si succès
         """
+        return self.move_emails([message_id], destination_folder)[message_id]
+
+    def move_emails(self, message_ids: List[str], destination_folder: str) -> Dict[str, bool]:
+        """
+        Déplacer des emails via batchModify.
+
+        Gmail utilise des labels, pas des folders : "déplacer" = retirer INBOX
+        et ajouter le label destination.
+
+        Args:
+            message_ids: Gmail message IDs
+            destination_folder: Label de destination
+
+        Returns:
+            Dict {message_id: succès}
+        """
+        results = self.modify_labels(
+            message_ids,
+            add_labels=[destination_folder],
+            remove_labels=['INBOX']
+        )
+        self.logger.info(
+            f"Moved {sum(results.values())}/{len(message_ids)} messages to {destination_folder}"
+        )
+        return results
+
+    def apply_label(self, message_id: str, label: str) -> bool:
+        """
+        Ajouter un label à un email (sans le retirer de INBOX).
+
+        Args:
+            message_id: Gmail message ID
+            label: Label à ajouter
+
+        Returns:
+            True si succès
+        """
+        return self.apply_labels([message_id], [label])[message_id]
+
+    def apply_labels(self, message_ids: List[str], labels: List[str]) -> Dict[str, bool]:
+        """
+        Ajouter des labels à des emails via batchModify.
+
+        Args:
+            message_ids: Gmail message IDs
+            labels: Labels à ajouter
+
+        Returns:
+            Dict {message_id: succès}
+        """
+        return self.modify_labels(message_ids, add_labels=labels)
+
+    def modify_labels(
+        self,
+        message_ids: List[str],
+        add_labels: Optional[List[str]] = None,
+        remove_labels: Optional[List[str]] = None
+    ) -> Dict[str, bool]:
+        """
+        Modifier les labels d'emails avec users.messages.batchModify.
+
+        Un appel par tranche de BATCH_MODIFY_SIZE messages (limite API : 1000).
+        batchModify ne renvoie pas de résultat par message : une tranche
+        réussit ou échoue en bloc. Les noms de labels sont résolus en IDs
+        (voir resolve_label_id) ; si Gmail rejette un ID mis en cache, le
+        cache est rechargé et l'appel rejoué une fois.
+
+        Args:
+            message_ids: Gmail message IDs
+            add_labels: Noms ou IDs des labels à ajouter (créés si absents)
+            remove_labels: Noms ou IDs des labels à retirer
+
+        Returns:
+            Dict {message_id: succès}
+        """
         if not self.service:
             self.connect()
 
         try:
-            # Gmail utilise des labels, pas des folders
-            # "Déplacer" = retirer INBOX et ajouter le label destination
+            body = self._label_body(add_labels, remove_labels)
+        except HttpError as e:
+            self.logger.error(f"Error resolving labels {add_labels} / {remove_labels}: {e}")
+            return {message_id: False for message_id in message_ids}
 
-            body = {
-                'addLabelIds': [destination_folder],
-                'removeLabelIds': ['INBOX']
-            }
+        results = {}
+        for start in range(0, len(message_ids), self.BATCH_MODIFY_SIZE):
+            chunk = list(message_ids[start:start + self.BATCH_MODIFY_SIZE])
+            try:
+                try:
+                    self._batch_modify(chunk, body)
+                except HttpError as e:
+                    # Label supprimé/renommé depuis la mise en cache : on recharge
+                    if e.resp.status not in (400, 404):
+                        raise
+                    self.logger.warning(f"Label rejected ({e.resp.status}), refreshing label cache")
+                    self.invalidate_label_cache()
+                    body = self._label_body(add_labels, remove_labels)
+                    self._batch_modify(chunk, body)
+                success = True
+            except HttpError as e:
+                self.logger.error(f"Error modifying labels of {len(chunk)} messages: {e}")
+                success = False
+            results.update({message_id: success for message_id in chunk})
+
+        return results
+
+    def _batch_modify(self, message_ids: List[str], body: Dict[str, List[str]]) -> None:
+        self.service.users().messages().batchModify(
+            userId='me',
+            body={'ids': message_ids, **body}
+        ).execute()
+
+    def _label_body(
+        self,
+        add_labels: Optional[List[str]],
+        remove_labels: Optional[List[str]]
+    ) -> Dict[str, List[str]]:
+        """
+        Construire le corps batchModify en résolvant les noms de labels en IDs.
 
-            self.service.users().messages().modify(
-                userId='me',
-                id=message_id,
-                body=body
-            ).execute()
+        Les labels à ajouter sont créés s'ils n'existent pas ; un label à
+        retirer inexistant est ignoré.
+        """
+        body = {}
+        if add_labels:
+            body['addLabelIds'] = [self.resolve_label_id(label) for label in add_labels]
+        if remove_labels:
+            remove_ids = [self.resolve_label_id(label, create=False) for label in remove_labels]
+            remove_ids = [label_id for label_id in remove_ids if label_id]
+            if remove_ids:
+                body['removeLabelIds'] = remove_ids
+        return body
 
-            self.logger.info(f"Moved message {message_id} to {destination_folder}")
-            return True
+    def resolve_label_id(self, name: str, create: bool = True) -> Optional[str]:
+        """
+        Convertir un nom de label (ex: "Finance/Invoices") en ID Gmail.
+
+        La table nom -> ID est chargée par un seul labels.list et mise en cache
+        par compte pendant LABEL_CACHE_TTL. Les labels imbriqués manquants
+        sont créés parent par parent ("Finance" puis "Finance/Invoices").
+
+        Args:
+            name: Nom du label, ou directement un ID (système ou Label_xxx)
+            create: Créer le label s'il n'existe pas
+
+        Returns:
+            ID du label, None s'il n'existe pas et create=False
+
+        Raises:
+            HttpError: Si labels.list ou labels.create échoue
+        """
+        if name in self.SYSTEM_LABELS:
+            return name
+
+        labels = self._get_label_map()
+        label_id = self._lookup_label(labels, name)
+        if label_id or not create:
+            return label_id
+
+        # Créer les parents manquants puis le label lui-même
+        parts = name.split('/')
+        for depth in range(1, len(parts) + 1):
+            path = '/'.join(parts[:depth])
+            if not self._lookup_label(labels, path):
+                label_id = self._create_label(path)
+        return label_id
+
+    def invalidate_label_cache(self) -> None:
+        """Oublier la table nom -> ID des labels de ce compte."""
+        with self._label_cache_lock:
+            self._label_cache.pop(self.email_address, None)
+
+    def _get_label_map(self) -> Dict[str, str]:
+        """
+        Récupérer la table nom -> ID des labels (cache par compte avec TTL).
+
+        Returns:
+            Dict {nom: id}
+        """
+        with self._label_cache_lock:
+            cached = self._label_cache.get(self.email_address)
+        if cached and time.monotonic() - cached[0] < self.LABEL_CACHE_TTL:
+            return cached[1]
+
+        response = self.service.users().labels().list(userId='me').execute()
+        labels = {label['name']: label['id'] for label in response.get('labels', [])}
+        self.logger.debug(f"Loaded {len(labels)} Gmail labels")
+
+        with self._label_cache_lock:
+            self._label_cache[self.email_address] = (time.monotonic(), labels)
+        return labels
+
+    @staticmethod
+    def _lookup_label(labels: Dict[str, str], name: str) -> Optional[str]:
+        if name in labels:
+            return labels[name]
+        if name in labels.values():
+            return name
+        # Les noms de labels Gmail sont uniques sans tenir compte de la casse
+        lowered = name.lower()
+        for label_name, label_id in labels.items():
+            if label_name.lower() == lowered:
+                return label_id
+        return None
+
+    def _create_label(self, name: str) -> str:
+        """
+        Créer un label et l'ajouter au cache.
+
+        Args:
+            name: Nom complet du label
 
+        Returns:
+            ID du label créé (ou existant en cas de conflit)
+        """
+        try:
+            label = self.service.users().labels().create(
+                userId='me',
+                body={
+                    'name': name,
+                    'labelListVisibility': 'labelShow',
+                    'messageListVisibility': 'show'
+                }
+            ).execute()
         except HttpError as e:
-            self.logger.error(f"Error moving message {message_id}: {e}")
-            return False
+            if e.resp.status != 409:
+                raise
+            # Créé entre-temps (autre worker) : recharger le cache
+            self.invalidate_label_cache()
+            label_id = self._lookup_label(self._get_label_map(), name)
+            if not label_id:
+                raise
+            return label_id
+
+        self.logger.info(f"Created Gmail label {name} ({label['id']})")
+        with self._label_cache_lock:
+            cached = self._label_cache.get(self.email_address)
+            if cached:
+                cached[1][name] = label['id']
+        return label['id']
 
     def delete_email(self, message_id: str, permanent: bool = False) -> bool:
         """
@@ -415,6 +899,43 @@ def delete_email(self, message_id: str, permanent: bool = False) -> bool:
             self.logger.error(f"Error deleting message {message_id}: {e}")
             return False
 
+    def delete_emails(self, message_ids: List[str], permanent: bool = False) -> Dict[str, bool]:
+        """
+        Supprimer des emails en masse.
+
+        Args:
+            message_ids: Gmail message IDs
+            permanent: Si True, batchDelete (définitif, requiert le scope
+                      https://mail.google.com/). Sinon, batchModify vers TRASH.
+
+        Returns:
+            Dict {message_id: succès}
+        """
+        if not permanent:
+            results = self.modify_labels(message_ids, add_labels=['TRASH'], remove_labels=['INBOX'])
+            self.logger.info(f"Moved {sum(results.values())}/{len(message_ids)} messages to trash")
+            return results
+
+        if not self.service:
+            self.connect()
+
+        results = {}
+        for start in range(0, len(message_ids), self.BATCH_MODIFY_SIZE):
+            chunk = list(message_ids[start:start + self.BATCH_MODIFY_SIZE])
+            try:
+                self.service.users().messages().batchDelete(
+                    userId='me',
+                    body={'ids': chunk}
+                ).execute()
+                success = True
+            except HttpError as e:
+                self.logger.error(f"Error deleting {len(chunk)} messages: {e}")
+                success = False
+            results.update({message_id: success for message_id in chunk})
+
+        self.logger.info(f"Permanently deleted {sum(results.values())}/{len(message_ids)} messages")
+        return results
+
     def get_refreshed_credentials(self) -> Optional[Dict[str, Any]]:
         """
         Récupérer les credentials actuels (pour mise à jour en DB si refresh).
@@ -12,10 +12,12 @@
 from imapclient.exceptions import LoginError, IMAPClientError
 from email import message_from_bytes
 from email.header import decode_header, make_header
-from email.utils import parsedate_to_datetime
+from email.utils import parsedate_to_datetime, collapse_rfc2231_value, decode_rfc2231
+import base64
+import quopri
 import logging
 from datetime import datetime
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple, Iterator
 
 from shared.integrations.base import BaseEmailConnector
 
@@ -33,10 +35,22 @@ class ImapConnector(BaseEmailConnector):
         "imap_port": int,      # Port (default: 993)
         "username": str,       # Username (often same as email)
         "password": str,       # Password or app password
-        "use_ssl": bool        # Use SSL/TLS (default: True)
+        "use_ssl": bool,       # Use SSL/TLS (default: True)
+        "fetch_mode": str,     # "headers" (default) ou "full"
+        "body_preview_bytes": int  # Octets de corps fetchés en mode "headers"
     }
     """
 
+    # Modes de fetch
+    FETCH_MODE_HEADERS = "headers"  # ENVELOPE/BODYSTRUCTURE puis corps partiel
+    FETCH_MODE_FULL = "full"        # Message brut complet (BODY.PEEK[])
+
+    # Octets de la partie texte fetchés en mode "headers"
+    # (le body est tronqué à 2000 caractères au parsing)
+    BODY_PREVIEW_BYTES = 4096
+
+    HEADER_FETCH_ITEMS = ['ENVELOPE', 'BODYSTRUCTURE', 'RFC822.SIZE', 'INTERNALDATE', 'FLAGS']
+
     def __init__(self, email_address: str, credentials: Dict[str, Any]):
         """
         Initialiser le connecteur IMAP.
@@ -53,6 +67,8 @@ def __init__(self, email_address: str, credentials: Dict[str, Any]):
         self.username = credentials.get('username', email_address)
         self.password = credentials.get('password', '')
         self.use_ssl = credentials.get('use_ssl', True)
+        self.fetch_mode = credentials.get('fetch_mode', self.FETCH_MODE_HEADERS)
+        self.body_preview_bytes = credentials.get('body_preview_bytes', self.BODY_PREVIEW_BYTES)
 
         self.client: Optional[IMAPClient] = None
 
@@ -95,6 +111,22 @@ def disconnect(self) -> None:
             finally:
                 self.client = None
 
+    def check_health(self) -> bool:
+        """
+        Vérifier la connexion IMAP avec un NOOP.
+
+        Returns:
+            True si le serveur répond
+        """
+        if not self.client:
+            return False
+        try:
+            self.client.noop()
+            return True
+        except Exception as e:
+            self.logger.debug(f"IMAP NOOP failed: {e}")
+            return False
+
     def fetch_emails(
         self,
         folder: str = "INBOX",
@@ -112,6 +144,36 @@ def fetch_emails(
         Returns:
             Liste de dicts avec les emails parsés
 
+        Raises:
+            ConnectionError: Si la connexion échoue
+        """
+        results = []
+        for chunk in self.iter_emails(folder=folder, limit=limit, since=since, chunk_size=limit):
+            results.extend(chunk)
+        return results
+
+    def iter_emails(
+        self,
+        folder: str = "INBOX",
+        limit: int = 50,
+        since: Optional[datetime] = None,
+        chunk_size: int = 50
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Récupérer les emails d'un dossier IMAP par lots de chunk_size UIDs.
+
+        Seul le SEARCH porte sur tout le dossier : chaque lot est fetché,
+        parsé et rendu avant de fetcher le suivant.
+
+        Args:
+            folder: Nom du dossier IMAP (INBOX, SENT, etc.)
+            limit: Nombre max d'emails à récupérer
+            since: Date à partir de laquelle récupérer
+            chunk_size: Nombre d'UIDs par FETCH
+
+        Yields:
+            Listes de dicts avec les emails parsés
+
         Raises:
             ConnectionError: Si la connexion échoue
         """
@@ -123,40 +185,118 @@ def fetch_emails(
             select_info = self.client.select_folder(folder)
             self.logger.debug(f"Selected folder {folder}: {select_info}")
 
-            # Construire les critères de recherche
-            criteria = ['NOT', 'DELETED']
-            if since:
-                date_str = since.date().strftime("%d-%b-%Y")
-                criteria.append('SINCE')
-                criteria.append(date_str)
-
             # Rechercher les messages
-            messages = self.client.search(criteria)
+            messages = self._search_uids(since)
 
             if not messages:
                 self.logger.info(f"No messages found in {folder}")
-                return []
+                return
 
             # Limiter et trier (plus récents en premier)
             messages = sorted(messages, reverse=True)[:limit]
 
             self.logger.info(f"Fetching {len(messages)} emails from {folder}")
+            for chunk in self._chunks(messages, chunk_size):
+                yield self._fetch_and_parse(chunk)
 
-            # Fetch message data
-            response = self.client.fetch(messages, ['BODY.PEEK[]', 'FLAGS', 'INTERNALDATE'])
+        except IMAPClientError as e:
+            self.logger.error(f"IMAP error fetching emails: {e}", exc_info=True)
+            raise ConnectionError(f"Failed to fetch emails: {e}")
+        except Exception as e:
+            self.logger.error(f"Unexpected error fetching emails: {e}", exc_info=True)
+            raise
 
-            # Parse each message
-            results = []
-            for msg_id, data in response.items():
-                try:
-                    email_data = self._parse_email(msg_id, data)
-                    if email_data:
-                        results.append(email_data)
-                except Exception as e:
-                    self.logger.error(f"Error parsing message {msg_id}: {e}")
+    def iter_incremental(
+        self,
+        folder: str = "INBOX",
+        limit: int = 50,
+        since: Optional[datetime] = None,
+        sync_state: Optional[Dict[str, Any]] = None,
+        chunk_size: int = 50
+    ) -> Iterator[Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+        """
+        Récupérer par lots les messages arrivés depuis le dernier UID vu.
 
-            self.logger.info(f"Successfully parsed {len(results)} emails")
-            return results
+        L'état est {"uid_validity": int, "last_uid": int}. Tant que
+        UIDVALIDITY ne change pas, seuls les UID > last_uid sont fetchés
+        (UID n+1:*), du plus ancien au plus récent, et chaque lot porte le
+        curseur à son plus grand UID. Rien n'est fetché si UIDNEXT montre
+        qu'aucun message n'est arrivé.
+
+        Si UIDVALIDITY change (ou première synchro), le curseur est
+        réinitialisé : on fetch les `limit` plus récents (filtrés par since)
+        et le curseur repart de UIDNEXT - 1, porté uniquement par le dernier lot.
+
+        Args:
+            folder: Nom du dossier IMAP
+            limit: Nombre max d'emails à récupérer
+            since: Date utilisée uniquement lors d'une (ré)initialisation
+            sync_state: État retourné par l'appel précédent
+            chunk_size: Nombre d'UIDs par FETCH
+
+        Yields:
+            Tuple (emails, état à persister avec le lot ou None)
+
+        Raises:
+            ConnectionError: Si la connexion échoue
+        """
+        if not self.client:
+            self.connect()
+
+        try:
+            select_info = self.client.select_folder(folder)
+            uid_validity = select_info.get(b'UIDVALIDITY')
+            uid_next = select_info.get(b'UIDNEXT')
+            if uid_next is None:
+                # Serveur qui n'annonce pas UIDNEXT : le calculer
+                uid_next = max(self.client.search(['ALL']) or [0]) + 1
+
+            state = dict(sync_state or {})
+            last_uid = state.get('last_uid')
+
+            if last_uid is not None and state.get('uid_validity') == uid_validity:
+                if uid_next <= last_uid + 1:
+                    self.logger.info(f"No new messages in {folder} (UIDNEXT={uid_next})")
+                    yield [], state
+                    return
+
+                # "n:*" renvoie toujours au moins le dernier message, même si son UID < n
+                uids = self.client.search(['UID', f'{last_uid + 1}:*', 'NOT', 'DELETED'])
+                uids = sorted(uid for uid in uids if uid > last_uid)
+
+                # Plus anciens d'abord : le curseur avance sans laisser de trou
+                uids = uids[:limit]
+                if not uids:
+                    self.logger.info(f"No new messages in {folder}")
+                    yield [], state
+                    return
+
+                self.logger.info(f"Fetching {len(uids)} new emails from {folder} (UID > {last_uid})")
+                for chunk in self._chunks(uids, chunk_size):
+                    yield self._fetch_and_parse(chunk), {
+                        'uid_validity': uid_validity,
+                        'last_uid': max(chunk)
+                    }
+                return
+
+            if state:
+                self.logger.warning(
+                    f"UIDVALIDITY changed for {folder} "
+                    f"({state.get('uid_validity')} -> {uid_validity}), resetting sync cursor"
+                )
+            uids = sorted(self._search_uids(since), reverse=True)[:limit]
+            new_state = {'uid_validity': uid_validity, 'last_uid': uid_next - 1}
+
+            if not uids:
+                self.logger.info(f"No messages found in {folder}")
+                yield [], new_state
+                return
+
+            self.logger.info(f"Fetching {len(uids)} emails from {folder} (cursor reset)")
+            chunks = list(self._chunks(uids, chunk_size))
+            for index, chunk in enumerate(chunks):
+                is_last = index == len(chunks) - 1
+                yield self._fetch_and_parse(chunk), (new_state if is_last else None)
 
         except IMAPClientError as e:
             self.logger.error(f"IMAP error fetching emails: {e}", exc_info=True)
@@ -165,6 +305,398 @@ def fetch_emails(
             self.logger.error(f"Unexpected error fetching emails: {e}", exc_info=True)
             raise
 
+    def fetch_backfill_page(
+        self,
+        folder: str = "INBOX",
+        cursor: Optional[Dict[str, Any]] = None,
+        page_size: int = 100
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Récupérer une page de l'historique par fenêtres d'UIDs décroissants.
+
+        Le curseur est {"uid_validity": int, "before_uid": int} : la page
+        contient les page_size plus grands UIDs < before_uid. Si UIDVALIDITY
+        a changé, le parcours repart du haut du dossier (les doublons sont
+        ignorés à l'insertion).
+
+        Args:
+            folder: Nom du dossier IMAP
+            cursor: Curseur de la page précédente (None = début)
+            page_size: Nombre d'emails par page
+
+        Returns:
+            Tuple (emails, curseur suivant ou None si l'historique est terminé)
+        """
+        if not self.client:
+            self.connect()
+
+        try:
+            select_info = self.client.select_folder(folder)
+            uid_validity = select_info.get(b'UIDVALIDITY')
+
+            cursor = dict(cursor or {})
+            before_uid = cursor.get('before_uid')
+            if before_uid is None or cursor.get('uid_validity') != uid_validity:
+                if cursor:
+                    self.logger.warning(f"UIDVALIDITY changed for {folder}, restarting backfill")
+                before_uid = None
+
+            if before_uid is not None and before_uid <= 1:
+                return [], None
+
+            criteria = ['NOT', 'DELETED']
+            if before_uid is not None:
+                criteria = ['UID', f'1:{before_uid - 1}'] + criteria
+
+            uids = sorted(self.client.search(criteria), reverse=True)
+            if before_uid is not None:
+                uids = [uid for uid in uids if uid < before_uid]
+            page = uids[:page_size]
+
+            if not page:
+                self.logger.info(f"Backfill of {folder} completed")
+                return [], None
+
+            self.logger.info(f"Backfill: fetching {len(page)} emails from {folder} (UID < {before_uid or 'max'})")
+            emails = self._fetch_and_parse(page)
+
+            next_cursor = None
+            if len(uids) > len(page):
+                next_cursor = {'uid_validity': uid_validity, 'before_uid': min(page)}
+            return emails, next_cursor
+
+        except IMAPClientError as e:
+            self.logger.error(f"IMAP error during backfill: {e}", exc_info=True)
+            raise ConnectionError(f"Failed to fetch emails: {e}")
+
+    @staticmethod
+    def _chunks(uids: List[int], chunk_size: int) -> Iterator[List[int]]:
+        """Découper une liste d'UIDs en tranches de chunk_size."""
+        chunk_size = max(1, chunk_size)
+        for start in range(0, len(uids), chunk_size):
+            yield uids[start:start + chunk_size]
+
+    def _search_uids(self, since: Optional[datetime] = None) -> List[int]:
+        """
+        Rechercher les UIDs non supprimés du dossier sélectionné.
+
+        Args:
+            since: Date à partir de laquelle chercher (granularité jour)
+
+        Returns:
+            Liste d'UIDs
+        """
+        criteria = ['NOT', 'DELETED']
+        if since:
+            date_str = since.date().strftime("%d-%b-%Y")
+            criteria.append('SINCE')
+            criteria.append(date_str)
+
+        return self.client.search(criteria)
+
+    def _fetch_and_parse(self, uids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Fetcher et parser une liste d'UIDs du dossier sélectionné.
+
+        Args:
+            uids: UIDs à récupérer
+
+        Returns:
+            Liste de dicts avec les emails parsés
+        """
+        if self.fetch_mode == self.FETCH_MODE_FULL:
+            results = self._fetch_full(uids)
+        else:
+            results = self._fetch_headers_first(uids)
+
+        self.logger.info(f"Successfully parsed {len(results)} emails")
+        return results
+
+    def _fetch_full(self, uids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Fetcher les messages bruts complets (pièces jointes incluses).
+
+        Args:
+            uids: UIDs à récupérer
+
+        Returns:
+            Liste de dicts avec les emails parsés
+        """
+        response = self.client.fetch(uids, ['BODY.PEEK[]', 'FLAGS', 'INTERNALDATE'])
+
+        results = []
+        for msg_id, data in response.items():
+            try:
+                email_data = self._parse_email(msg_id, data)
+                if email_data:
+                    results.append(email_data)
+            except Exception as e:
+                self.logger.error(f"Error parsing message {msg_id}: {e}")
+
+        return results
+
+    def _fetch_headers_first(self, uids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Fetch en deux phases sans télécharger les pièces jointes.
+
+        Phase 1: ENVELOPE, BODYSTRUCTURE et RFC822.SIZE pour tous les UIDs.
+        Les pièces jointes (noms, nombre, tailles) sont déduites de la
+        structure. Phase 2: seuls les premiers octets de la partie texte
+        choisie dans BODYSTRUCTURE sont fetchés (BODY.PEEK[section]<0.N>),
+        un FETCH par section distincte.
+
+        Args:
+            uids: UIDs à récupérer
+
+        Returns:
+            Liste de dicts avec les emails parsés
+        """
+        response = self.client.fetch(uids, self.HEADER_FETCH_ITEMS)
+
+        results = {}
+        text_parts = {}  # uid -> (section, encoding, charset)
+        for msg_id, data in response.items():
+            try:
+                email_data, text_part = self._parse_envelope(msg_id, data)
+                results[msg_id] = email_data
+                if text_part:
+                    text_parts[msg_id] = text_part
+            except Exception as e:
+                self.logger.error(f"Error parsing structure of message {msg_id}: {e}")
+
+        # Regrouper par section pour limiter le nombre de FETCH
+        by_section: Dict[str, List[int]] = {}
+        for msg_id, (section, _, _) in text_parts.items():
+            by_section.setdefault(section, []).append(msg_id)
+
+        for section, section_uids in by_section.items():
+            item = f'BODY.PEEK[{section}]<0.{self.body_preview_bytes}>'
+            body_response = self.client.fetch(section_uids, [item])
+
+            for msg_id, data in body_response.items():
+                if msg_id not in results:
+                    continue
+                raw = next(
+                    (value for key, value in data.items() if key.startswith(b'BODY[')),
+                    None
+                )
+                if not raw:
+                    continue
+                _, encoding, charset = text_parts[msg_id]
+                body = self._decode_partial_body(raw, encoding, charset)
+                results[msg_id]["body"] = body[:2000]
+
+        return list(results.values())
+
+    def _parse_envelope(
+        self,
+        msg_id: int,
+        data: Dict
+    ) -> Tuple[Dict[str, Any], Optional[Tuple[str, str, str]]]:
+        """
+        Parser ENVELOPE/BODYSTRUCTURE en format standard (body vide).
+
+        Args:
+            msg_id: UID du message
+            data: Données IMAP de la phase 1
+
+        Returns:
+            Tuple (email_data, (section, encoding, charset) de la partie texte ou None)
+        """
+        envelope = data[b'ENVELOPE']
+
+        subject = self._decode_header_value(envelope.subject) or 'No Subject'
+        sender = 'Unknown'
+        if envelope.from_:
+            address = envelope.from_[0]
+            name = self._decode_header_value(address.name)
+            mailbox = (address.mailbox or b'').decode('utf-8', errors='replace')
+            host = (address.host or b'').decode('utf-8', errors='replace')
+            email_addr = f"{mailbox}@{host}" if host else mailbox
+            sender = f"{name} <{email_addr}>" if name else email_addr
+
+        message_id = (envelope.message_id or b'').decode('utf-8', errors='replace').strip()
+        message_id = message_id or f"imap-{msg_id}"
+
+        # Date de l'enveloppe, sinon INTERNALDATE
+        date_received = envelope.date or data.get(b'INTERNALDATE') or datetime.utcnow()
+
+        text_part = None
+        attachments = []
+        bodystructure = data.get(b'BODYSTRUCTURE')
+        if bodystructure:
+            text_part, attachments = self._analyse_bodystructure(bodystructure)
+
+        email_data = {
+            "message_id": message_id,
+            "imap_uid": msg_id,  # Keep IMAP UID for operations
+            "subject": subject,
+            "sender": sender,
+            "date_received": date_received,
+            "body": "",
+            "size": data.get(b'RFC822.SIZE'),
+            "has_attachments": len(attachments) > 0,
+            "attachment_count": len(attachments),
+            "attachments": attachments
+        }
+        return email_data, text_part
+
+    def _analyse_bodystructure(
+        self,
+        bodystructure
+    ) -> Tuple[Optional[Tuple[str, str, str]], List[Dict[str, Any]]]:
+        """
+        Choisir la partie texte à fetcher et lister les pièces jointes.
+
+        Même logique que _extract_body_and_attachments : text/plain en
+        priorité, text/html en fallback, pièces jointes = parties avec
+        disposition "attachment" et un nom de fichier.
+
+        Args:
+            bodystructure: BODYSTRUCTURE parsé par imapclient
+
+        Returns:
+            Tuple ((section, encoding, charset) ou None, attachments)
+        """
+        plain_part = None
+        html_part = None
+        attachments = []
+
+        for section, part in self._walk_bodystructure(bodystructure):
+            content_type = f"{self._to_str(part[0])}/{self._to_str(part[1])}".lower()
+            params = self._params_to_dict(part[2])
+            disposition, disposition_params = self._part_disposition(part)
+
+            if disposition == "attachment":
+                filename = self._part_filename(params, disposition_params)
+                if filename:
+                    attachments.append({
+                        "filename": filename,
+                        "content_type": content_type,
+                        "size": part[6] if len(part) > 6 and isinstance(part[6], int) else 0
+                    })
+                continue
+
+            encoding = self._to_str(part[5]).lower() if len(part) > 5 else ""
+            charset = params.get("CHARSET") or "utf-8"
+            if content_type == "text/plain" and plain_part is None:
+                plain_part = (section, encoding, charset)
+            elif content_type == "text/html" and html_part is None:
+                html_part = (section, encoding, charset)
+
+        return plain_part or html_part, attachments
+
+    def _walk_bodystructure(self, bodystructure, prefix: str = ""):
+        """
+        Parcourir les parties feuilles d'un BODYSTRUCTURE.
+
+        Yields:
+            Tuple (section IMAP, partie). Un message non multipart a une
+            seule partie, adressée par TEXT.
+        """
+        if bodystructure.is_multipart:
+            for index, child in enumerate(bodystructure[0], start=1):
+                section = f"{prefix}.{index}" if prefix else str(index)
+                yield from self._walk_bodystructure(child, section)
+        else:
+            yield prefix or "TEXT", bodystructure
+
+    def _part_disposition(self, part) -> Tuple[str, Dict[str, str]]:
+        """
+        Extraire la disposition d'une partie non multipart.
+
+        L'index du champ disposition dépend du type (RFC 3501 7.4.2):
+        text/* a un champ "lines" en plus, message/rfc822 a aussi
+        envelope et body.
+
+        Returns:
+            Tuple (disposition en minuscules ou "", paramètres)
+        """
+        main_type = self._to_str(part[0]).lower()
+        sub_type = self._to_str(part[1]).lower()
+        if main_type == "text":
+            index = 9
+        elif main_type == "message" and sub_type == "rfc822":
+            index = 11
+        else:
+            index = 8
+
+        if len(part) <= index or not isinstance(part[index], tuple) or not part[index]:
+            return "", {}
+
+        disposition = part[index]
+        params = self._params_to_dict(disposition[1]) if len(disposition) > 1 else {}
+        return self._to_str(disposition[0]).lower(), params
+
+    def _part_filename(self, params: Dict[str, str], disposition_params: Dict[str, str]) -> Optional[str]:
+        """Nom de fichier d'une partie (disposition puis Content-Type)."""
+        filename = disposition_params.get("FILENAME") or params.get("NAME")
+        if not filename:
+            # RFC 2231: filename*=utf-8''facture%20janvier.pdf
+            encoded = disposition_params.get("FILENAME*") or params.get("NAME*")
+            if encoded:
+                try:
+                    filename = collapse_rfc2231_value(decode_rfc2231(encoded))
+                except Exception:
+                    filename = encoded
+        if not filename:
+            return None
+
+        try:
+            return str(make_header(decode_header(filename)))
+        except Exception:
+            return filename
+
+    def _decode_partial_body(self, raw: bytes, encoding: str, charset: str) -> str:
+        """
+        Décoder un début de partie (Content-Transfer-Encoding puis charset).
+
+        Le fetch étant tronqué à N octets, le base64 est recoupé sur un
+        multiple de 4 avant décodage.
+        """
+        try:
+            if encoding == "base64":
+                compact = b"".join(raw.split())
+                payload = base64.b64decode(compact[:len(compact) - len(compact) % 4])
+            elif encoding == "quoted-printable":
+                payload = quopri.decodestring(raw)
+            else:
+                payload = raw
+            return payload.decode(charset, errors='replace')
+        except (LookupError, ValueError) as e:
+            self.logger.warning(f"Error decoding partial body: {e}")
+            return raw.decode('utf-8', errors='replace')
+
+    @staticmethod
+    def _to_str(value) -> str:
+        """Convertir une valeur IMAP (bytes/None) en str."""
+        if value is None:
+            return ""
+        if isinstance(value, bytes):
+            return value.decode('utf-8', errors='replace')
+        return str(value)
+
+    @classmethod
+    def _params_to_dict(cls, params) -> Dict[str, str]:
+        """Convertir une liste de paramètres IMAP (k1 v1 k2 v2...) en dict (clés en majuscules)."""
+        if not params or not isinstance(params, tuple):
+            return {}
+        return {
+            cls._to_str(key).upper(): cls._to_str(value)
+            for key, value in zip(params[::2], params[1::2])
+        }
+
+    @classmethod
+    def _decode_header_value(cls, value) -> str:
+        """Décoder un en-tête encodé RFC 2047 (=?utf-8?q?...?=)."""
+        text = cls._to_str(value)
+        if not text:
+            return ""
+        try:
+            return str(make_header(decode_header(text)))
+        except Exception:
+            return text
+
     def move_email(self, message_id: str, destination_folder: str) -> bool:
         """
         Déplacer un email vers un autre dossier.
@@ -176,30 +708,59 @@ def move_email(self, message_id: str, destination_folder: str) -> bool:
         Returns:
             True si succès, False sinon
         """
+        return self.move_emails([message_id], destination_folder)[message_id]
+
+    def move_emails(
+        self,
+        message_ids: List[str],
+        destination_folder: str,
+        source_folder: str = "INBOX"
+    ) -> Dict[str, bool]:
+        """
+        Déplacer un ensemble d'emails en une seule commande.
+
+        Avec la capacité MOVE (RFC 6851) : un UID MOVE sur le set d'UIDs.
+        Sinon UID COPY + UID STORE \\Deleted, puis UID EXPUNGE limité à ces
+        UIDs si UIDPLUS (RFC 4315) est disponible, EXPUNGE du dossier sinon.
+
+        Args:
+            message_ids: UIDs des messages IMAP
+            destination_folder: Nom du dossier de destination
+            source_folder: Dossier contenant les messages
+
+        Returns:
+            Dict {message_id: succès}
+        """
         if not self.client:
             self.connect()
 
+        uids, results = self._parse_uids(message_ids)
+        if not uids:
+            return results
+
         try:
-            # Convert message_id to UID (int)
-            uid = int(message_id) if isinstance(message_id, str) else message_id
+            self.client.select_folder(source_folder)
 
-            # IMAP COPY then DELETE pattern
-            self.client.copy([uid], destination_folder)
-            self.client.delete_messages([uid])
-            self.client.expunge()
+            if self.client.has_capability('MOVE'):
+                self.client.move(list(uids), destination_folder)
+            else:
+                self.client.copy(list(uids), destination_folder)
+                self.client.delete_messages(list(uids))
+                self._expunge(list(uids))
 
-            self.logger.info(f"Moved message {uid} to {destination_folder}")
-            return True
+            self.logger.info(f"Moved {len(uids)} messages to {destination_folder}")
+            success = True
 
-        except ValueError as e:
-            self.logger.error(f"Invalid message ID format: {message_id}")
-            return False
         except IMAPClientError as e:
-            self.logger.error(f"IMAP error moving message {message_id}: {e}")
-            return False
+            self.logger.error(f"IMAP error moving messages to {destination_folder}: {e}")
+            success = False
         except Exception as e:
-            self.logger.error(f"Error moving message {message_id}: {e}", exc_info=True)
-            return False
+            self.logger.error(f"Error moving messages to {destination_folder}: {e}", exc_info=True)
+            success = False
+
+        for message_id in uids.values():
+            results[message_id] = success
+        return results
 
     def delete_email(self, message_id: str, permanent: bool = False) -> bool:
         """
@@ -213,34 +774,93 @@ def delete_email(self, message_id: str, permanent: bool = False) -> bool:
         Returns:
             True si succès, False sinon
         """
+        return self.delete_emails([message_id], permanent=permanent)[message_id]
+
+    def delete_emails(
+        self,
+        message_ids: List[str],
+        permanent: bool = False,
+        source_folder: str = "INBOX"
+    ) -> Dict[str, bool]:
+        """
+        Supprimer un ensemble d'emails en une seule commande.
+
+        Args:
+            message_ids: UIDs des messages IMAP
+            permanent: Si True, expunge des seuls messages concernés (UID
+                      EXPUNGE si UIDPLUS). Si False, marque comme \\Deleted seulement.
+            source_folder: Dossier contenant les messages
+
+        Returns:
+            Dict {message_id: succès}
+        """
         if not self.client:
             self.connect()
 
+        uids, results = self._parse_uids(message_ids)
+        if not uids:
+            return results
+
         try:
-            # Convert message_id to UID
-            uid = int(message_id) if isinstance(message_id, str) else message_id
+            self.client.select_folder(source_folder)
 
             # Mark as deleted
-            self.client.delete_messages([uid])
+            self.client.delete_messages(list(uids))
 
             # Expunge si suppression permanente
             if permanent:
-                self.client.expunge()
-                self.logger.info(f"Permanently deleted message {uid}")
+                self._expunge(list(uids))
+                self.logger.info(f"Permanently deleted {len(uids)} messages")
             else:
-                self.logger.info(f"Marked message {uid} as deleted")
+                self.logger.info(f"Marked {len(uids)} messages as deleted")
+            success = True
 
-            return True
-
-        except ValueError as e:
-            self.logger.error(f"Invalid message ID format: {message_id}")
-            return False
         except IMAPClientError as e:
-            self.logger.error(f"IMAP error deleting message {message_id}: {e}")
-            return False
+            self.logger.error(f"IMAP error deleting messages: {e}")
+            success = False
         except Exception as e:
-            self.logger.error(f"Error deleting message {message_id}: {e}", exc_info=True)
-            return False
+            self.logger.error(f"Error deleting messages: {e}", exc_info=True)
+            success = False
+
+        for message_id in uids.values():
+            results[message_id] = success
+        return results
+
+    def _parse_uids(self, message_ids: List[str]) -> Tuple[Dict[int, str], Dict[str, bool]]:
+        """
+        Convertir des IDs de messages en UIDs IMAP.
+
+        Args:
+            message_ids: UIDs (str ou int)
+
+        Returns:
+            Tuple ({uid: message_id} des IDs valides, {message_id: False} des invalides)
+        """
+        uids = {}
+        invalid = {}
+        for message_id in message_ids:
+            try:
+                uids[int(message_id)] = message_id
+            except (TypeError, ValueError):
+                self.logger.error(f"Invalid message ID format: {message_id}")
+                invalid[message_id] = False
+        return uids, invalid
+
+    def _expunge(self, uids: List[int]) -> None:
+        """
+        Expunger les messages marqués \\Deleted.
+
+        Avec UIDPLUS, UID EXPUNGE ne supprime que les UIDs donnés : les autres
+        messages marqués \\Deleted (par un autre client) sont préservés et
+        le dossier n'est pas renuméroté en entier.
+
+        Args:
+            uids: UIDs à expunger
+        """
+        if self.client.has_capability('UIDPLUS'):
+            self.client.uid_expunge(uids)
+        else:
+            self.client.expunge()
 
     def _parse_email(self, msg_id: int, data: Dict) -> Optional[Dict[str, Any]]:
         """
@@ -7,8 +7,10 @@
 - Exchange Online
 """
 import logging
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple, Iterator
 import base64
 
 from msal import ConfidentialClientApplication, PublicClientApplication
@@ -43,6 +45,31 @@ class MicrosoftConnector(BaseEmailConnector):
 
     GRAPH_API_ENDPOINT = 'https://graph.microsoft.com/v1.0'
 
+    # Champs récupérés pour chaque message
+    MESSAGE_SELECT = 'id,subject,from,toRecipients,receivedDateTime,bodyPreview,hasAttachments,internetMessageId'
+
+    # Nombre max de requêtes par appel JSON $batch (limite Graph)
+    BATCH_MAX_REQUESTS = 20
+
+    # Attente max (secondes) avant de rejouer les requêtes throttlées (429)
+    BATCH_MAX_RETRY_AFTER = 30
+
+    # Durée de vie (secondes) du cache chemin de dossier -> ID
+    FOLDER_CACHE_TTL = 3600
+
+    # Cache partagé entre instances : {email_address: (chargé_à, {chemin en minuscules: id})}
+    _folder_cache: Dict[str, Tuple[float, Dict[str, str]]] = {}
+    _folder_cache_lock = threading.Lock()
+
+    # Noms de dossiers génériques -> well-known names Graph
+    FOLDER_MAP = {
+        'INBOX': 'inbox',
+        'SENT': 'sentitems',
+        'DRAFTS': 'drafts',
+        'TRASH': 'deleteditems',
+        'JUNK': 'junkemail'
+    }
+
     def __init__(self, email_address: str, credentials: Dict[str, Any]):
         """
         Initialiser le connecteur Microsoft.
@@ -111,6 +138,18 @@ def disconnect(self) -> None:
             self._session = None
         self.logger.debug("Microsoft connection closed")
 
+    def check_health(self) -> bool:
+        """
+        Vérifier que la session Graph est utilisable.
+
+        Le token n'est rafraîchi qu'à la connexion : une session dont le token
+        expire est signalée morte pour que le pool se reconnecte.
+
+        Returns:
+            True si la session existe et le token est encore valide
+        """
+        return self._session is not None and not self._is_token_expired()
+
     def fetch_emails(
         self,
         folder: str = "INBOX",
@@ -132,15 +171,7 @@ def fetch_emails(
             self.connect()
 
         try:
-            # Map folder names
-            folder_map = {
-                'INBOX': 'inbox',
-                'SENT': 'sentitems',
-                'DRAFTS': 'drafts',
-                'TRASH': 'deleteditems',
-                'JUNK': 'junkemail'
-            }
-            graph_folder = folder_map.get(folder.upper(), folder.lower())
+            graph_folder = self._graph_folder(folder)
 
             # Build query
             endpoint = f'{self.GRAPH_API_ENDPOINT}/me/mailFolders/{graph_folder}/messages'
@@ -149,7 +180,7 @@ def fetch_emails(
             params = {
                 '$top': min(limit, 999),  # Max 999 per request
                 '$orderby': 'receivedDateTime desc',
-                '$select': 'id,subject,from,toRecipients,receivedDateTime,bodyPreview,hasAttachments,internetMessageId'
+                '$select': self.MESSAGE_SELECT
             }
 
             # Filter by date if provided
@@ -159,13 +190,20 @@ def fetch_emails(
 
             self.logger.info(f"Fetching emails from {graph_folder} with limit {limit}")
 
-            # Make request
+            # Suivre @odata.nextLink jusqu'à atteindre la limite
+            messages = []
             response = self._session.get(endpoint, params=params)
-            response.raise_for_status()
+            while True:
+                response.raise_for_status()
+                data = response.json()
+                messages.extend(data.get('value', []))
 
-            data = response.json()
-            messages = data.get('value', [])
+                next_link = data.get('@odata.nextLink')
+                if not next_link or len(messages) >= limit:
+                    break
+                response = self._session.get(next_link)
 
+            messages = messages[:limit]
             self.logger.info(f"Found {len(messages)} messages")
 
             # Parse each message
@@ -188,6 +226,168 @@ def fetch_emails(
             self.logger.error(f"Unexpected error: {e}", exc_info=True)
             raise
 
+    def iter_incremental(
+        self,
+        folder: str = "INBOX",
+        limit: int = 50,
+        since: Optional[datetime] = None,
+        sync_state: Optional[Dict[str, Any]] = None,
+        chunk_size: int = 50
+    ) -> Iterator[Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+        """
+        Synchroniser un dossier via la delta query Graph (messages/delta).
+
+        Le premier appel énumère le dossier (filtré par since si fourni) ;
+        chaque page renvoie un @odata.nextLink, la dernière un
+        @odata.deltaLink. Les polls suivants repartent du deltaLink et ne
+        reçoivent que les messages créés, modifiés ou supprimés depuis.
+
+        L'état persisté avec chaque page est {"next_link": url} tant que le
+        parcours est en cours, puis {"delta_link": url}. Si limit est atteint,
+        le poll s'arrête et le suivant reprend au nextLink. Un deltaLink
+        expiré (410 Gone) relance une synchronisation initiale.
+
+        Args:
+            folder: Nom du dossier
+            limit: Nombre max d'emails par poll (arrêt en fin de page)
+            since: Date de départ de la synchronisation initiale
+            sync_state: État retourné par l'appel précédent
+            chunk_size: Taille de page demandée (Prefer: odata.maxpagesize)
+
+        Yields:
+            Tuple (emails, état à persister avec la page)
+        """
+        if not self._session:
+            self.connect()
+
+        state = sync_state or {}
+        url = state.get('next_link') or state.get('delta_link')
+        headers = {'Prefer': f'odata.maxpagesize={max(1, chunk_size)}'}
+        fetched = 0
+
+        try:
+            response = self._get_delta_page(url, folder, since, headers)
+            if url and response.status_code == 410:
+                self.logger.warning(f"Delta token expired for {folder}, restarting full sync")
+                response = self._get_delta_page(None, folder, since, headers)
+
+            while True:
+                response.raise_for_status()
+                data = response.json()
+
+                emails = []
+                for msg in data.get('value', []):
+                    # Messages supprimés ou sortis du dossier
+                    if '@removed' in msg:
+                        self.logger.debug(f"Message {msg.get('id')} removed from {folder}")
+                        continue
+                    email_data = self._parse_microsoft_message(msg)
+                    if email_data:
+                        emails.append(email_data)
+                fetched += len(emails)
+
+                next_link = data.get('@odata.nextLink')
+                if next_link:
+                    yield emails, {'next_link': next_link}
+                else:
+                    yield emails, {'delta_link': data.get('@odata.deltaLink')}
+                    return
+
+                if fetched >= limit:
+                    self.logger.info(f"Delta sync paused after {fetched} messages, resuming next poll")
+                    return
+                response = self._session.get(next_link, headers=headers)
+
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Error during delta sync: {e}", exc_info=True)
+            raise ConnectionError(f"Failed to fetch emails: {e}")
+
+    def _get_delta_page(
+        self,
+        url: Optional[str],
+        folder: str,
+        since: Optional[datetime],
+        headers: Dict[str, str]
+    ) -> requests.Response:
+        """
+        Demander une page de delta query.
+
+        Args:
+            url: nextLink/deltaLink à suivre (None = synchronisation initiale)
+            folder: Nom du dossier
+            since: Date de départ de la synchronisation initiale
+            headers: En-têtes additionnels (taille de page)
+
+        Returns:
+            Réponse HTTP (non vérifiée)
+        """
+        if url:
+            # nextLink/deltaLink contiennent déjà tous les paramètres
+            return self._session.get(url, headers=headers)
+
+        endpoint = f'{self.GRAPH_API_ENDPOINT}/me/mailFolders/{self._graph_folder(folder)}/messages/delta'
+        params = {'$select': self.MESSAGE_SELECT}
+        if since:
+            since_str = since.strftime('%Y-%m-%dT%H:%M:%SZ')
+            params['$filter'] = f'receivedDateTime ge {since_str}'
+            params['$orderby'] = 'receivedDateTime desc'
+        return self._session.get(endpoint, params=params, headers=headers)
+
+    def fetch_backfill_page(
+        self,
+        folder: str = "INBOX",
+        cursor: Optional[Dict[str, Any]] = None,
+        page_size: int = 100
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Récupérer une page de l'historique en suivant @odata.nextLink.
+
+        Les messages sont triés par receivedDateTime décroissant ; le curseur
+        est {"next_link": str}, l'URL complète de la page suivante.
+
+        Args:
+            folder: Nom du dossier
+            cursor: Curseur de la page précédente (None = début)
+            page_size: Nombre d'emails par page (max 999)
+
+        Returns:
+            Tuple (emails, curseur suivant ou None si l'historique est terminé)
+        """
+        if not self._session:
+            self.connect()
+
+        try:
+            if cursor and cursor.get('next_link'):
+                # nextLink contient déjà tous les paramètres de la requête
+                response = self._session.get(cursor['next_link'])
+            else:
+                endpoint = f'{self.GRAPH_API_ENDPOINT}/me/mailFolders/{self._graph_folder(folder)}/messages'
+                params = {
+                    '$top': min(page_size, 999),
+                    '$orderby': 'receivedDateTime desc',
+                    '$select': self.MESSAGE_SELECT
+                }
+                response = self._session.get(endpoint, params=params)
+            response.raise_for_status()
+
+            data = response.json()
+            messages = data.get('value', [])
+
+            self.logger.info(f"Backfill: fetched {len(messages)} messages from {folder}")
+
+            emails = []
+            for msg in messages:
+                email_data = self._parse_microsoft_message(msg)
+                if email_data:
+                    emails.append(email_data)
+
+            next_link = data.get('@odata.nextLink')
+            return emails, ({'next_link': next_link} if next_link else None)
+
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"Error during backfill: {e}", exc_info=True)
+            raise ConnectionError(f"Failed to fetch emails: {e}")
+
     def move_email(self, message_id: str, destination_folder: str) -> bool:
         """
         Déplacer un email vers un autre dossier.
@@ -203,17 +403,20 @@ def move_email(self, message_id: str, destination_folder: str) -> bool:
             self.connect()
 
         try:
-            # Get destination folder ID
-            folder_id = self._get_folder_id(destination_folder)
+            # Get destination folder ID (créé s'il n'existe pas)
+            folder_id = self._get_folder_id(destination_folder, create=True)
             if not folder_id:
                 self.logger.error(f"Folder not found: {destination_folder}")
                 return False
 
             # Move message
-            endpoint = f'{self.GRAPH_API_ENDPOINT}/me/messages/{message_id}/move'
-            payload = {'destinationId': folder_id}
-
-            response = self._session.post(endpoint, json=payload)
+            response = self._post_move(message_id, folder_id)
+            if response.status_code == 404 and not self._folder_exists(folder_id):
+                # Dossier supprimé ou renommé depuis la mise en cache (un 404
+                # sur un message déjà déplacé ou supprimé ne recharge rien)
+                fresh_id = self._refresh_folder_id(destination_folder, folder_id)
+                if fresh_id:
+                    response = self._post_move(message_id, fresh_id)
             response.raise_for_status()
 
             self.logger.info(f"Moved message {message_id} to {destination_folder}")
@@ -263,6 +466,164 @@ def delete_email(self, message_id: str, permanent: bool = False) -> bool:
             self.logger.error(f"Error deleting message: {e}")
             return False
 
+    def move_emails(self, message_ids: List[str], destination_folder: str) -> Dict[str, bool]:
+        """
+        Déplacer plusieurs emails via JSON $batch (20 requêtes par appel).
+
+        Args:
+            message_ids: IDs des messages Microsoft Graph
+            destination_folder: Nom du dossier de destination
+
+        Returns:
+            Dict {message_id: succès}
+        """
+        if not self._session:
+            self.connect()
+
+        folder_id = self._get_folder_id(destination_folder, create=True)
+        if not folder_id:
+            self.logger.error(f"Folder not found: {destination_folder}")
+            return {message_id: False for message_id in message_ids}
+
+        statuses: Dict[str, int] = {}
+        results = self._execute_batch(self._move_operations(message_ids, folder_id), statuses)
+
+        # Un 404 vient le plus souvent d'un message déjà déplacé ou supprimé ;
+        # l'arbre n'est rechargé que si c'est le dossier de destination qui a
+        # disparu (supprimé ou renommé depuis la mise en cache), et seuls ces
+        # échecs sont rejoués si l'ID du dossier a changé
+        not_found = [message_id for message_id, status in statuses.items() if status == 404]
+        if not_found and not self._folder_exists(folder_id):
+            fresh_id = self._refresh_folder_id(destination_folder, folder_id)
+            if fresh_id:
+                results.update(self._execute_batch(self._move_operations(not_found, fresh_id)))
+
+        self.logger.info(
+            f"Moved {sum(results.values())}/{len(message_ids)} messages to {destination_folder}"
+        )
+        return results
+
+    def delete_emails(self, message_ids: List[str], permanent: bool = False) -> Dict[str, bool]:
+        """
+        Supprimer plusieurs emails via JSON $batch (20 requêtes par appel).
+
+        Args:
+            message_ids: IDs des messages Microsoft Graph
+            permanent: Si True, suppression définitive. Sinon, déplace vers Deleted Items.
+
+        Returns:
+            Dict {message_id: succès}
+        """
+        if not self._session:
+            self.connect()
+
+        if permanent:
+            operations = [
+                (message_id, {'method': 'DELETE', 'url': f'/me/messages/{message_id}'})
+                for message_id in message_ids
+            ]
+        else:
+            # Well-known name : pas de résolution d'ID nécessaire
+            operations = [
+                (message_id, {
+                    'method': 'POST',
+                    'url': f'/me/messages/{message_id}/move',
+                    'body': {'destinationId': 'deleteditems'},
+                    'headers': {'Content-Type': 'application/json'}
+                })
+                for message_id in message_ids
+            ]
+
+        results = self._execute_batch(operations)
+
+        action = "permanently deleted" if permanent else "moved to trash"
+        self.logger.info(f"{sum(results.values())}/{len(message_ids)} messages {action}")
+        return results
+
+    @staticmethod
+    def _move_operations(message_ids: List[str], folder_id: str) -> List[Tuple[str, Dict[str, Any]]]:
+        return [
+            (message_id, {
+                'method': 'POST',
+                'url': f'/me/messages/{message_id}/move',
+                'body': {'destinationId': folder_id},
+                'headers': {'Content-Type': 'application/json'}
+            })
+            for message_id in message_ids
+        ]
+
+    def _post_move(self, message_id: str, folder_id: str) -> requests.Response:
+        endpoint = f'{self.GRAPH_API_ENDPOINT}/me/messages/{message_id}/move'
+        return self._session.post(endpoint, json={'destinationId': folder_id})
+
+    def _execute_batch(
+        self,
+        operations: List[Tuple[str, Dict[str, Any]]],
+        statuses: Optional[Dict[str, int]] = None
+    ) -> Dict[str, bool]:
+        """
+        Exécuter des requêtes Graph par paquets de BATCH_MAX_REQUESTS via /$batch.
+
+        Les requêtes throttlées (429) sont rejouées une fois après le
+        Retry-After le plus long du paquet.
+
+        Args:
+            operations: Liste de tuples (message_id, requête $batch sans "id")
+            statuses: Dict à compléter avec le statut HTTP de chaque requête
+
+        Returns:
+            Dict {message_id: succès}
+        """
+        results = {message_id: False for message_id, _ in operations}
+        pending = list(operations)
+
+        for attempt in range(2):
+            throttled = []
+            retry_after = 0
+
+            for start in range(0, len(pending), self.BATCH_MAX_REQUESTS):
+                chunk = pending[start:start + self.BATCH_MAX_REQUESTS]
+                payload = {
+                    'requests': [
+                        {'id': str(index), **request}
+                        for index, (_, request) in enumerate(chunk)
+                    ]
+                }
+
+                try:
+                    response = self._session.post(f'{self.GRAPH_API_ENDPOINT}/$batch', json=payload)
+                    response.raise_for_status()
+                except requests.exceptions.RequestException as e:
+                    self.logger.error(f"Graph batch request failed: {e}")
+                    continue
+
+                for item in response.json().get('responses', []):
+                    message_id, request = chunk[int(item['id'])]
+                    status = item.get('status', 500)
+                    if statuses is not None:
+                        statuses[message_id] = status
+
+                    if status == 429:
+                        throttled.append((message_id, request))
+                        headers = item.get('headers') or {}
+                        retry_after = max(retry_after, int(headers.get('Retry-After', 1)))
+                    elif 200 <= status < 300:
+                        results[message_id] = True
+                    else:
+                        error = (item.get('body') or {}).get('error', {})
+                        self.logger.warning(
+                            f"Batch operation on {message_id} failed ({status}): {error.get('message')}"
+                        )
+
+            if not throttled or attempt == 1:
+                break
+
+            self.logger.warning(f"{len(throttled)} batch operations throttled, retrying in {retry_after}s")
+            time.sleep(min(retry_after, self.BATCH_MAX_RETRY_AFTER))
+            pending = throttled
+
+        return results
+
     def _parse_microsoft_message(self, message: Dict) -> Optional[Dict[str, Any]]:
         """
         Parser un message Microsoft Graph en format standard.
@@ -316,6 +677,18 @@ def _parse_microsoft_message(self, message: Dict) -> Optional[Dict[str, Any]]:
             self.logger.error(f"Error parsing message: {e}", exc_info=True)
             return None
 
+    def _graph_folder(self, folder: str) -> str:
+        """
+        Convertir un nom de dossier générique (INBOX, SENT...) en dossier Graph.
+
+        Args:
+            folder: Nom du dossier
+
+        Returns:
+            Well-known name Graph ou nom en minuscules
+        """
+        return self.FOLDER_MAP.get(folder.upper(), folder.lower())
+
     def _is_token_expired(self) -> bool:
         """
         Vérifier si le token est expiré.
@@ -382,48 +755,182 @@ def _refresh_access_token(self) -> None:
             self.logger.error(f"Error refreshing token: {e}", exc_info=True)
             raise ConnectionError(f"Failed to refresh token: {e}")
 
-    def _get_folder_id(self, folder_name: str) -> Optional[str]:
+    def _get_folder_id(self, folder_name: str, create: bool = False) -> Optional[str]:
         """
-        Obtenir l'ID d'un dossier par son nom.
+        Obtenir l'ID d'un dossier par son chemin.
+
+        Les well-known names (inbox, deleteditems...) sont utilisés tels quels.
+        Les autres chemins ("Finance/Invoices") sont résolus dans l'arbre des
+        dossiers, chargé une fois par compte et mis en cache FOLDER_CACHE_TTL.
 
         Args:
-            folder_name: Nom du dossier (case-insensitive)
+            folder_name: Chemin du dossier, séparé par "/" (case-insensitive)
+            create: Créer les dossiers manquants du chemin
 
         Returns:
             Folder ID ou None si not found
         """
+        well_known = self._well_known_folder(folder_name)
+        if well_known:
+            return well_known
+
         try:
-            # Well-known folder names
-            well_known = {
-                'inbox': 'inbox',
-                'deleteditems': 'deleteditems',
-                'drafts': 'drafts',
-                'sentitems': 'sentitems',
-                'junkemail': 'junkemail'
-            }
+            path = self._normalize_path(folder_name)
+            folders = self._get_folder_map()
+            if path in folders or not create:
+                return folders.get(path)
+            return self._create_folder_path(folder_name)
 
-            folder_lower = folder_name.lower()
-            if folder_lower in well_known:
-                return well_known[folder_lower]
+        except Exception as e:
+            self.logger.error(f"Error getting folder ID: {e}")
+            return None
 
-            # Search in mailFolders
-            endpoint = f'{self.GRAPH_API_ENDPOINT}/me/mailFolders'
-            params = {'$filter': f"displayName eq '{folder_name}'"}
+    def invalidate_folder_cache(self) -> None:
+        """Oublier l'arbre des dossiers de ce compte."""
+        with self._folder_cache_lock:
+            self._folder_cache.pop(self.email_address, None)
 
-            response = self._session.get(endpoint, params=params)
-            response.raise_for_status()
+    def _folder_exists(self, folder_id: str) -> bool:
+        """
+        Vérifier qu'un ID de dossier est toujours valide.
 
-            data = response.json()
-            folders = data.get('value', [])
+        Args:
+            folder_id: ID du dossier
 
-            if folders:
-                return folders[0]['id']
+        Returns:
+            False si Graph répond 404, True sinon (y compris en cas d'erreur)
+        """
+        if self._well_known_folder(folder_id):
+            return True
+        try:
+            response = self._session.get(
+                f'{self.GRAPH_API_ENDPOINT}/me/mailFolders/{folder_id}', params={'$select': 'id'}
+            )
+        except requests.exceptions.RequestException as e:
+            self.logger.warning(f"Could not check mail folder {folder_id}: {e}")
+            return True
+        return response.status_code != 404
 
-            return None
+    def _refresh_folder_id(self, folder_name: str, stale_id: str) -> Optional[str]:
+        """
+        Recharger l'arbre des dossiers après un échec (404) sur un ID en cache.
 
-        except Exception as e:
-            self.logger.error(f"Error getting folder ID: {e}")
+        Args:
+            folder_name: Chemin du dossier
+            stale_id: ID utilisé lors de l'échec
+
+        Returns:
+            Nouvel ID si différent de stale_id, None sinon
+        """
+        if self._well_known_folder(folder_name):
             return None
+        self.invalidate_folder_cache()
+        fresh_id = self._get_folder_id(folder_name, create=True)
+        return fresh_id if fresh_id and fresh_id != stale_id else None
+
+    def _well_known_folder(self, folder_name: str) -> Optional[str]:
+        well_known = self.FOLDER_MAP.get(folder_name.upper())
+        if well_known:
+            return well_known
+        if folder_name.lower() in self.FOLDER_MAP.values():
+            return folder_name.lower()
+        return None
+
+    @staticmethod
+    def _normalize_path(folder_name: str) -> str:
+        return '/'.join(part.strip() for part in folder_name.strip('/').split('/')).lower()
+
+    def _get_folder_map(self) -> Dict[str, str]:
+        """
+        Récupérer la table chemin -> ID des dossiers (cache par compte avec TTL).
+
+        Returns:
+            Dict {chemin en minuscules: id}
+        """
+        with self._folder_cache_lock:
+            cached = self._folder_cache.get(self.email_address)
+        if cached and time.monotonic() - cached[0] < self.FOLDER_CACHE_TTL:
+            return cached[1]
+
+        folders: Dict[str, str] = {}
+        self._load_folders(f'{self.GRAPH_API_ENDPOINT}/me/mailFolders', '', folders)
+        self.logger.debug(f"Loaded {len(folders)} mail folders")
+
+        with self._folder_cache_lock:
+            self._folder_cache[self.email_address] = (time.monotonic(), folders)
+        return folders
+
+    def _load_folders(self, url: str, parent_path: str, folders: Dict[str, str]) -> None:
+        """
+        Charger récursivement un niveau de l'arbre (pagination incluse).
+
+        Args:
+            url: Endpoint mailFolders ou childFolders
+            parent_path: Chemin du dossier parent ('' pour la racine)
+            folders: Table chemin -> ID à compléter
+        """
+        params = {'$top': 100, '$select': 'id,displayName,childFolderCount'}
+        while url:
+            response = self._session.get(url, params=params)
+            response.raise_for_status()
+            data = response.json()
+
+            for folder in data.get('value', []):
+                path = f"{parent_path}/{folder['displayName']}" if parent_path else folder['displayName']
+                path = path.lower()
+                folders[path] = folder['id']
+                if folder.get('childFolderCount'):
+                    self._load_folders(
+                        f"{self.GRAPH_API_ENDPOINT}/me/mailFolders/{folder['id']}/childFolders",
+                        path,
+                        folders
+                    )
+
+            # nextLink contient déjà les paramètres
+            url = data.get('@odata.nextLink')
+            params = None
+
+    def _create_folder_path(self, folder_name: str) -> str:
+        """
+        Créer les dossiers manquants d'un chemin, parent par parent.
+
+        Args:
+            folder_name: Chemin du dossier ("Finance/Invoices")
+
+        Returns:
+            ID du dernier dossier du chemin
+        """
+        folders = self._get_folder_map()
+        parts = [part.strip() for part in folder_name.strip('/').split('/')]
+        parent_id = None
+
+        for depth, name in enumerate(parts, start=1):
+            path = '/'.join(parts[:depth]).lower()
+            if path in folders:
+                parent_id = folders[path]
+                continue
+
+            if parent_id:
+                endpoint = f'{self.GRAPH_API_ENDPOINT}/me/mailFolders/{parent_id}/childFolders'
+            else:
+                endpoint = f'{self.GRAPH_API_ENDPOINT}/me/mailFolders'
+
+            response = self._session.post(endpoint, json={'displayName': name})
+            if response.status_code == 409:
+                # Créé entre-temps (autre worker) : recharger l'arbre
+                self.invalidate_folder_cache()
+                folders = self._get_folder_map()
+                parent_id = folders.get(path)
+                if parent_id:
+                    continue
+                # Conflit sur un dossier absent de l'arbre : remonter l'erreur 409
+            response.raise_for_status()
+
+            parent_id = response.json()['id']
+            folders[path] = parent_id
+            self.logger.info(f"Created mail folder {'/'.join(parts[:depth])}")
+
+        return parent_id
 
     def get_refreshed_credentials(self) -> Optional[Dict[str, Any]]:
         """
@@ -0,0 +1,333 @@
+"""
+Pool de connecteurs par compte, partagé au sein d'un process worker.
+
+Ouvrir un connecteur coûte cher (handshake TLS + LOGIN pour IMAP, build du
+service + getProfile pour Gmail, GET /me pour Graph). Le pool garde les
+connecteurs ouverts entre deux tâches et les prête à la classification,
+aux actions et à la synchronisation.
+
+- max_per_account: nombre max de connecteurs (prêtés + libres) par compte
+- idle_timeout: un connecteur libre depuis plus longtemps est fermé
+- health_check_interval: un connecteur libre depuis plus longtemps est
+  vérifié (check_health) avant d'être prêté, et recréé s'il est mort
+- version : les appelants passent les credentials chiffrés du compte ; s'ils
+  ont changé (modifiés via l'API, qui tourne dans un autre process), les
+  connecteurs ouverts avec les anciens sont fermés
+
+Usage:
+    pool = get_connector_pool()
+    with pool.connection(account_id, lambda: ImapConnector(email, creds), version=encrypted) as connector:
+        connector.move_email(uid, "Archive")
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional
+
+from .base import BaseEmailConnector
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectorPoolTimeout(Exception):
+    """Aucun connecteur disponible pour le compte avant le timeout."""
+    pass
+
+
+@dataclass
+class _PooledConnector:
+    """Connecteur géré par le pool."""
+    connector: BaseEmailConnector
+    account_id: int
+    last_used: float = field(default_factory=time.monotonic)
+    invalidated: bool = False
+
+
+class ConnectorPool:
+    """
+    Pool thread-safe de connecteurs connectés, indexé par ID de compte.
+    """
+
+    def __init__(
+        self,
+        max_per_account: int = 2,
+        idle_timeout: float = 300,
+        health_check_interval: float = 60,
+        acquire_timeout: float = 30
+    ):
+        """
+        Initialiser le pool.
+
+        Args:
+            max_per_account: Nombre max de connecteurs ouverts par compte
+            idle_timeout: Secondes d'inactivité avant fermeture
+            health_check_interval: Secondes d'inactivité avant vérification
+            acquire_timeout: Secondes d'attente max d'un connecteur libre
+        """
+        self.max_per_account = max_per_account
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+
+        self._cond = threading.Condition()
+        self._idle: Dict[int, List[_PooledConnector]] = {}
+        self._leased: Dict[int, _PooledConnector] = {}
+        self._sizes: Dict[int, int] = {}
+        self._versions: Dict[int, str] = {}
+
+    def acquire(
+        self,
+        account_id: int,
+        factory: Callable[[], BaseEmailConnector],
+        version: Optional[str] = None
+    ) -> BaseEmailConnector:
+        """
+        Emprunter un connecteur connecté pour un compte.
+
+        Réutilise le connecteur libre le plus récent, sinon en crée un via
+        factory() puis connect() si le plafond du compte n'est pas atteint,
+        sinon attend qu'un connecteur soit rendu.
+
+        Args:
+            account_id: ID du compte
+            factory: Crée un connecteur (non connecté) pour le compte
+            version: Version des credentials du compte (ex: credentials
+                chiffrés) ; les connecteurs d'une autre version sont fermés
+
+        Returns:
+            Connecteur connecté, à rendre avec release()
+
+        Raises:
+            ConnectorPoolTimeout: Si aucun connecteur n'est libéré à temps
+        """
+        deadline = time.monotonic() + self.acquire_timeout
+        expired: List[_PooledConnector] = []
+        entry = None
+
+        try:
+            with self._cond:
+                expired.extend(self._evict_idle_locked())
+                if version is not None:
+                    if self._versions.get(account_id, version) != version:
+                        logger.info(f"Credentials changed for account {account_id}, closing pooled connectors")
+                        expired.extend(self._invalidate_locked(account_id))
+                    self._versions[account_id] = version
+                while True:
+                    idle = self._idle.get(account_id)
+                    if idle:
+                        entry = idle.pop()
+                        break
+                    if self._sizes.get(account_id, 0) < self.max_per_account:
+                        self._sizes[account_id] = self._sizes.get(account_id, 0) + 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise ConnectorPoolTimeout(
+                            f"No connector available for account {account_id} "
+                            f"after {self.acquire_timeout}s"
+                        )
+                    self._cond.wait(remaining)
+        finally:
+            self._close(expired)
+
+        if entry is not None:
+            idle_for = time.monotonic() - entry.last_used
+            if idle_for < self.health_check_interval or self._is_healthy(entry.connector):
+                with self._cond:
+                    self._leased[id(entry.connector)] = entry
+                return entry.connector
+            # Connexion morte : on garde la place et on en ouvre une nouvelle
+            logger.info(f"Pooled connector for account {account_id} failed health check, reconnecting")
+            self._close([entry])
+
+        try:
+            connector = factory()
+            connector.connect()
+        except BaseException:
+            with self._cond:
+                self._sizes[account_id] -= 1
+                self._cond.notify_all()
+            raise
+
+        with self._cond:
+            self._leased[id(connector)] = _PooledConnector(connector, account_id)
+        return connector
+
+    def release(self, connector: BaseEmailConnector, discard: bool = False) -> None:
+        """
+        Rendre un connecteur au pool.
+
+        Args:
+            connector: Connecteur obtenu via acquire()
+            discard: Fermer le connecteur au lieu de le garder (état inconnu)
+        """
+        to_close = []
+        with self._cond:
+            entry = self._leased.pop(id(connector), None)
+            if entry is None:
+                return
+
+            if discard or entry.invalidated:
+                self._sizes[entry.account_id] -= 1
+                to_close.append(entry)
+            else:
+                entry.last_used = time.monotonic()
+                self._idle.setdefault(entry.account_id, []).append(entry)
+            self._cond.notify_all()
+
+        self._close(to_close)
+
+    @contextmanager
+    def connection(
+        self,
+        account_id: int,
+        factory: Callable[[], BaseEmailConnector],
+        version: Optional[str] = None
+    ) -> Iterator[BaseEmailConnector]:
+        """
+        Emprunter un connecteur le temps d'un bloc with.
+
+        Le connecteur est fermé (et non rendu) si le bloc lève une exception.
+
+        Args:
+            account_id: ID du compte
+            factory: Crée un connecteur (non connecté) pour le compte
+            version: Version des credentials du compte (voir acquire)
+
+        Yields:
+            Connecteur connecté
+        """
+        connector = self.acquire(account_id, factory, version)
+        try:
+            yield connector
+        except BaseException:
+            self.release(connector, discard=True)
+            raise
+        self.release(connector)
+
+    def invalidate(self, account_id: int) -> None:
+        """
+        Fermer les connecteurs d'un compte (ex: credentials modifiés).
+
+        Les connecteurs actuellement prêtés seront fermés à leur retour.
+
+        Args:
+            account_id: ID du compte
+        """
+        with self._cond:
+            to_close = self._invalidate_locked(account_id)
+            self._versions.pop(account_id, None)
+            self._cond.notify_all()
+
+        self._close(to_close)
+
+    def set_version(self, account_id: int, version: str) -> None:
+        """
+        Enregistrer une nouvelle version des credentials sans fermer les
+        connecteurs (ex: token OAuth2 refresh par un connecteur du pool).
+
+        Args:
+            account_id: ID du compte
+            version: Nouvelle version (voir acquire)
+        """
+        with self._cond:
+            self._versions[account_id] = version
+
+    def close_all(self) -> None:
+        """Fermer tous les connecteurs (arrêt du process worker)."""
+        with self._cond:
+            to_close = [entry for idle in self._idle.values() for entry in idle]
+            self._idle.clear()
+            for entry in to_close:
+                self._sizes[entry.account_id] -= 1
+            for entry in self._leased.values():
+                entry.invalidated = True
+            self._cond.notify_all()
+
+        if to_close:
+            logger.info(f"Closing {len(to_close)} pooled connectors")
+        self._close(to_close)
+
+    def stats(self) -> Dict[int, Dict[str, int]]:
+        """
+        Compter les connecteurs par compte.
+
+        Returns:
+            Dict {account_id: {"idle": int, "leased": int}}
+        """
+        with self._cond:
+            return {
+                account_id: {
+                    'idle': len(self._idle.get(account_id, [])),
+                    'leased': size - len(self._idle.get(account_id, []))
+                }
+                for account_id, size in self._sizes.items()
+                if size
+            }
+
+    def _invalidate_locked(self, account_id: int) -> List[_PooledConnector]:
+        """Retirer les connecteurs libres d'un compte et marquer ceux prêtés (verrou tenu)."""
+        to_close = self._idle.pop(account_id, [])
+        self._sizes[account_id] = self._sizes.get(account_id, 0) - len(to_close)
+        for entry in self._leased.values():
+            if entry.account_id == account_id:
+                entry.invalidated = True
+        return to_close
+
+    def _evict_idle_locked(self) -> List[_PooledConnector]:
+        """Retirer les connecteurs inactifs depuis plus de idle_timeout (verrou tenu)."""
+        now = time.monotonic()
+        expired = []
+        for account_id, idle in self._idle.items():
+            keep = []
+            for entry in idle:
+                if now - entry.last_used < self.idle_timeout:
+                    keep.append(entry)
+                else:
+                    expired.append(entry)
+                    self._sizes[account_id] -= 1
+            idle[:] = keep
+        return expired
+
+    @staticmethod
+    def _is_healthy(connector: BaseEmailConnector) -> bool:
+        try:
+            return connector.check_health()
+        except Exception as e:
+            logger.debug(f"Health check failed: {e}")
+            return False
+
+    @staticmethod
+    def _close(entries: List[_PooledConnector]) -> None:
+        for entry in entries:
+            try:
+                entry.connector.disconnect()
+            except Exception as e:
+                logger.warning(f"Error closing pooled connector for account {entry.account_id}: {e}")
+
+
+_pool: Optional[ConnectorPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_connector_pool() -> ConnectorPool:
+    """
+    Obtenir le pool du process courant (créé au premier appel).
+
+    Returns:
+        ConnectorPool configuré via les settings CONNECTOR_POOL_*
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                from shared.config import settings
+                _pool = ConnectorPool(
+                    max_per_account=settings.CONNECTOR_POOL_MAX_PER_ACCOUNT,
+                    idle_timeout=settings.CONNECTOR_POOL_IDLE_TIMEOUT,
+                    health_check_interval=settings.CONNECTOR_POOL_HEALTH_CHECK_INTERVAL,
+                    acquire_timeout=settings.CONNECTOR_POOL_ACQUIRE_TIMEOUT
+                )
+    return _pool
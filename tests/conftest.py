@@ -14,6 +14,15 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def reset_connector_pool():
+    """Empty the worker connector pool so mocked connectors don't leak between tests."""
+    from shared.integrations import get_connector_pool
+    pool = get_connector_pool()
+    yield pool
+    pool.close_all()
+
+
 # Les fixtures seront implémentées au fur et à mesure
 # Exemples de fixtures utiles:
 
@@ -0,0 +1,188 @@
+"""
+Tests for the Redis-backed classification cache.
+"""
+import json
+from unittest.mock import patch
+
+import httpx
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from api.models import EmailCategory
+from worker.classifiers.backends import LLMBackend, LLMRouter
+from worker.classifiers.cache import ClassificationCache, extract_sender_address, normalize_text
+from worker.classifiers.ollama_classifier import EmailClassifier
+
+
+class FakeRedis:
+    """In-memory stand-in for the few redis.asyncio commands the cache uses."""
+
+    def __init__(self):
+        self.values = {}
+        self.zsets = {}
+        self.hashes = {}
+        self.fail = False
+
+    def _check(self):
+        if self.fail:
+            raise RedisConnectionError("Connection refused")
+
+    async def get(self, key):
+        self._check()
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self._check()
+        self.values[key] = value
+
+    async def zadd(self, name, mapping):
+        self.zsets.setdefault(name, {}).update(mapping)
+
+    async def zcard(self, name):
+        return len(self.zsets.get(name, {}))
+
+    async def zpopmin(self, name, count):
+        zset = self.zsets.get(name, {})
+        popped = sorted(zset.items(), key=lambda item: item[1])[:count]
+        for member, _ in popped:
+            del zset[member]
+        return popped
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    async def hincrby(self, name, field, amount):
+        counters = self.hashes.setdefault(name, {})
+        counters[field] = counters.get(field, 0) + amount
+
+    async def hgetall(self, name):
+        return dict(self.hashes.get(name, {}))
+
+    async def aclose(self):
+        pass
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((getattr(self.redis, name), args, kwargs))
+        return queue
+
+    async def execute(self):
+        return [await method(*args, **kwargs) for method, args, kwargs in self.calls]
+
+
+@pytest.fixture
+def fake_redis():
+    redis = FakeRedis()
+    with patch('worker.classifiers.cache.aioredis.Redis.from_url', return_value=redis):
+        yield redis
+
+
+def _key(cache, subject, sender="News <news@acme.com>", body="Cette semaine"):
+    return cache.make_key(subject, sender, body, False, None, "mistral", "2")
+
+
+def test_cache_key_normalizes_sender_and_numbers():
+    """Test that near-identical emails from the same sender share a key."""
+    cache = ClassificationCache("redis://localhost")
+
+    assert extract_sender_address('"ACME" <Billing@ACME.com>') == "billing@acme.com"
+    assert normalize_text("Commande  N°12345 ") == "commande n°#"
+    assert _key(cache, "Commande 12345") == _key(cache, "Commande 67890", sender="news@ACME.com")
+    assert _key(cache, "Commande 12345") != _key(cache, "Facture 12345")
+    assert _key(cache, "Hebdo") != cache.make_key("Hebdo", "news@acme.com", "Cette semaine", False, None, "phi3", "2")
+
+
+@pytest.mark.asyncio
+async def test_cache_round_trip_counts_hits_and_evicts_lru(fake_redis):
+    """Test set/get, hit/miss counters and eviction of the least recently used entry."""
+    cache = ClassificationCache("redis://localhost", max_entries=2)
+    invoice = {'category': EmailCategory.INVOICE, 'confidence': 90, 'reason': 'Facture'}
+    cached = {**invoice, 'source': 'cache'}
+    first, second, third = _key(cache, "Un"), _key(cache, "Deux"), _key(cache, "Trois")
+
+    assert await cache.get(first) is None
+    await cache.set(first, invoice)
+    await cache.set(second, invoice)
+    assert await cache.get(first) == cached  # first becomes most recently used
+    await cache.set(third, invoice)
+
+    assert await cache.get(second) is None
+    assert await cache.get(first) == cached
+    assert await cache.stats() == {'hits': 2, 'misses': 2, 'entries': 2}
+
+
+@pytest.mark.asyncio
+async def test_classifier_skips_llm_on_cache_hit_and_fails_open(fake_redis):
+    """Test that a repeat email is served from the cache and Redis errors fall back to the LLM."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        answer = {"category": "newsletter", "confidence": 80, "reason": "Lettre hebdo"}
+        return httpx.Response(200, json={"message": {"role": "assistant", "content": json.dumps(answer)}})
+
+    with patch('worker.classifiers.ollama_classifier.settings.CLASSIFICATION_CACHE_ENABLED', True):
+        clf = EmailClassifier()
+    clf._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    first = await clf.classify_email("Hebdo n°41", "news@acme.com", "Cette semaine")
+    second = await clf.classify_email("Hebdo n°42", "News <news@acme.com>", "Cette semaine")
+    assert first == {**second, 'source': 'llm'}
+    assert second['source'] == 'cache'
+    assert len(requests) == 1
+
+    fake_redis.fail = True
+    third = await clf.classify_email("Autre", "news@acme.com", "Autre contenu")
+    assert third['category'] == EmailCategory.NEWSLETTER
+    assert len(requests) == 2
+
+    await clf.close_client()
+
+
+class AnsweringBackend(LLMBackend):
+    """Backend returning a fixed classification with a given model."""
+
+    def __init__(self, name, model, fallback=False, fail=False):
+        super().__init__(name, fallback=fallback)
+        self.model = model
+        self.fail = fail
+
+    async def complete(self, system, prompt, num_predict, schema=None):
+        if self.fail:
+            raise httpx.ConnectError("connection refused")
+        return json.dumps({"category": "invoice", "confidence": 90, "reason": self.name})
+
+
+@pytest.mark.asyncio
+async def test_classifier_caches_only_answers_from_the_primary_model(fake_redis):
+    """Test that an answer from a fallback or another model is not cached under the primary model key."""
+    with patch('worker.classifiers.ollama_classifier.settings.CLASSIFICATION_CACHE_ENABLED', True):
+        clf = EmailClassifier()
+    local = AnsweringBackend("local", clf.model, fail=True)
+    clf.router = LLMRouter([local, AnsweringBackend("cloud", "claude", fallback=True)], hedge_after=0)
+
+    first = await clf.classify_email("Facture 12", "billing@acme.com", "Total")
+    assert first['reason'] == "cloud"
+    assert fake_redis.values == {}
+
+    local.fail = False
+    await clf.classify_email("Facture 13", "billing@acme.com", "Total")
+    cached = await clf.classify_email("Facture 14", "billing@acme.com", "Total")
+    assert cached['source'] == 'cache'
+    assert cached['reason'] == "local"
@@ -0,0 +1,65 @@
+"""
+Tests for the adaptive LLM concurrency limiter.
+"""
+import asyncio
+
+import pytest
+
+from worker.classifiers.limiter import AdaptiveLimiter
+
+
+@pytest.mark.asyncio
+async def test_limiter_caps_in_flight_requests():
+    """Test that no more than `limit` requests run at the same time."""
+    limiter = AdaptiveLimiter(max_limit=2, initial_limit=2, target_latency=10.0)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(call() for _ in range(6)))
+
+    assert peak == 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_shrinks_once_per_window_on_slow_responses():
+    """Test that concurrent slow responses halve the window only once."""
+    limiter = AdaptiveLimiter(max_limit=8, initial_limit=8, target_latency=0.001)
+
+    async def call():
+        async with limiter.slot():
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(call() for _ in range(8)))
+
+    assert int(limiter.limit) == 4
+
+
+@pytest.mark.asyncio
+async def test_limiter_shrinks_on_error():
+    """Test that a failed request reduces the window and propagates the error."""
+    limiter = AdaptiveLimiter(max_limit=4, initial_limit=4)
+
+    with pytest.raises(RuntimeError):
+        async with limiter.slot():
+            raise RuntimeError("ollama down")
+
+    assert int(limiter.limit) == 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_grows_on_fast_responses():
+    """Test that fast responses widen the window up to max_limit."""
+    limiter = AdaptiveLimiter(max_limit=3, initial_limit=1, target_latency=10.0)
+
+    for _ in range(10):
+        async with limiter.slot():
+            pass
+
+    assert int(limiter.limit) == 3
@@ -0,0 +1,117 @@
+"""
+Tests for the per-account connector pool.
+"""
+import pytest
+from unittest.mock import Mock
+
+from shared.integrations import ConnectorPool, ConnectorPoolTimeout
+
+
+def _factory(created):
+    def factory():
+        connector = Mock()
+        connector.check_health.return_value = True
+        created.append(connector)
+        return connector
+    return factory
+
+
+def test_connector_is_reused_between_leases():
+    """Test that a released connector is handed out again without reconnecting."""
+    pool = ConnectorPool()
+    created = []
+
+    with pool.connection(1, _factory(created)) as first:
+        pass
+    with pool.connection(1, _factory(created)) as second:
+        pass
+
+    assert first is second
+    assert len(created) == 1
+    first.connect.assert_called_once()
+    first.disconnect.assert_not_called()
+
+
+def test_max_per_account_is_enforced():
+    """Test that acquiring beyond the per-account cap times out."""
+    pool = ConnectorPool(max_per_account=1, acquire_timeout=0.01)
+    created = []
+
+    pool.acquire(1, _factory(created))
+    with pytest.raises(ConnectorPoolTimeout):
+        pool.acquire(1, _factory(created))
+
+    # Another account is not affected
+    pool.acquire(2, _factory(created))
+    assert len(created) == 2
+
+
+def test_failed_block_discards_connector():
+    """Test that a connector is closed instead of pooled when its block raises."""
+    pool = ConnectorPool()
+    created = []
+
+    with pytest.raises(RuntimeError):
+        with pool.connection(1, _factory(created)):
+            raise RuntimeError("boom")
+
+    created[0].disconnect.assert_called_once()
+    with pool.connection(1, _factory(created)):
+        pass
+    assert len(created) == 2
+
+
+def test_unhealthy_connector_is_replaced():
+    """Test that an idle connector failing its health check is reconnected."""
+    pool = ConnectorPool(health_check_interval=0)
+    created = []
+
+    with pool.connection(1, _factory(created)) as first:
+        pass
+    first.check_health.return_value = False
+
+    with pool.connection(1, _factory(created)) as second:
+        pass
+
+    assert second is not first
+    first.disconnect.assert_called_once()
+    assert pool.stats() == {1: {'idle': 1, 'leased': 0}}
+
+
+def test_idle_connectors_expire():
+    """Test that connectors idle longer than idle_timeout are closed."""
+    pool = ConnectorPool(idle_timeout=0)
+    created = []
+
+    with pool.connection(1, _factory(created)):
+        pass
+    with pool.connection(1, _factory(created)):
+        pass
+
+    assert len(created) == 2
+    created[0].disconnect.assert_called_once()
+
+
+def test_changed_credentials_close_pooled_connectors():
+    """Test that connectors opened with older credentials are not handed out again."""
+    pool = ConnectorPool()
+    created = []
+
+    idle = pool.acquire(1, _factory(created), version="creds-v1")
+    leased = pool.acquire(1, _factory(created), version="creds-v1")
+    pool.release(idle)
+
+    with pool.connection(1, _factory(created), version="creds-v2") as current:
+        pass
+
+    assert current not in (idle, leased)
+    idle.disconnect.assert_called_once()
+    # The connector leased before the change is closed when it comes back
+    pool.release(leased)
+    leased.disconnect.assert_called_once()
+
+    # A version recorded by the pool's own token refresh keeps the connector
+    pool.set_version(1, "creds-v3")
+    with pool.connection(1, _factory(created), version="creds-v3") as refreshed:
+        pass
+    assert refreshed is current
@@ -14,6 +14,13 @@
 )
 
 
+@pytest.fixture(autouse=True)
+def no_sender_history():
+    """Bulk classification tests start without any sender history."""
+    with patch('worker.actions.email_actions.load_sender_classifications', AsyncMock(return_value={})) as mock:
+        yield mock
+
+
 @pytest.fixture
 def mock_email():
     """Create a mock email for testing."""
@@ -142,38 +149,31 @@ async def test_bulk_move_emails_success():
          patch('worker.actions.email_actions._get_connector_for_account') as mock_connector:
 
         # Setup mock emails and account
-        mock_emails = []
+        mock_emails = {}
         for i in email_ids:
             email = Mock()
             email.id = i
-            email.message_id = f"msg_{i}"
+            email.provider_id = f"uid-{i}"
             email.account_id = 1
-            mock_emails.append(email)
+            mock_emails[i] = email
 
         mock_account = Mock()
         mock_account.id = 1
         mock_account.account_type = AccountType.IMAP
 
         # Setup DB mock
-        mock_db_session = AsyncMock()
-        call_count = [0]
-
         def get_side_effect(model, id):
-            if model == Email:
-                return mock_emails[call_count[0]]
-            else:
-                return mock_account
+            return mock_emails[id] if model == Email else mock_account
 
+        mock_db_session = AsyncMock()
         mock_db_session.get = AsyncMock(side_effect=get_side_effect)
+        mock_db_session.add = Mock()
         mock_db_session.commit = AsyncMock()
-        mock_db.__aenter__ = AsyncMock(return_value=mock_db_session)
-        mock_db.__aexit__ = AsyncMock()
+        mock_db.return_value.__aenter__.return_value = mock_db_session
 
         # Mock connector
         mock_conn = Mock()
-        mock_conn.connect = Mock()
-        mock_conn.disconnect = Mock()
-        mock_conn.move_email = Mock(return_value=True)
+        mock_conn.move_emails = Mock(side_effect=lambda ids, folder: {i: True for i in ids})
         mock_connector.return_value = mock_conn
 
         # Execute
@@ -181,56 +181,50 @@ def get_side_effect(model, id):
 
         # Assertions
         assert result['status'] == 'success'
-        assert len(result['succeeded']) == 3
+        assert result['succeeded'] == [1, 2, 3]
         assert len(result['failed']) == 0
         assert result['total'] == 3
+        # One provider call for the whole account, one commit
+        mock_conn.move_emails.assert_called_once_with(['uid-1', 'uid-2', 'uid-3'], target_folder)
+        mock_db_session.commit.assert_awaited_once()
+        assert mock_emails[2].status == ProcessingStatus.ARCHIVED
 
 
 @pytest.mark.asyncio
 async def test_bulk_move_emails_partial_failure():
     """Test bulk move with some failures."""
-    email_ids = [1, 2, 3]
+    email_ids = [1, 2, 3, 4]
     target_folder = "Archive"
 
     with patch('worker.actions.email_actions.get_db_context') as mock_db, \
          patch('worker.actions.email_actions._get_connector_for_account') as mock_connector:
 
-        # Setup mock emails
-        mock_emails = []
+        # Setup mock emails: 1-3 on account 1, 4 on a missing account
+        mock_emails = {}
         for i in email_ids:
             email = Mock()
             email.id = i
-            email.message_id = f"msg_{i}"
-            email.account_id = 1
-            mock_emails.append(email)
+            email.provider_id = f"uid-{i}"
+            email.account_id = 1 if i < 4 else 2
+            mock_emails[i] = email
 
         mock_account = Mock()
         mock_account.id = 1
 
-        call_count = [0]
-
         def get_side_effect(model, id):
-            result = mock_emails[call_count[0]] if model == Email else mock_account
-            call_count[0] += 1
-            return result
+            if model == Email:
+                return mock_emails[id]
+            return mock_account if id == 1 else None
 
         mock_db_session = AsyncMock()
         mock_db_session.get = AsyncMock(side_effect=get_side_effect)
+        mock_db_session.add = Mock()
         mock_db_session.commit = AsyncMock()
-        mock_db.__aenter__ = AsyncMock(return_value=mock_db_session)
-        mock_db.__aexit__ = AsyncMock()
+        mock_db.return_value.__aenter__.return_value = mock_db_session
 
         # Mock connector - fails on second email
         mock_conn = Mock()
-        mock_conn.connect = Mock()
-        mock_conn.disconnect = Mock()
-        move_count = [0]
-
-        def move_side_effect(*args):
-            move_count[0] += 1
-            return move_count[0] != 2  # Fail on second call
-
-        mock_conn.move_email = Mock(side_effect=move_side_effect)
+        mock_conn.move_emails = Mock(return_value={'uid-1': True, 'uid-2': False, 'uid-3': True})
         mock_connector.return_value = mock_conn
 
         # Execute
@@ -238,9 +232,13 @@ def move_side_effect(*args):
 
         # Assertions
         assert result['status'] == 'partial'
-        assert len(result['succeeded']) == 2
-        assert len(result['failed']) == 1
-        assert result['total'] == 3
+        assert result['succeeded'] == [1, 3]
+        assert result['failed'] == [
+            {'email_id': 2, 'error': 'Move operation failed'},
+            {'email_id': 4, 'error': 'Account not found'}
+        ]
+        assert result['total'] == 4
+        mock_conn.move_email.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -325,11 +323,14 @@ async def test_bulk_classify_pending_emails():
     with patch('worker.actions.email_actions.get_db_context') as mock_db, \
          patch('worker.actions.email_actions.rules_parser') as mock_rules, \
          patch('worker.actions.email_actions.classifier') as mock_classifier, \
-         patch('worker.actions.email_actions.apply_classification_action') as mock_apply:
+         patch('worker.actions.email_actions.record_sender_classifications', AsyncMock()), \
+         patch('worker.actions.email_actions._get_connector_for_account') as mock_connector:
 
         # Setup mock emails
         mock_email1 = Mock(spec=Email)
         mock_email1.id = 1
+        mock_email1.account_id = 1
+        mock_email1.provider_id = "101"
         mock_email1.subject = "Invoice #123"
         mock_email1.sender = "billing@company.com"
         mock_email1.body_preview = "Invoice for services"
@@ -337,6 +338,8 @@ async def test_bulk_classify_pending_emails():
 
         mock_email2 = Mock(spec=Email)
         mock_email2.id = 2
+        mock_email2.account_id = 1
+        mock_email2.provider_id = "102"
         mock_email2.subject = "Newsletter"
         mock_email2.sender = "news@company.com"
         mock_email2.body_preview = "Weekly newsletter"
@@ -348,26 +351,32 @@ async def test_bulk_classify_pending_emails():
 
         mock_db_session = AsyncMock()
         mock_db_session.execute = AsyncMock(return_value=mock_result)
+        mock_db_session.get = AsyncMock(return_value=Mock(id=1))
+        mock_db_session.add = Mock()
         mock_db_session.commit = AsyncMock()
-        mock_db.__aenter__ = AsyncMock(return_value=mock_db_session)
-        mock_db.__aexit__ = AsyncMock()
+        mock_db.return_value.__aenter__.return_value = mock_db_session
 
         # Mock rule matching - first email matches rule
         mock_rule = Mock()
         mock_rule.name = "Invoice by subject"
         mock_rule.category = EmailCategory.INVOICE
+        mock_rule.folder = "Finance/Invoices"
+        mock_rule.auto_delete = False
 
         mock_rules.find_matching_rule.side_effect = [mock_rule, None]
 
         # Mock LLM classification for second email
+        mock_classifier.warm_up = AsyncMock(return_value=True)
         mock_classifier.classify_email = AsyncMock(return_value={
             'category': EmailCategory.NEWSLETTER,
             'confidence': 85,
             'reason': 'Newsletter pattern detected'
         })
 
-        # Mock action application
-        mock_apply.return_value = {'status': 'success'}
+        # Mock connector
+        mock_conn = Mock()
+        mock_conn.move_emails = Mock(side_effect=lambda ids, folder: {i: True for i in ids})
+        mock_connector.return_value = mock_conn
 
         # Execute
         result = await bulk_classify_pending_emails(limit=100)
@@ -377,6 +386,234 @@ async def test_bulk_classify_pending_emails():
         assert result['processed'] == 2
         assert result['classified'] == 2
         assert result['errors'] == 0
+        assert result['actions_applied'] == 2
+        mock_conn.move_emails.assert_any_call(['101'], "Finance/Invoices")
+        mock_conn.move_emails.assert_any_call(['102'], "Newsletters")
+        assert mock_email2.archived_folder == "Newsletters"
+        assert mock_email2.status == ProcessingStatus.CLASSIFIED
+
+
+@pytest.mark.asyncio
+async def test_bulk_classify_groups_actions_per_account_and_folder():
+    """Test that actions are executed as one provider call per (account, action, folder)."""
+    with patch('worker.actions.email_actions.get_db_context') as mock_db, \
+         patch('worker.actions.email_actions.rules_parser') as mock_rules, \
+         patch('worker.actions.email_actions.classifier') as mock_classifier, \
+         patch('worker.actions.email_actions._get_connector_for_account') as mock_connector:
+
+        categories = [EmailCategory.NEWSLETTER, EmailCategory.NEWSLETTER, EmailCategory.SPAM,
+                      EmailCategory.SPAM, EmailCategory.PERSONAL]
+        emails = []
+        for i, _ in enumerate(categories):
+            email = Mock(spec=Email)
+            email.id = i
+            email.account_id = 1
+            email.provider_id = f"uid-{i}"
+            email.subject = f"Subject {i}"
+            email.sender = "sender@example.com"
+            email.body_preview = ""
+            email.has_attachments = False
+            emails.append(email)
+
+        mock_result = Mock()
+        mock_result.scalars.return_value.all.return_value = emails
+
+        mock_db_session = AsyncMock()
+        mock_db_session.execute = AsyncMock(return_value=mock_result)
+        mock_db_session.get = AsyncMock(return_value=Mock(id=1))
+        mock_db_session.add = Mock()
+        mock_db_session.commit = AsyncMock()
+        mock_db.return_value.__aenter__.return_value = mock_db_session
+
+        mock_rules.find_matching_rule.return_value = None
+        mock_classifier.warm_up = AsyncMock(return_value=True)
+        mock_classifier.classify_email = AsyncMock(side_effect=[
+            {'category': category, 'confidence': 90, 'reason': 'test'} for category in categories
+        ])
+
+        mock_conn = Mock()
+        mock_conn.move_emails = Mock(return_value={'uid-0': True, 'uid-1': False})
+        mock_conn.delete_emails = Mock(return_value={'uid-2': True, 'uid-3': True})
+        mock_connector.return_value = mock_conn
+
+        result = await bulk_classify_pending_emails(limit=100)
+
+        mock_conn.move_emails.assert_called_once_with(['uid-0', 'uid-1'], "Newsletters")
+        mock_conn.delete_emails.assert_called_once_with(['uid-2', 'uid-3'], permanent=False)
+        assert result['actions_applied'] == 3
+        assert result['actions_failed'] == 1
+        # One commit for the stale-row sweep, one for classifications, one for action results
+        assert mock_db_session.commit.await_count == 3
+        assert emails[2].is_deleted is True
+
+
+@pytest.mark.asyncio
+async def test_bulk_classify_sends_llm_emails_in_batches():
+    """Test that emails without a rule match go to the LLM OLLAMA_BATCH_SIZE per prompt."""
+    with patch('worker.actions.email_actions.get_db_context') as mock_db, \
+         patch('worker.actions.email_actions.rules_parser') as mock_rules, \
+         patch('worker.actions.email_actions.classifier') as mock_classifier, \
+         patch('worker.actions.email_actions._get_connector_for_account') as mock_connector, \
+         patch('worker.actions.email_actions.settings.OLLAMA_BATCH_SIZE', 3):
+
+        emails = []
+        for i in range(5):
+            email = Mock(spec=Email)
+            email.id = i
+            email.account_id = 1
+            email.provider_id = f"uid-{i}"
+            email.subject = f"Subject {i}"
+            email.sender = "sender@example.com"
+            email.body_preview = ""
+            email.has_attachments = False
+            emails.append(email)
+
+        mock_result = Mock()
+        mock_result.scalars.return_value.all.return_value = emails
+
+        mock_db_session = AsyncMock()
+        mock_db_session.execute = AsyncMock(return_value=mock_result)
+        mock_db_session.commit = AsyncMock()
+        mock_db.return_value.__aenter__.return_value = mock_db_session
+
+        mock_rules.find_matching_rule.return_value = None
+        personal = {'category': EmailCategory.PERSONAL, 'confidence': 90, 'reason': 'test'}
+        mock_classifier.warm_up = AsyncMock(return_value=True)
+        mock_classifier.classify_batch = AsyncMock(side_effect=lambda batch, **kwargs: [personal] * len(batch))
+
+        result = await bulk_classify_pending_emails(limit=100)
+
+        assert result['classified'] == 5
+        assert [len(call.args[0]) for call in mock_classifier.classify_batch.await_args_list] == [3, 2]
+        mock_classifier.warm_up.assert_awaited_once()
+        mock_classifier.classify_email.assert_not_called()
+        mock_connector.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_bulk_classify_uses_sender_history_fast_path(no_sender_history):
+    """Test that a sender with a consistent history is classified without the LLM."""
+    with patch('worker.actions.email_actions.get_db_context') as mock_db, \
+         patch('worker.actions.email_actions.rules_parser') as mock_rules, \
+         patch('worker.actions.email_actions.classifier') as mock_classifier, \
+         patch('worker.actions.email_actions.record_sender_classifications', AsyncMock()) as mock_record:
+
+        known = Mock(spec=Email)
+        known.id, known.account_id, known.provider_id = 1, 1, None
+        known.subject, known.sender = "Hebdo", "Acme News <news@acme.com>"
+        known.body_preview, known.has_attachments = "", False
+
+        novel = Mock(spec=Email)
+        novel.id, novel.account_id, novel.provider_id = 2, 1, None
+        novel.subject, novel.sender = "Bonjour", "friend@example.com"
+        novel.body_preview, novel.has_attachments = "", False
+
+        mock_result = Mock()
+        mock_result.scalars.return_value.all.return_value = [known, novel]
+        mock_db_session = AsyncMock()
+        mock_db_session.execute = AsyncMock(return_value=mock_result)
+        mock_db.return_value.__aenter__.return_value = mock_db_session
+
+        mock_rules.find_matching_rule.return_value = None
+        no_sender_history.return_value = {
+            (1, 'news@acme.com'): {'category': EmailCategory.PERSONAL, 'confidence': 90,
+                              'reason': 'Sender history', 'source': 'sender_stats'}
+        }
+        mock_classifier.warm_up = AsyncMock(return_value=True)
+        mock_classifier.classify_email = AsyncMock(return_value={
+            'category': EmailCategory.PERSONAL, 'confidence': 85, 'reason': 'Ami', 'source': 'llm'
+        })
+
+        result = await bulk_classify_pending_emails(limit=100)
+
+        assert result['classified'] == 2
+        assert known.classification_reason == 'Sender history'
+        mock_classifier.classify_email.assert_awaited_once()
+        assert mock_classifier.classify_email.await_args.kwargs['sender'] == "friend@example.com"
+        # Only the LLM result feeds the sender statistics
+        counts = mock_record.await_args.args[1]
+        assert counts == {(1, 'friend@example.com', EmailCategory.PERSONAL): [1, 85]}
+
+
+@pytest.mark.asyncio
+async def test_bulk_classify_requeues_stale_processing_emails():
+    """Test that emails left PROCESSING by an interrupted run are put back to PENDING."""
+    with patch('worker.actions.email_actions.get_db_context') as mock_db, \
+         patch('worker.actions.email_actions.rules_parser') as mock_rules, \
+         patch('worker.actions.email_actions.classifier') as mock_classifier, \
+         patch('worker.actions.email_actions.settings.CLASSIFY_COMMIT_BATCH_SIZE', 0):
+
+        email = Mock(spec=Email)
+        email.id, email.account_id, email.provider_id = 1, 1, None
+        email.subject, email.sender = "Bonjour", "friend@example.com"
+        email.body_preview, email.has_attachments = "", False
+
+        sweep_result = Mock(rowcount=2)
+        select_result = Mock()
+        select_result.scalars.return_value.all.return_value = [email]
+
+        mock_db_session = AsyncMock()
+        mock_db_session.execute = AsyncMock(side_effect=[sweep_result, select_result, Mock()])
+        mock_db.return_value.__aenter__.return_value = mock_db_session
+
+        mock_rules.find_matching_rule.return_value = None
+        mock_classifier.warm_up = AsyncMock(return_value=True)
+        mock_classifier.classify_email = AsyncMock(return_value={
+            'category': EmailCategory.PERSONAL, 'confidence': 85, 'reason': 'Ami'
+        })
+
+        # CLASSIFY_COMMIT_BATCH_SIZE=0 commits after every email instead of failing
+        result = await bulk_classify_pending_emails(limit=100)
+
+        assert result['status'] == 'success'
+        assert result['classified'] == 1
+        sweep = mock_db_session.execute.await_args_list[0].args[0]
+        compiled = sweep.compile()
+        assert str(compiled).startswith("UPDATE emails SET status=")
+        assert compiled.params['status'] == ProcessingStatus.PENDING
+        assert ProcessingStatus.PROCESSING in compiled.params.values()
+
+
+@pytest.mark.asyncio
+async def test_bulk_classify_llm_outage_shrinks_concurrency():
+    """Test that an LLM outage reaches the limiter before becoming an UNKNOWN classification."""
+    from worker.actions.email_actions import AdaptiveLimiter
+    from worker.classifiers.backends import LLMBackendError
+
+    limiters = []
+
+    def make_limiter(**kwargs):
+        limiters.append(AdaptiveLimiter(**kwargs))
+        return limiters[-1]
+
+    with patch('worker.actions.email_actions.get_db_context') as mock_db, \
+         patch('worker.actions.email_actions.rules_parser') as mock_rules, \
+         patch('worker.actions.email_actions.classifier') as mock_classifier, \
+         patch('worker.actions.email_actions.AdaptiveLimiter', side_effect=make_limiter), \
+         patch('worker.actions.email_actions.settings.OLLAMA_MAX_CONCURRENCY', 4):
+
+        email = Mock(spec=Email)
+        email.id, email.account_id, email.provider_id = 1, 1, None
+        email.subject, email.sender = "Bonjour", "friend@example.com"
+        email.body_preview, email.has_attachments = "", False
+
+        mock_result = Mock()
+        mock_result.scalars.return_value.all.return_value = [email]
+        mock_db_session = AsyncMock()
+        mock_db_session.execute = AsyncMock(return_value=mock_result)
+        mock_db.return_value.__aenter__.return_value = mock_db_session
+
+        mock_rules.find_matching_rule.return_value = None
+        mock_classifier.warm_up = AsyncMock(return_value=True)
+        mock_classifier.classify_email = AsyncMock(side_effect=LLMBackendError("ollama: connection refused"))
+
+        result = await bulk_classify_pending_emails(limit=100)
+
+        assert result['classified'] == 1
+        assert email.category == EmailCategory.UNKNOWN
+        assert "connection refused" in email.classification_reason
+        assert mock_classifier.classify_email.await_args.kwargs['raise_unavailable'] is True
+        assert limiters[0].limit == 1
 
 
 if __name__ == '__main__':
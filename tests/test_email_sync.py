@@ -0,0 +1,100 @@
+"""
+Tests for email sync tasks.
+"""
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import Mock, AsyncMock
+
+from api.models import ProcessingStatus
+from shared.integrations import ConnectorPoolTimeout
+from worker.tasks import email_sync
+from worker.tasks.email_sync import _insert_emails
+
+
+def _email_data(message_id: str) -> dict:
+    """Build a connector-style email dict."""
+    return {
+        "message_id": message_id,
+        "subject": f"Subject {message_id}",
+        "sender": "sender@example.com",
+        "date_received": datetime(2025, 1, 20, 10, 0, tzinfo=timezone.utc),
+        "body": "x" * 1000,
+        "has_attachments": False,
+        "attachment_count": 0,
+        "attachments": []
+    }
+
+
+def _db_returning(*batches):
+    """Mock session whose execute() returns the given inserted ids per call."""
+    results = []
+    for ids in batches:
+        result = Mock()
+        result.scalars.return_value.all.return_value = ids
+        results.append(result)
+
+    db = Mock()
+    db.execute = AsyncMock(side_effect=results)
+    return db
+
+
+@pytest.mark.asyncio
+async def test_insert_emails_single_statement():
+    """Test that a batch is inserted with one statement and counts returned ids."""
+    db = _db_returning([10, 11])
+
+    count = await _insert_emails(db, 1, [_email_data("a"), _email_data("b"), _email_data("c")])
+
+    # "c" already existed: ON CONFLICT DO NOTHING returns only inserted ids
+    assert count == 2
+    assert db.execute.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_insert_emails_dedupes_batch_and_chunks(monkeypatch):
+    """Test in-batch duplicates are dropped and large batches are chunked."""
+    monkeypatch.setattr(email_sync, "INSERT_CHUNK_SIZE", 2)
+    db = _db_returning([1, 2], [3])
+
+    emails = [_email_data("a"), _email_data("a"), _email_data("b"), _email_data("c")]
+    count = await _insert_emails(db, 1, emails)
+
+    assert count == 3
+    assert db.execute.await_count == 2
+
+    params = db.execute.await_args_list[0].args[0].compile().params
+    assert params["body_preview_m0"] == "x" * 500
+    # Dates are stored as naive UTC
+    assert params["date_received_m0"].tzinfo is None
+
+
+@pytest.mark.asyncio
+async def test_insert_emails_uses_given_status():
+    """Test that emails are PENDING by default and backfilled ones can skip the pipeline."""
+    db = _db_returning([1], [2])
+
+    await _insert_emails(db, 1, [_email_data("a")])
+    await _insert_emails(db, 1, [_email_data("b")], status=ProcessingStatus.ARCHIVED)
+
+    statuses = [call.args[0].compile().params["status_m0"] for call in db.execute.await_args_list]
+    assert statuses == [ProcessingStatus.PENDING, ProcessingStatus.ARCHIVED]
+
+
+def test_backfill_postponed_when_connector_busy(monkeypatch):
+    """Test that a busy connector re-enqueues the page without flagging the account."""
+    # Helpers are replaced by plain functions, run_async just passes their result through
+    monkeypatch.setattr(email_sync, "run_async", lambda result: result)
+    monkeypatch.setattr(email_sync, "_get_account_details", Mock(return_value={"encrypted_credentials": "c"}))
+    monkeypatch.setattr(email_sync, "_get_backfill_state", Mock(return_value={}))
+    monkeypatch.setattr(email_sync, "_update_account_error", Mock())
+    pool = Mock()
+    pool.acquire.side_effect = ConnectorPoolTimeout("busy")
+    monkeypatch.setattr(email_sync, "get_connector_pool", Mock(return_value=pool))
+    apply_async = Mock()
+    monkeypatch.setattr(email_sync.backfill_account, "apply_async", apply_async)
+
+    result = email_sync.backfill_account.run(7)
+
+    assert result['status'] == 'postponed'
+    apply_async.assert_called_once_with(args=[7, "INBOX", False], countdown=email_sync.settings.BACKFILL_PAGE_DELAY)
+    email_sync._update_account_error.assert_not_called()
@@ -0,0 +1,102 @@
+"""
+Tests for the embedding nearest-neighbour pre-classifier.
+"""
+import pytest
+
+pytest.importorskip("numpy")
+
+from api.models import EmailCategory
+from worker.classifiers.embeddings import EmbeddingIndex, NearestNeighbourClassifier
+
+
+def _classification(category, confidence=90):
+    return {'category': category, 'confidence': confidence, 'reason': 'test'}
+
+
+def _preclassifier(**kwargs):
+    async def embed(text):
+        raise AssertionError("embed should not be called")
+    options = {'k': 3, 'min_similarity': 0.9, 'min_agreement': 0.66}
+    options.update(kwargs)
+    return NearestNeighbourClassifier(embed, **options)
+
+
+def test_index_returns_nearest_by_cosine_and_replaces_oldest():
+    """Test cosine ranking and ring-buffer replacement once the index is full."""
+    index = EmbeddingIndex(max_size=3)
+    index.add([1, 0, 0], EmailCategory.INVOICE)
+    index.add([0, 1, 0], EmailCategory.NEWSLETTER)
+    index.add([0.9, 0.1, 0], EmailCategory.RECEIPT)
+
+    nearest = index.nearest([2, 0, 0], k=2)
+    assert [category for _, category in nearest] == [EmailCategory.INVOICE, EmailCategory.RECEIPT]
+    assert nearest[0][0] == pytest.approx(1.0)
+
+    index.add([0, 0, 1], EmailCategory.SPAM)
+    assert len(index) == 3
+    assert index.nearest([1, 0, 0], k=1)[0][1] == EmailCategory.RECEIPT
+
+
+def test_predict_accepts_agreeing_neighbours_and_rejects_novel_mail():
+    """Test that agreeing close neighbours give a label and distant/split ones defer to the LLM."""
+    pre = _preclassifier()
+    for vector in ([1, 0, 0], [0.98, 0.05, 0], [0.97, 0, 0.05]):
+        assert pre.learn(vector, _classification(EmailCategory.NEWSLETTER))
+    assert pre.learn([0, 1, 0], _classification(EmailCategory.SPAM))
+    # Low-confidence or unknown results never enter the index
+    assert not pre.learn([0, 0, 1], _classification(EmailCategory.PERSONAL, confidence=40))
+    assert not pre.learn([0, 0, 1], _classification(EmailCategory.UNKNOWN))
+
+    result = pre.predict([1, 0.01, 0])
+    assert result['category'] == EmailCategory.NEWSLETTER
+    assert result['confidence'] > 90
+
+    assert pre.predict([0, 0, 1]) is None          # nothing similar
+    assert pre.predict([0.6, 0.6, 0]) is None      # neighbours too far / split
+
+
+@pytest.mark.asyncio
+async def test_bootstrap_embeds_classified_emails():
+    """Test that bootstrap embeds classified emails and skips low-confidence ones."""
+    vectors = {"a": [1, 0], "b": [0, 1], "c": [1, 1]}
+
+    async def embed(text):
+        return vectors[text.split("Subject: ")[1][0]]
+
+    pre = NearestNeighbourClassifier(embed, k=1)
+    added = await pre.bootstrap([
+        {'subject': "a", 'sender': "x@y", 'body_preview': "", 'category': EmailCategory.INVOICE, 'confidence': 95},
+        {'subject': "b", 'sender': "x@y", 'body_preview': "", 'category': EmailCategory.SPAM, 'confidence': 50},
+        {'subject': "c", 'sender': "x@y", 'body_preview': "", 'category': EmailCategory.RECEIPT, 'confidence': 90},
+    ])
+
+    assert added == 2
+    assert pre.bootstrapped
+    assert pre.predict([0.99, 0.01])['category'] == EmailCategory.INVOICE
+
+
+@pytest.mark.asyncio
+async def test_apply_corrections_relabels_known_emails_and_adds_new_ones():
+    """Test that user reclassifications replace index labels and advance the watermark."""
+    embedded = []
+
+    async def embed(text):
+        embedded.append(text)
+        return [0, 1, 0]
+
+    pre = NearestNeighbourClassifier(embed, k=1, min_similarity=0.9, min_agreement=1.0)
+    pre.learn([1, 0, 0], _classification(EmailCategory.NEWSLETTER), key=1)
+    assert pre.predict([1, 0, 0])['category'] == EmailCategory.NEWSLETTER
+
+    applied = await pre.apply_corrections([
+        {'id': 1, 'subject': "s", 'sender': "x@y", 'body_preview': "",
+         'category': EmailCategory.INVOICE, 'confidence': 100, 'updated_at': 10},
+        {'id': 2, 'subject': "t", 'sender': "x@y", 'body_preview': "",
+         'category': EmailCategory.SPAM, 'confidence': 100, 'updated_at': 20},
+    ])
+
+    assert applied == 2
+    assert len(embedded) == 1  # only the email missing from the index is embedded
+    assert pre.corrections_seen_at == 20
+    assert pre.predict([1, 0, 0])['category'] == EmailCategory.INVOICE
+    assert pre.predict([0, 1, 0])['category'] == EmailCategory.SPAM
@@ -0,0 +1,212 @@
+"""
+Tests for the Gmail API connector.
+"""
+import base64
+import pytest
+from unittest.mock import Mock, MagicMock
+
+from googleapiclient.errors import HttpError
+
+from shared.integrations import GmailConnector
+
+
+def _gmail_message(message_id: str) -> dict:
+    """Build a Gmail API message (format=full)."""
+    body = base64.urlsafe_b64encode(f"Body {message_id}".encode()).decode()
+    return {
+        'id': message_id,
+        'internalDate': '1737367200000',
+        'payload': {
+            'headers': [
+                {'name': 'Subject', 'value': f'Subject {message_id}'},
+                {'name': 'From', 'value': 'Sender <sender@example.com>'},
+                {'name': 'Message-ID', 'value': f'<{message_id}@example.com>'},
+                {'name': 'Date', 'value': 'Mon, 20 Jan 2025 10:00:00 +0000'}
+            ],
+            'body': {'data': body}
+        }
+    }
+
+
+def _http_error(status: int) -> HttpError:
+    resp = Mock()
+    resp.status = status
+    resp.reason = 'error'
+    return HttpError(resp, b'{}')
+
+
+class FakeBatch:
+    """Minimal BatchHttpRequest: answers each sub-request through the callback."""
+
+    def __init__(self, callback, failing_ids):
+        self.callback = callback
+        self.failing_ids = failing_ids
+        self.request_ids = []
+
+    def add(self, request, request_id=None):
+        self.request_ids.append(request_id)
+
+    def execute(self):
+        for request_id in self.request_ids:
+            if request_id in self.failing_ids:
+                self.callback(request_id, None, _http_error(429))
+            else:
+                self.callback(request_id, _gmail_message(request_id), None)
+
+
+@pytest.fixture
+def connector():
+    """Gmail connector with a mocked API service."""
+    GmailConnector._label_cache.clear()
+    conn = GmailConnector("test@gmail.com", {"token": "t", "refresh_token": "r"})
+    conn.service = MagicMock()
+    conn.service.users().labels().list().execute.return_value = {'labels': [
+        {'id': 'INBOX', 'name': 'INBOX'},
+        {'id': 'Label_1', 'name': 'Finance'},
+        {'id': 'Label_2', 'name': 'Finance/Invoices'}
+    ]}
+    return conn
+
+
+def test_fetch_messages_batch_groups_requests(connector):
+    """Test that message gets are grouped into ceil(N / BATCH_SIZE) batch requests."""
+    batches = []
+
+    def new_batch(callback):
+        batch = FakeBatch(callback, failing_ids=set())
+        batches.append(batch)
+        return batch
+
+    connector.BATCH_SIZE = 2
+    connector.service.new_batch_http_request.side_effect = new_batch
+
+    emails = connector._fetch_messages_batch(['m1', 'm2', 'm3'])
+
+    assert [len(b.request_ids) for b in batches] == [2, 1]
+    assert [e['gmail_id'] for e in emails] == ['m1', 'm2', 'm3']
+    assert emails[0]['body'] == 'Body m1'
+
+
+def test_fetch_messages_batch_retries_failed_individually(connector):
+    """Test that failed sub-requests are retried one by one and results keep the ID order."""
+    connector.service.new_batch_http_request.side_effect = (
+        lambda callback: FakeBatch(callback, failing_ids={'m2'})
+    )
+    connector._fetch_message_details = Mock(return_value={'gmail_id': 'm2'})
+
+    emails = connector._fetch_messages_batch(['m1', 'm2', 'm3'])
+
+    connector._fetch_message_details.assert_called_once_with('m2')
+    assert [e['gmail_id'] for e in emails] == ['m1', 'm2', 'm3']
+
+
+def _batch_service(connector):
+    connector.service.new_batch_http_request.side_effect = (
+        lambda callback: FakeBatch(callback, failing_ids=set())
+    )
+
+
+def test_iter_incremental_uses_history(connector):
+    """Test that a known historyId only fetches messages added to the label."""
+    _batch_service(connector)
+    connector.service.users().history().list().execute.return_value = {
+        'historyId': '200',
+        'history': [
+            {'messagesAdded': [{'message': {'id': 'm1', 'labelIds': ['INBOX']}}]},
+            {'messagesAdded': [{'message': {'id': 'm2', 'labelIds': ['SENT']}}]},
+            {'labelsAdded': [{'message': {'id': 'm3'}, 'labelIds': ['INBOX']}]},
+            {'labelsAdded': [{'message': {'id': 'm1'}, 'labelIds': ['INBOX']}]}
+        ]
+    }
+
+    emails, state = connector.fetch_incremental(sync_state={'history_id': '100'})
+
+    assert [e['gmail_id'] for e in emails] == ['m1', 'm3']
+    assert state == {'history_id': '200'}
+    connector.service.users().messages().list.assert_not_called()
+
+
+def test_iter_incremental_expired_history_falls_back_to_list(connector):
+    """Test that a 404 on history.list falls back to a full list with a fresh historyId."""
+    _batch_service(connector)
+    connector.service.users().history().list().execute.side_effect = _http_error(404)
+    connector.service.users().getProfile().execute.return_value = {'historyId': 300}
+    connector.service.users().messages().list().execute.return_value = {
+        'messages': [{'id': 'm1'}]
+    }
+
+    emails, state = connector.fetch_incremental(sync_state={'history_id': '100'})
+
+    assert [e['gmail_id'] for e in emails] == ['m1']
+    assert state == {'history_id': '300'}
+
+
+def test_move_emails_uses_batch_modify_per_thousand_ids(connector):
+    """Test that moves are sent as batchModify calls of at most BATCH_MODIFY_SIZE ids."""
+    connector.BATCH_MODIFY_SIZE = 2
+    batch_modify = connector.service.users().messages().batchModify
+    batch_modify.return_value.execute.side_effect = [{}, _http_error(500)]
+
+    results = connector.move_emails(['m1', 'm2', 'm3'], 'Finance/Invoices')
+
+    assert [c.kwargs['body'] for c in batch_modify.call_args_list] == [
+        {'ids': ['m1', 'm2'], 'addLabelIds': ['Label_2'], 'removeLabelIds': ['INBOX']},
+        {'ids': ['m3'], 'addLabelIds': ['Label_2'], 'removeLabelIds': ['INBOX']}
+    ]
+    assert results == {'m1': True, 'm2': True, 'm3': False}
+
+
+def test_delete_emails_trash_and_permanent(connector):
+    """Test soft deletes add TRASH via batchModify and permanent deletes use batchDelete."""
+    messages = connector.service.users().messages()
+
+    assert connector.delete_emails(['m1']) == {'m1': True}
+    messages.batchModify.assert_called_once_with(
+        userId='me', body={'ids': ['m1'], 'addLabelIds': ['TRASH'], 'removeLabelIds': ['INBOX']}
+    )
+
+    assert connector.delete_emails(['m2', 'm3'], permanent=True) == {'m2': True, 'm3': True}
+    messages.batchDelete.assert_called_once_with(userId='me', body={'ids': ['m2', 'm3']})
+
+
+def test_apply_label_keeps_inbox(connector):
+    """Test that labelling only adds the label."""
+    assert connector.apply_label('m1', 'Label_2') is True
+    connector.service.users().messages().batchModify.assert_called_once_with(
+        userId='me', body={'ids': ['m1'], 'addLabelIds': ['Label_2']}
+    )
+
+
+def test_resolve_label_id_caches_and_creates_nested_labels(connector):
+    """Test that labels are listed once per account and missing parents are created."""
+    labels = connector.service.users().labels()
+    labels.list.reset_mock()
+    labels.create().execute.side_effect = [{'id': 'Label_3'}, {'id': 'Label_4'}]
+    labels.create.reset_mock()
+
+    assert connector.resolve_label_id('Finance/Invoices') == 'Label_2'
+    assert connector.resolve_label_id('finance') == 'Label_1'
+    assert connector.resolve_label_id('News/Tech') == 'Label_4'
+    assert connector.resolve_label_id('News') == 'Label_3'
+
+    labels.list.assert_called_once_with(userId='me')
+    assert [c.kwargs['body']['name'] for c in labels.create.call_args_list] == ['News', 'News/Tech']
+
+    # Shared across connector instances of the same account
+    other = GmailConnector("test@gmail.com", {"token": "t"})
+    other.service = MagicMock()
+    assert other.resolve_label_id('News/Tech') == 'Label_4'
+    other.service.users().labels().list.assert_not_called()
+
+
+def test_modify_labels_refreshes_cache_when_label_rejected(connector):
+    """Test that a 404 on a cached label id reloads the label list and retries once."""
+    connector.resolve_label_id('Finance')
+    connector.service.users().labels().list().execute.return_value = {'labels': [
+        {'id': 'Label_9', 'name': 'Finance'}
+    ]}
+    batch_modify = connector.service.users().messages().batchModify
+    batch_modify.return_value.execute.side_effect = [_http_error(404), {}]
+
+    assert connector.apply_labels(['m1'], ['Finance']) == {'m1': True}
+    assert batch_modify.call_args.kwargs['body'] == {'ids': ['m1'], 'addLabelIds': ['Label_9']}
@@ -0,0 +1,228 @@
+"""
+Tests for the IMAP connector.
+"""
+import pytest
+from unittest.mock import Mock
+from imapclient.response_parser import parse_fetch_response
+
+from shared.integrations import ImapConnector
+
+
+RAW_EMAIL = (
+    b"Message-ID: <msg-{uid}@example.com>\r\n"
+    b"From: Sender <sender@example.com>\r\n"
+    b"Subject: Hello {uid}\r\n"
+    b"Date: Mon, 20 Jan 2025 10:00:00 +0000\r\n"
+    b"Content-Type: text/plain; charset=utf-8\r\n"
+    b"\r\n"
+    b"Body of message {uid}\r\n"
+)
+
+
+def _raw(uid: int) -> bytes:
+    return RAW_EMAIL.replace(b"{uid}", str(uid).encode())
+
+
+@pytest.fixture
+def connector():
+    """IMAP connector with a mocked IMAPClient."""
+    conn = ImapConnector("test@example.com", {
+        "imap_server": "imap.example.com",
+        "username": "test@example.com",
+        "password": "secret",
+        "fetch_mode": "full"
+    })
+    conn.client = Mock()
+    conn.client.fetch.side_effect = lambda uids, items: {
+        uid: {b'BODY[]': _raw(uid), b'FLAGS': (), b'INTERNALDATE': None} for uid in uids
+    }
+    return conn
+
+
+def test_fetch_incremental_first_sync_initialises_cursor(connector):
+    """Test the first sync fetches the latest messages and sets the cursor to UIDNEXT - 1."""
+    connector.client.select_folder.return_value = {b'UIDVALIDITY': 7, b'UIDNEXT': 101}
+    connector.client.search.return_value = [98, 99, 100]
+
+    emails, state = connector.fetch_incremental(limit=2)
+
+    assert state == {'uid_validity': 7, 'last_uid': 100}
+    assert sorted(e['imap_uid'] for e in emails) == [99, 100]
+
+
+def test_fetch_incremental_nothing_new_skips_fetch(connector):
+    """Test that no SEARCH/FETCH is issued when UIDNEXT did not move."""
+    connector.client.select_folder.return_value = {b'UIDVALIDITY': 7, b'UIDNEXT': 101}
+
+    emails, state = connector.fetch_incremental(sync_state={'uid_validity': 7, 'last_uid': 100})
+
+    assert emails == []
+    assert state == {'uid_validity': 7, 'last_uid': 100}
+    connector.client.search.assert_not_called()
+    connector.client.fetch.assert_not_called()
+
+
+def test_fetch_incremental_fetches_only_new_uids(connector):
+    """Test that only UIDs above the cursor are fetched, oldest first."""
+    connector.client.select_folder.return_value = {b'UIDVALIDITY': 7, b'UIDNEXT': 106}
+    # "n:*" may return the last message even if its UID is below n
+    connector.client.search.return_value = [100, 101, 102, 103, 104, 105]
+
+    emails, state = connector.fetch_incremental(
+        limit=3,
+        sync_state={'uid_validity': 7, 'last_uid': 100}
+    )
+
+    connector.client.search.assert_called_once_with(['UID', '101:*', 'NOT', 'DELETED'])
+    assert sorted(e['imap_uid'] for e in emails) == [101, 102, 103]
+    assert state == {'uid_validity': 7, 'last_uid': 103}
+
+
+def test_fetch_incremental_resets_on_uidvalidity_change(connector):
+    """Test that a new UIDVALIDITY discards the previous cursor."""
+    connector.client.select_folder.return_value = {b'UIDVALIDITY': 8, b'UIDNEXT': 11}
+    connector.client.search.return_value = [9, 10]
+
+    emails, state = connector.fetch_incremental(sync_state={'uid_validity': 7, 'last_uid': 500})
+
+    assert state == {'uid_validity': 8, 'last_uid': 10}
+    assert len(emails) == 2
+
+
+def test_iter_incremental_streams_chunks_with_advancing_cursor(connector):
+    """Test that UIDs are fetched chunk by chunk, each chunk carrying its own cursor."""
+    connector.client.select_folder.return_value = {b'UIDVALIDITY': 7, b'UIDNEXT': 106}
+    connector.client.search.return_value = [101, 102, 103, 104, 105]
+
+    chunks = connector.iter_incremental(
+        sync_state={'uid_validity': 7, 'last_uid': 100},
+        chunk_size=2
+    )
+
+    emails, state = next(chunks)
+    # Only the first chunk has been fetched so far
+    assert connector.client.fetch.call_count == 1
+    assert [e['imap_uid'] for e in emails] == [101, 102]
+    assert state == {'uid_validity': 7, 'last_uid': 102}
+
+    rest = list(chunks)
+    assert [s for _, s in rest] == [
+        {'uid_validity': 7, 'last_uid': 104},
+        {'uid_validity': 7, 'last_uid': 105}
+    ]
+    assert connector.client.fetch.call_count == 3
+
+
+def test_iter_incremental_reset_persists_cursor_with_last_chunk(connector):
+    """Test that after a reset only the last chunk carries the new cursor."""
+    connector.client.select_folder.return_value = {b'UIDVALIDITY': 8, b'UIDNEXT': 11}
+    connector.client.search.return_value = [7, 8, 9, 10]
+
+    states = [state for _, state in connector.iter_incremental(chunk_size=3)]
+
+    assert states == [None, {'uid_validity': 8, 'last_uid': 10}]
+
+
+HEADER_RESPONSE = [(
+    b'1 (UID 5 RFC822.SIZE 512000 ENVELOPE ("Mon, 20 Jan 2025 10:00:00 +0000" '
+    b'"=?utf-8?q?Facture_=C3=A9t=C3=A9?=" (("Acme Billing" NIL "billing" "acme.com")) '
+    b'NIL NIL NIL NIL NIL NIL "<abc@acme.com>") BODYSTRUCTURE ('
+    b'("TEXT" "PLAIN" ("CHARSET" "utf-8") NIL NIL "BASE64" 120 4 NIL NIL NIL NIL)'
+    b'("APPLICATION" "PDF" ("NAME" "facture.pdf") NIL NIL "BASE64" 500000 NIL '
+    b'("ATTACHMENT" ("FILENAME" "facture.pdf")) NIL NIL) '
+    b'"MIXED" ("BOUNDARY" "xx") NIL NIL NIL) INTERNALDATE "20-Jan-2025 10:00:00 +0000" FLAGS ())'
+)]
+
+
+def test_fetch_headers_first_never_downloads_attachments():
+    """Test header-first mode reads attachments from BODYSTRUCTURE and fetches a partial text part."""
+    conn = ImapConnector("test@example.com", {"password": "secret", "body_preview_bytes": 64})
+    conn.client = Mock()
+    header_data = parse_fetch_response(HEADER_RESPONSE, uid_is_key=True)
+    # "Bonjour, votre facture" en base64, tronqué au milieu d'un quantum
+    body_data = {5: {b'BODY[1]<0>': b'Qm9uam91ciwgdm90cmUgZmFjdHVyZQ=='[:30], b'SEQ': 1}}
+    conn.client.fetch.side_effect = [header_data, body_data]
+
+    emails = conn._fetch_and_parse([5])
+
+    assert len(emails) == 1
+    email = emails[0]
+    assert email["message_id"] == "<abc@acme.com>"
+    assert email["subject"] == "Facture été"
+    assert email["sender"] == "Acme Billing <billing@acme.com>"
+    assert email["attachment_count"] == 1
+    assert email["attachments"][0]["filename"] == "facture.pdf"
+    assert email["body"].startswith("Bonjour, votre fact")
+
+    # Phase 1 metadata only, phase 2 a byte-bounded peek on the text section
+    first_items = conn.client.fetch.call_args_list[0].args[1]
+    assert 'BODY.PEEK[]' not in first_items
+    assert conn.client.fetch.call_args_list[1].args[1] == ['BODY.PEEK[1]<0.64>']
+
+
+def test_analyse_bodystructure_single_part_uses_text_section():
+    """Test that a non-multipart message body is addressed by the TEXT section."""
+    conn = ImapConnector("test@example.com", {"password": "secret"})
+    response = parse_fetch_response([
+        b'1 (UID 9 BODYSTRUCTURE ("TEXT" "HTML" ("CHARSET" "iso-8859-1") NIL NIL "QUOTED-PRINTABLE" 900 20 NIL NIL NIL NIL))'
+    ], uid_is_key=True)
+
+    text_part, attachments = conn._analyse_bodystructure(response[9][b'BODYSTRUCTURE'])
+
+    assert text_part == ("TEXT", "quoted-printable", "iso-8859-1")
+    assert attachments == []
+
+
+def test_fetch_backfill_page_walks_backwards(connector):
+    """Test that backfill pages walk UIDs downwards and stop at the oldest message."""
+    connector.client.select_folder.return_value = {b'UIDVALIDITY': 7, b'UIDNEXT': 6}
+    connector.client.search.return_value = [1, 2, 3, 4, 5]
+
+    emails, cursor = connector.fetch_backfill_page(page_size=3)
+    assert sorted(e['imap_uid'] for e in emails) == [3, 4, 5]
+    assert cursor == {'uid_validity': 7, 'before_uid': 3}
+
+    connector.client.search.return_value = [1, 2]
+    emails, cursor = connector.fetch_backfill_page(cursor=cursor, page_size=3)
+    connector.client.search.assert_called_with(['UID', '1:2', 'NOT', 'DELETED'])
+    assert sorted(e['imap_uid'] for e in emails) == [1, 2]
+    assert cursor is None
+
+
+def _capabilities(connector, *capabilities):
+    connector.client.has_capability.side_effect = lambda name: name in capabilities
+
+
+def test_move_emails_uses_uid_move_when_supported(connector):
+    """Test that a set of UIDs is moved with a single UID MOVE."""
+    _capabilities(connector, 'MOVE', 'UIDPLUS')
+
+    results = connector.move_emails(['10', '11', 'bad'], 'Newsletters')
+
+    connector.client.select_folder.assert_called_once_with('INBOX')
+    connector.client.move.assert_called_once_with([10, 11], 'Newsletters')
+    connector.client.copy.assert_not_called()
+    assert results == {'10': True, '11': True, 'bad': False}
+
+
+def test_move_emails_falls_back_to_copy_and_uid_expunge(connector):
+    """Test that without MOVE only the moved UIDs are expunged (UIDPLUS)."""
+    _capabilities(connector, 'UIDPLUS')
+
+    assert connector.move_email('10', 'Archive') is True
+
+    connector.client.copy.assert_called_once_with([10], 'Archive')
+    connector.client.delete_messages.assert_called_once_with([10])
+    connector.client.uid_expunge.assert_called_once_with([10])
+    connector.client.expunge.assert_not_called()
+
+
+def test_delete_emails_permanent_without_uidplus_expunges_folder(connector):
+    """Test that a plain EXPUNGE is the fallback when UIDPLUS is missing."""
+    _capabilities(connector)
+
+    results = connector.delete_emails([3, 4], permanent=True)
+
+    connector.client.delete_messages.assert_called_once_with([3, 4])
+    connector.client.expunge.assert_called_once_with()
+    assert results == {3: True, 4: True}
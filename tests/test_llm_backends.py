@@ -0,0 +1,165 @@
+"""
+Tests for the LLM backends and the latency-aware router.
+"""
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from worker.classifiers.backends import (
+    LLMBackend, LLMBackendError, LLMRouter, OllamaBackend, OpenAICompatibleBackend
+)
+
+
+class FakeBackend(LLMBackend):
+    """Backend answering after a delay, or failing."""
+
+    def __init__(self, name, delay=0.0, fail=False, fallback=False):
+        super().__init__(name, fallback=fallback)
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def complete(self, system, prompt, num_predict, schema=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise httpx.ConnectError("connection refused")
+        return self.name
+
+
+@pytest.mark.asyncio
+async def test_router_prefers_lowest_p50_backend():
+    """Test that requests go to the backend with the lowest observed median latency."""
+    slow, fast = FakeBackend("slow", delay=0.03), FakeBackend("fast", delay=0.001)
+    router = LLMRouter([slow, fast], hedge_after=0)
+
+    # Both are unmeasured at first: each gets probed once
+    assert {await router.complete("sys", "a", 10), await router.complete("sys", "b", 10)} == {"slow", "fast"}
+    assert [await router.complete("sys", "c", 10) for _ in range(3)] == ["fast"] * 3
+
+
+@pytest.mark.asyncio
+async def test_router_fails_over_and_deprioritises_failing_backend():
+    """Test failover to the next backend, after which the failing one is tried last."""
+    broken, healthy = FakeBackend("broken", fail=True), FakeBackend("healthy", delay=0.001)
+    router = LLMRouter([broken, healthy], hedge_after=0, failure_threshold=3, failure_penalty=30)
+
+    # Neither backend is measured yet: the first one listed is tried first
+    assert await router.complete("sys", "a", 10) == "healthy"
+    assert broken.calls == 1
+
+    # The failure counts as a 30s latency, the healthy backend is now preferred
+    for prompt in ("b", "c", "d"):
+        assert await router.complete("sys", prompt, 10) == "healthy"
+    assert broken.calls == 1
+    assert router.stats()[0]['p50'] == 30
+
+
+@pytest.mark.asyncio
+async def test_router_opens_circuit_after_repeated_failures():
+    """Test that a backend is no longer called once its circuit is open."""
+    broken = FakeBackend("broken", fail=True)
+    router = LLMRouter([broken], hedge_after=0, failure_threshold=2, reset_timeout=60)
+
+    for prompt in ("a", "b"):
+        with pytest.raises(LLMBackendError, match="connection refused"):
+            await router.complete("sys", prompt, 10)
+
+    with pytest.raises(LLMBackendError, match="circuit open"):
+        await router.complete("sys", "c", 10)
+    assert broken.calls == 2
+    assert router.stats()[0]['open'] is True
+
+
+@pytest.mark.asyncio
+async def test_router_hedges_slow_requests_but_not_on_fallback():
+    """Test that a slow backend triggers a hedged request to the next local backend only."""
+    stuck, spare = FakeBackend("stuck", delay=5), FakeBackend("spare", delay=0.001)
+    cloud = FakeBackend("cloud", delay=0.001, fallback=True)
+    router = LLMRouter([stuck, spare, cloud], hedge_after=0.05)
+    router._states[1].latencies.append(0.5)
+
+    assert await router.complete("sys", "a", 10) == "spare"
+    assert stuck.calls == 1 and cloud.calls == 0
+
+    only_local = LLMRouter([FakeBackend("stuck", delay=0.2), cloud], hedge_after=0.05)
+    assert await only_local.complete("sys", "b", 10) == "stuck"
+    assert cloud.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_router_uses_fallback_when_every_local_backend_fails():
+    """Test that the fallback backend answers only after local failures, and errors are aggregated."""
+    local, cloud = FakeBackend("local", fail=True), FakeBackend("cloud", fallback=True)
+    assert await LLMRouter([cloud, local], hedge_after=0).complete("sys", "a", 10) == "cloud"
+    assert local.calls == 1
+    assert await LLMRouter([cloud, local], hedge_after=0).complete_with_backend("sys", "b", 10) == ("cloud", cloud)
+
+    with pytest.raises(LLMBackendError, match="local"):
+        await LLMRouter([FakeBackend("local", fail=True)], hedge_after=0).complete("sys", "a", 10)
+
+
+class _StubLLMHandler(BaseHTTPRequestHandler):
+    """Local stub of the Ollama and OpenAI-compatible chat endpoints."""
+
+    answer = {"category": "invoice", "confidence": 90, "reason": "Facture"}
+    requests = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.requests.append((self.path, body))
+
+        if self.path == "/api/chat":
+            reply = {"message": {"role": "assistant", "content": json.dumps(self.answer)}, "done": True}
+        elif self.path == "/v1/chat/completions":
+            reply = {"choices": [{"message": {"role": "assistant", "content": json.dumps(self.answer)}}]}
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        payload = json.dumps(reply).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubLLMHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _StubLLMHandler.requests = []
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_backends_against_local_stub_server(stub_server):
+    """Test the Ollama and OpenAI-compatible backends over real HTTP."""
+    async with httpx.AsyncClient() as client:
+        ollama = OllamaBackend(stub_server, "mistral", client=lambda: client, keep_alive="30m")
+        openai = OpenAICompatibleBackend(f"{stub_server}/v1", "qwen2.5", client=lambda: client, api_key="local")
+        schema = {"type": "object"}
+
+        for backend in (ollama, openai):
+            text = await backend.complete("Consignes", "Email", num_predict=64, schema=schema)
+            assert json.loads(text)["category"] == "invoice"
+
+    (ollama_path, ollama_body), (openai_path, openai_body) = _StubLLMHandler.requests
+    assert ollama_path == "/api/chat"
+    assert ollama_body["messages"][0] == {"role": "system", "content": "Consignes"}
+    assert ollama_body["format"] == schema and ollama_body["options"]["num_predict"] == 64
+    assert openai_path == "/v1/chat/completions"
+    assert openai_body["max_tokens"] == 64
+    assert openai_body["response_format"]["json_schema"]["schema"] == schema
@@ -0,0 +1,260 @@
+"""
+Tests for the Microsoft Graph connector.
+"""
+import pytest
+import requests
+from unittest.mock import Mock
+
+from shared.integrations import MicrosoftConnector
+
+
+def _graph_message(message_id: str) -> dict:
+    """Build a Graph API message resource."""
+    return {
+        'id': message_id,
+        'internetMessageId': f'<{message_id}@example.com>',
+        'subject': f'Subject {message_id}',
+        'from': {'emailAddress': {'name': 'Sender', 'address': 'sender@example.com'}},
+        'receivedDateTime': '2025-01-20T10:00:00Z',
+        'bodyPreview': f'Body {message_id}',
+        'hasAttachments': False
+    }
+
+
+def _response(payload: dict, status: int = 200) -> Mock:
+    response = Mock()
+    response.status_code = status
+    response.json.return_value = payload
+    return response
+
+
+@pytest.fixture
+def connector():
+    """Microsoft connector with a mocked requests session."""
+    MicrosoftConnector._folder_cache.clear()
+    conn = MicrosoftConnector("test@outlook.com", {"token": "t", "client_id": "c"})
+    conn._session = Mock()
+    return conn
+
+
+def test_iter_incremental_follows_next_links_until_delta_link(connector):
+    """Test that every delta page is followed and the final deltaLink is the new state."""
+    connector._session.get.side_effect = [
+        _response({'value': [_graph_message('a')], '@odata.nextLink': 'https://graph/next'}),
+        _response({
+            'value': [_graph_message('b'), {'id': 'c', '@removed': {'reason': 'deleted'}}],
+            '@odata.deltaLink': 'https://graph/delta'
+        })
+    ]
+
+    pages = list(connector.iter_incremental(limit=10, chunk_size=1))
+
+    assert [[e['microsoft_id'] for e in emails] for emails, _ in pages] == [['a'], ['b']]
+    assert [state for _, state in pages] == [
+        {'next_link': 'https://graph/next'},
+        {'delta_link': 'https://graph/delta'}
+    ]
+    first_url = connector._session.get.call_args_list[0].args[0]
+    assert first_url.endswith('/me/mailFolders/inbox/messages/delta')
+    assert connector._session.get.call_args_list[0].kwargs['headers'] == {
+        'Prefer': 'odata.maxpagesize=1'
+    }
+
+
+def test_iter_incremental_resumes_from_delta_link(connector):
+    """Test that a stored deltaLink is used as-is for the next poll."""
+    connector._session.get.return_value = _response({
+        'value': [], '@odata.deltaLink': 'https://graph/delta2'
+    })
+
+    emails, state = connector.fetch_incremental(sync_state={'delta_link': 'https://graph/delta1'})
+
+    assert emails == []
+    assert state == {'delta_link': 'https://graph/delta2'}
+    assert connector._session.get.call_args.args[0] == 'https://graph/delta1'
+
+
+def test_iter_incremental_restarts_when_delta_token_expired(connector):
+    """Test that a 410 Gone on the stored deltaLink triggers a full resync."""
+    connector._session.get.side_effect = [
+        _response({}, status=410),
+        _response({'value': [_graph_message('a')], '@odata.deltaLink': 'https://graph/new'})
+    ]
+
+    emails, state = connector.fetch_incremental(sync_state={'delta_link': 'https://graph/old'})
+
+    assert [e['microsoft_id'] for e in emails] == ['a']
+    assert state == {'delta_link': 'https://graph/new'}
+    assert connector._session.get.call_args.args[0].endswith('/messages/delta')
+
+
+def test_iter_incremental_pauses_at_limit(connector):
+    """Test that a poll stops at the limit and persists the nextLink to resume from."""
+    connector._session.get.return_value = _response({
+        'value': [_graph_message('a'), _graph_message('b')],
+        '@odata.nextLink': 'https://graph/next'
+    })
+
+    emails, state = connector.fetch_incremental(limit=2)
+
+    assert len(emails) == 2
+    assert state == {'next_link': 'https://graph/next'}
+    assert connector._session.get.call_count == 1
+
+
+def test_move_emails_packs_twenty_requests_per_batch(connector):
+    """Test that moves are sent through /$batch in chunks of 20 with per-item results."""
+    connector._get_folder_id = Mock(return_value='folder-id')
+
+    def batch_response(url, json):
+        assert url.endswith('/$batch')
+        return _response({'responses': [
+            {'id': request['id'], 'status': 404 if request['url'] == '/me/messages/m3/move' else 201}
+            for request in json['requests']
+        ]})
+
+    connector._session.post.side_effect = batch_response
+    message_ids = [f'm{i}' for i in range(25)]
+
+    results = connector.move_emails(message_ids, 'Archive')
+
+    assert connector._session.post.call_count == 2
+    first_payload = connector._session.post.call_args_list[0].kwargs['json']
+    assert len(first_payload['requests']) == 20
+    assert first_payload['requests'][0]['body'] == {'destinationId': 'folder-id'}
+    assert results['m3'] is False
+    assert sum(results.values()) == 24
+
+
+def test_move_emails_reloads_tree_only_when_destination_is_gone(connector):
+    """Test that 404s on moved messages keep the cached tree unless the folder itself is missing."""
+    MicrosoftConnector._folder_cache['test@outlook.com'] = (float('inf'), {'projects': 'old-id'})
+    connector._session.post.side_effect = [
+        _response({'responses': [{'id': '0', 'status': 201}, {'id': '1', 'status': 404}]}),
+        _response({'responses': [{'id': '0', 'status': 201}, {'id': '1', 'status': 404}]}),
+        _response({'responses': [{'id': '0', 'status': 201}]})
+    ]
+
+    # Message already moved: the folder still exists, nothing is reloaded
+    connector._session.get.return_value = _response({'id': 'old-id'})
+    assert connector.move_emails(['m1', 'm2'], 'Projects') == {'m1': True, 'm2': False}
+    connector._session.get.assert_called_once()
+
+    # Destination deleted: reload the tree and replay only the 404 on the new id
+    connector._session.get.side_effect = [
+        _response({}, status=404),
+        _response({'value': [{'id': 'new-id', 'displayName': 'Projects', 'childFolderCount': 0}]})
+    ]
+    assert connector.move_emails(['m3', 'm4'], 'Projects') == {'m3': True, 'm4': True}
+    replay = connector._session.post.call_args.kwargs['json']['requests']
+    assert [(r['url'], r['body']) for r in replay] == [('/me/messages/m4/move', {'destinationId': 'new-id'})]
+
+def test_delete_emails_retries_throttled_items(connector, monkeypatch):
+    """Test that soft deletes target deleteditems and 429 items are replayed once."""
+    monkeypatch.setattr('shared.integrations.microsoft.time.sleep', Mock())
+    connector._session.post.side_effect = [
+        _response({'responses': [
+            {'id': '0', 'status': 201},
+            {'id': '1', 'status': 429, 'headers': {'Retry-After': '2'}}
+        ]}),
+        _response({'responses': [{'id': '0', 'status': 201}]})
+    ]
+
+    results = connector.delete_emails(['a', 'b'])
+
+    assert results == {'a': True, 'b': True}
+    retry_payload = connector._session.post.call_args_list[1].kwargs['json']
+    assert retry_payload['requests'] == [{
+        'id': '0',
+        'method': 'POST',
+        'url': '/me/messages/b/move',
+        'body': {'destinationId': 'deleteditems'},
+        'headers': {'Content-Type': 'application/json'}
+    }]
+
+
+def _folder_tree_responses(url, params=None, **kwargs):
+    """Serve a paginated folder tree: Finance/Invoices plus a second root page."""
+    pages = {
+        'https://graph.microsoft.com/v1.0/me/mailFolders': {
+            'value': [{'id': 'f-inbox', 'displayName': 'Inbox', 'childFolderCount': 0}],
+            '@odata.nextLink': 'https://graph/root-page-2'
+        },
+        'https://graph/root-page-2': {
+            'value': [{'id': 'f-finance', 'displayName': 'Finance', 'childFolderCount': 1}]
+        },
+        'https://graph.microsoft.com/v1.0/me/mailFolders/f-finance/childFolders': {
+            'value': [{'id': 'f-invoices', 'displayName': 'Invoices', 'childFolderCount': 0}]
+        }
+    }
+    return _response(pages[url])
+
+
+def test_get_folder_id_resolves_nested_paths_from_cached_tree(connector):
+    """Test that the folder tree is loaded once (all pages, child folders) and paths resolve."""
+    connector._session.get.side_effect = _folder_tree_responses
+
+    assert connector._get_folder_id('Finance/Invoices') == 'f-invoices'
+    assert connector._get_folder_id('finance') == 'f-finance'
+    assert connector._get_folder_id('TRASH') == 'deleteditems'
+    assert connector._get_folder_id('Missing') is None
+
+    assert connector._session.get.call_count == 3
+
+
+def test_get_folder_id_creates_missing_folders(connector):
+    """Test that missing path segments are created under their parent."""
+    connector._session.get.side_effect = _folder_tree_responses
+    connector._session.post.side_effect = [
+        _response({'id': 'f-2025'}, status=201),
+        _response({'id': 'f-q1'}, status=201)
+    ]
+
+    assert connector._get_folder_id('Finance/Invoices/2025/Q1', create=True) == 'f-q1'
+
+    calls = connector._session.post.call_args_list
+    assert calls[0].args[0].endswith('/mailFolders/f-invoices/childFolders')
+    assert calls[0].kwargs['json'] == {'displayName': '2025'}
+    assert calls[1].args[0].endswith('/mailFolders/f-2025/childFolders')
+    # Newly created folders are cached
+    assert connector._get_folder_id('finance/invoices/2025') == 'f-2025'
+
+
+def test_create_folder_conflict_raises_when_folder_still_missing(connector):
+    """Test that a 409 on a folder absent from the reloaded tree raises instead of KeyError."""
+    connector._session.get.side_effect = _folder_tree_responses
+    conflict = _response({}, status=409)
+    conflict.raise_for_status.side_effect = requests.exceptions.HTTPError("409 Conflict")
+    connector._session.post.return_value = conflict
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        connector._create_folder_path('Finance/Archive')
+
+def test_move_email_reloads_tree_on_stale_folder(connector):
+    """Test that a 404 on a cached folder id invalidates the cache and retries."""
+    MicrosoftConnector._folder_cache['test@outlook.com'] = (float('inf'), {'archive': 'old-id'})
+    connector._session.get.side_effect = [
+        _response({}, status=404),
+        _response({'value': [{'id': 'new-id', 'displayName': 'Archive', 'childFolderCount': 0}]})
+    ]
+    connector._session.post.side_effect = [
+        _response({}, status=404),
+        _response({'id': 'moved'}, status=201)
+    ]
+
+    assert connector.move_email('m1', 'Archive') is True
+    assert connector._session.post.call_args.kwargs['json'] == {'destinationId': 'new-id'}
+
+
+def test_move_email_keeps_tree_when_message_is_missing(connector):
+    """Test that a 404 for an already moved message does not reload the folder tree."""
+    MicrosoftConnector._folder_cache['test@outlook.com'] = (float('inf'), {'projects': 'folder-id'})
+    not_found = _response({}, status=404)
+    not_found.raise_for_status.side_effect = requests.exceptions.HTTPError("404 Not Found")
+    connector._session.post.return_value = not_found
+    connector._session.get.return_value = _response({'id': 'folder-id'})
+
+    assert connector.move_email('gone', 'Projects') is False
+    connector._session.get.assert_called_once()
+    assert connector._session.post.call_count == 1
+    assert 'projects' in MicrosoftConnector._folder_cache['test@outlook.com'][1]
@@ -0,0 +1,235 @@
+"""
+Tests for the Ollama email classifier.
+"""
+import json
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from api.models import EmailCategory
+from worker.classifiers.backends import JsonStreamScanner, LLMBackendError
+from worker.classifiers.ollama_classifier import EmailClassifier
+
+
+@pytest.fixture(autouse=True)
+def disable_classification_cache():
+    """Classifiers built in these tests talk to the mocked Ollama only (no Redis)."""
+    with patch('worker.classifiers.ollama_classifier.settings.CLASSIFICATION_CACHE_ENABLED', False):
+        yield
+
+
+def _ollama_transport(requests):
+    """Mock Ollama server answering every request with an invoice classification."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        answer = {"category": "invoice", "confidence": 90, "reason": "Montant à régler"}
+        return httpx.Response(200, json={"message": {"role": "assistant", "content": json.dumps(answer)}})
+    return httpx.MockTransport(handler)
+
+
+@pytest.mark.asyncio
+async def test_classify_email_reuses_shared_client():
+    """Test that consecutive classifications go through one long-lived HTTP client."""
+    requests = []
+    clf = EmailClassifier()
+    clf._client = httpx.AsyncClient(transport=_ollama_transport(requests))
+    client = clf._client
+
+    first = await clf.classify_email("Facture", "billing@acme.com", "Total 100€")
+    second = await clf.classify_email("Facture 2", "billing@acme.com", "Total 200€")
+
+    assert first['category'] == EmailCategory.INVOICE
+    assert second['confidence'] == 90
+    assert len(requests) == 2
+    assert clf._client is client and not client.is_closed
+
+    await clf.close_client()
+    assert client.is_closed
+    assert clf._client is None
+
+
+@pytest.mark.asyncio
+async def test_chat_requests_share_a_fixed_system_prompt():
+    """Test that instructions go in an identical system message and the model is kept loaded."""
+    requests = []
+    clf = EmailClassifier()
+    clf._client = httpx.AsyncClient(transport=_ollama_transport(requests))
+
+    assert await clf.warm_up() is True
+    await clf.classify_email("Facture", "billing@acme.com", "Total 100€")
+    await clf.classify_batch([
+        {"subject": "Facture 2", "sender": "billing@acme.com", "body_preview": "Total 200€"},
+        {"subject": "Facture 3", "sender": "billing@acme.com", "body_preview": "Total 300€"},
+    ])
+
+    payloads = [json.loads(request.content) for request in requests]
+    assert all(request.url.path == "/api/chat" for request in requests)
+    assert len({json.dumps(p['messages'][0]) for p in payloads}) == 1
+    assert "RÈGLES DE PRIORITÉ" in payloads[0]['messages'][0]['content']
+    assert all("RÈGLES DE PRIORITÉ" not in p['messages'][-1]['content'] for p in payloads[1:])
+    assert payloads[0]['options']['num_predict'] == 1
+    assert all(p['keep_alive'] for p in payloads)
+
+    await clf.close_client()
+
+
+def test_client_is_recreated_when_event_loop_changes():
+    """Test that a client bound to a previous event loop is not reused."""
+    import asyncio
+
+    clf = EmailClassifier()
+
+    async def get_client():
+        return clf._get_client()
+
+    loop1, loop2 = asyncio.new_event_loop(), asyncio.new_event_loop()
+    try:
+        first = loop1.run_until_complete(get_client())
+        assert loop1.run_until_complete(get_client()) is first
+        assert loop2.run_until_complete(get_client()) is not first
+    finally:
+        loop1.close()
+        loop2.close()
+
+
+@pytest.mark.asyncio
+async def test_classify_batch_sends_one_prompt_and_retries_missing_items():
+    """Test that a batch is classified in one prompt and invalid items are reclassified singly."""
+    prompts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        messages = json.loads(request.content)['messages']
+        assert messages[0]['role'] == "system"
+        prompt = messages[-1]['content']
+        prompts.append(prompt)
+        if "EMAILS À CLASSIFIER" in prompt:
+            answer = [
+                {"id": 1, "category": "invoice", "confidence": 95, "reason": "Facture"},
+                {"id": 2, "category": "not-a-category", "confidence": 50, "reason": "?"},
+                {"id": 1, "category": "spam", "confidence": 10, "reason": "Doublon"},
+                {"id": 7, "category": "spam", "confidence": 10, "reason": "Id inconnu"},
+            ]
+        else:
+            answer = {"category": "newsletter", "confidence": 80, "reason": "Lettre hebdo"}
+        content = "Voici le résultat : " + json.dumps(answer)
+        return httpx.Response(200, json={"message": {"role": "assistant", "content": content}})
+
+    clf = EmailClassifier()
+    clf._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    results = await clf.classify_batch([
+        {"subject": "Facture", "sender": "billing@acme.com", "body_preview": "Total 100€"},
+        {"subject": "Hebdo", "sender": "news@acme.com", "body_preview": "Cette semaine"},
+        {"subject": "Digest", "sender": "news@acme.com", "body_preview": "Le mois"},
+    ])
+
+    assert [r['category'] for r in results] == [
+        EmailCategory.INVOICE, EmailCategory.NEWSLETTER, EmailCategory.NEWSLETTER
+    ]
+    assert results[0]['reason'] == "Facture"
+    # One batch prompt, then one single prompt for each of emails 2 and 3
+    assert len(prompts) == 3
+    assert "--- EMAIL id=3 ---" in prompts[0]
+
+    await clf.close_client()
+
+
+@pytest.mark.asyncio
+async def test_llm_outage_is_raised_only_when_requested():
+    """Test that an unreachable LLM gives UNKNOWN by default and LLMBackendError on request."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused")
+
+    clf = EmailClassifier()
+    clf._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    emails = [
+        {"subject": "Facture", "sender": "billing@acme.com", "body_preview": "Total 100€"},
+        {"subject": "Hebdo", "sender": "news@acme.com", "body_preview": "Cette semaine"},
+    ]
+
+    result = await clf.classify_email("Facture", "billing@acme.com", "Total 100€")
+    assert result['category'] == EmailCategory.UNKNOWN
+    assert "LLM unavailable" in result['reason']
+
+    with pytest.raises(LLMBackendError):
+        await clf.classify_email("Facture", "billing@acme.com", "Total 100€", raise_unavailable=True)
+    with pytest.raises(LLMBackendError):
+        await clf.classify_batch(emails, raise_unavailable=True)
+
+    await clf.close_client()
+
+
+def test_json_stream_scanner_stops_at_balanced_value():
+    """Test that braces inside strings and text before the JSON are ignored."""
+    scanner = JsonStreamScanner()
+    chunks = ['Voici : {"category": "inv', 'oice", "reason": "Montant {100} \\"', 'ok\\""', '} Et ensuite', ' du bla']
+
+    completed = [scanner.feed(chunk) for chunk in chunks]
+
+    assert completed == [False, False, False, True, True]
+    assert json.loads(scanner.text[scanner.text.index('{'):])['category'] == "invoice"
+    assert scanner.text.endswith('}')
+
+
+@pytest.mark.asyncio
+async def test_streaming_call_stops_reading_once_json_is_complete():
+    """Test that the stream is abandoned as soon as the JSON object closes."""
+    sent = []
+    payloads = []
+    tokens = ['{"category": ', '"newsletter", ', '"confidence": 80, "reason": "Hebdo"}', '\n\nExplication', ' détaillée']
+
+    async def ndjson():
+        for token in tokens:
+            sent.append(token)
+            yield (json.dumps({"message": {"role": "assistant", "content": token}, "done": False}) + "\n").encode()
+        sent.append("done")
+        yield (json.dumps({"message": {"content": ""}, "done": True}) + "\n").encode()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payloads.append(json.loads(request.content))
+        return httpx.Response(200, content=ndjson())
+
+    with patch('worker.classifiers.ollama_classifier.settings.OLLAMA_STREAM', True):
+        clf = EmailClassifier()
+    clf._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    result = await clf.classify_email("Hebdo", "news@acme.com", "Cette semaine")
+
+    assert result['category'] == EmailCategory.NEWSLETTER
+    assert payloads[0]['stream'] is True
+    assert payloads[0]['options']['num_predict'] > 0
+    assert "done" not in sent and len(sent) < len(tokens)
+
+    await clf.close_client()
+
+
+@pytest.mark.asyncio
+async def test_structured_output_schema_constrains_categories():
+    """Test that requests carry a JSON schema restricted to the known categories."""
+    requests = []
+    transport = _ollama_transport(requests)
+    with patch('worker.classifiers.ollama_classifier.settings.OLLAMA_STRUCTURED_OUTPUT', True):
+        clf = EmailClassifier()
+    with patch('worker.classifiers.ollama_classifier.settings.OLLAMA_STRUCTURED_OUTPUT', False):
+        unstructured = EmailClassifier()
+    clf._client = httpx.AsyncClient(transport=transport)
+    unstructured._client = httpx.AsyncClient(transport=transport)
+
+    await clf.classify_email("Facture", "billing@acme.com", "Total 100€")
+    await clf.classify_batch([
+        {"subject": "Facture 2", "sender": "billing@acme.com", "body_preview": "Total 200€"},
+        {"subject": "Facture 3", "sender": "billing@acme.com", "body_preview": "Total 300€"},
+    ])
+    await unstructured.classify_email("Facture 4", "billing@acme.com", "Total 400€")
+
+    single, batch = (json.loads(request.content)['format'] for request in requests[:2])
+    categories = {category.value for category in EmailCategory} - {EmailCategory.UNKNOWN.value}
+    assert single['type'] == "object"
+    assert set(single['properties']['category']['enum']) == categories
+    assert batch['type'] == "array"
+    assert "id" in batch['items']['required']
+    assert "format" not in json.loads(requests[-1].content)
+
+    await clf.close_client()
+    await unstructured.close_client()
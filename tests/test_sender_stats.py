@@ -0,0 +1,96 @@
+"""
+Tests for the sender-history classification fast path.
+"""
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from api.models import EmailCategory, SenderCategoryStat
+from worker.classifiers.sender_stats import (
+    count_classification, load_sender_classifications, record_sender_classifications,
+    sender_classification
+)
+
+
+def _db_with_stats(rows):
+    result = Mock()
+    result.all.return_value = rows
+    db = AsyncMock()
+    db.execute = AsyncMock(return_value=result)
+    return db
+
+
+@pytest.mark.asyncio
+async def test_only_long_consistent_histories_take_the_fast_path():
+    """Test the count and agreement thresholds of the sender fast path."""
+    db = _db_with_stats([
+        (SenderCategoryStat(user_id=1, sender="news@acme.com", category=EmailCategory.NEWSLETTER, count=19,
+                            confidence_sum=1710), 1),
+        (SenderCategoryStat(user_id=1, sender="news@acme.com", category=EmailCategory.PROMOTION, count=1,
+                            confidence_sum=80), 1),
+        (SenderCategoryStat(user_id=1, sender="new@shop.com", category=EmailCategory.PROMOTION, count=2,
+                            confidence_sum=180), 1),
+        (SenderCategoryStat(user_id=1, sender="mixed@corp.com", category=EmailCategory.PROFESSIONAL, count=6,
+                            confidence_sum=540), 1),
+        (SenderCategoryStat(user_id=1, sender="mixed@corp.com", category=EmailCategory.INVOICE, count=4,
+                            confidence_sum=360), 1),
+    ])
+
+    classifications = await load_sender_classifications(
+        db, [(1, "Acme <News@Acme.com>"), (1, "new@shop.com"), (1, "mixed@corp.com")]
+    )
+
+    assert set(classifications) == {(1, "news@acme.com")}
+    result = sender_classification(classifications, 1, '"ACME News" <news@acme.com>')
+    assert result['category'] == EmailCategory.NEWSLETTER
+    assert result['confidence'] == int(90 * 19 / 20)
+
+
+def test_count_classification_skips_unreliable_and_derived_results():
+    """Test that only confident rule and LLM classifications are counted."""
+    def newsletter(confidence, source):
+        return {'category': EmailCategory.NEWSLETTER, 'confidence': confidence, 'source': source}
+
+    counts = {}
+    count_classification(counts, 1, "News <news@acme.com>", newsletter(90, 'llm'))
+    count_classification(counts, 1, "news@acme.com", newsletter(84, 'rule'))
+    count_classification(counts, 1, "news@acme.com", newsletter(40, 'llm'))
+    count_classification(counts, 1, "news@acme.com", {'category': EmailCategory.UNKNOWN, 'confidence': 90,
+                                                      'source': 'llm'})
+    # Derived from earlier classifications: counting them would self-reinforce the history
+    for source in ('sender_stats', 'cache', 'embedding', None):
+        count_classification(counts, 1, "news@acme.com", newsletter(90, source))
+
+    assert counts == {(1, "news@acme.com", EmailCategory.NEWSLETTER): [2, 174]}
+
+
+@pytest.mark.asyncio
+async def test_sender_history_is_scoped_to_the_account_owner():
+    """Test that one user's history does not classify another user's emails."""
+    # Only account 1 belongs to the owner of this history
+    db = _db_with_stats([
+        (SenderCategoryStat(user_id=1, sender="news@acme.com", category=EmailCategory.NEWSLETTER, count=20,
+                            confidence_sum=1800), 1),
+    ])
+
+    classifications = await load_sender_classifications(db, [(1, "news@acme.com"), (2, "news@acme.com")])
+
+    assert sender_classification(classifications, 1, "news@acme.com")['category'] == EmailCategory.NEWSLETTER
+    assert sender_classification(classifications, 2, "news@acme.com") is None
+
+
+@pytest.mark.asyncio
+async def test_record_merges_counts_per_account_owner():
+    """Test that counts are attributed to the owner of each account."""
+    owners = Mock()
+    owners.all.return_value = [(1, 10), (2, 10), (3, 20)]
+    db = AsyncMock()
+    db.execute = AsyncMock(side_effect=[owners, None, None])
+
+    await record_sender_classifications(db, {
+        (1, "news@acme.com", EmailCategory.NEWSLETTER): [1, 90],
+        (2, "news@acme.com", EmailCategory.NEWSLETTER): [2, 170],
+        (3, "news@acme.com", EmailCategory.NEWSLETTER): [1, 80],
+    })
+
+    upserts = [call.args[0].compile().params for call in db.execute.await_args_list[1:]]
+    assert [(p['user_id'], p['count'], p['confidence_sum']) for p in upserts] == [(10, 3, 260), (20, 1, 80)]
@@ -6,9 +6,9 @@
 """
 import logging
 import asyncio
-from typing import Dict, List, Optional, Any
-from datetime import datetime
-from sqlalchemy import select, update
+from typing import Dict, List, Optional, Any, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.database import get_db_context
@@ -17,7 +17,16 @@
     ProcessingLog, AccountType
 )
 from worker.rules import rules_parser
-from shared.integrations import ImapConnector, GmailConnector, MicrosoftConnector
+from worker.classifiers.ollama_classifier import classifier, error_classification
+from worker.classifiers.backends import LLMBackendError
+from worker.classifiers.limiter import AdaptiveLimiter
+from worker.classifiers.embeddings import preclassifier
+from worker.classifiers.sender_stats import (
+    COUNTED_SOURCES, RULE_SOURCE, USER_SOURCE, count_classification, load_sender_classifications,
+    record_sender_classifications, sender_classification
+)
+from shared.config import settings
+from shared.integrations import ImapConnector, GmailConnector, MicrosoftConnector, get_connector_pool
 from shared.security import decrypt_credentials
 
 logger = logging.getLogger(__name__)
@@ -33,10 +42,13 @@ class ConnectorNotFoundError(EmailActionError):
     pass
 
 
-async def _get_connector_for_account(account: EmailAccount):
+def _get_connector_for_account(account: EmailAccount):
     """
     Create appropriate connector for an email account.
 
+    The connector is not connected; it is meant to be used as the factory
+    of the worker connector pool (see _borrow_connector).
+
     Args:
         account: EmailAccount model instance
 
@@ -72,12 +84,32 @@ async def _get_connector_for_account(account: EmailAccount):
         raise ConnectorNotFoundError(f"Failed to create connector: {e}")
 
 
+def _borrow_connector(account: EmailAccount):
+    """
+    Borrow a connected connector for an account from the worker pool.
+
+    Usage: ``with _borrow_connector(account) as connector: ...``
+
+    Args:
+        account: EmailAccount model instance
+
+    Returns:
+        Context manager yielding a connected connector
+    """
+    return get_connector_pool().connection(
+        account.id,
+        lambda: _get_connector_for_account(account),
+        version=account.encrypted_credentials
+    )
+
+
 async def _log_action(
     db: AsyncSession,
     email_id: int,
     action: str,
     success: bool,
-    details: Optional[Dict[str, Any]] = None
+    details: Optional[Dict[str, Any]] = None,
+    commit: bool = True
 ) -> None:
     """
     Log an action execution to database.
@@ -88,6 +120,7 @@ async def _log_action(
         action: Action name (e.g., "move_email", "delete_email")
         success: Whether action succeeded
         details: Additional details about the action
+        commit: Commit immediately (False when the caller commits a batch)
     """
     try:
         log = ProcessingLog(
@@ -98,7 +131,8 @@ async def _log_action(
             component="email_actions"
         )
         db.add(log)
-        await db.commit()
+        if commit:
+            await db.commit()
     except Exception as e:
         logger.error(f"Failed to log action: {e}", exc_info=True)
 
@@ -191,14 +225,10 @@ async def apply_classification_action(
                 should_delete = (category == EmailCategory.SPAM)
 
             # Execute actions
-            connector = None
-            try:
-                connector = await _get_connector_for_account(account)
-                connector.connect()
-
+            with _borrow_connector(account) as connector:
                 # Move to folder if specified
                 if target_folder and not should_delete:
-                    success = connector.move_email(email.message_id, target_folder)
+                    success = connector.move_email(_provider_message_id(email), target_folder)
                     if success:
                         email.archived_folder = target_folder
                         actions_taken.append(f"moved_to:{target_folder}")
@@ -214,7 +244,7 @@ async def apply_classification_action(
 
                 # Delete if specified
                 if should_delete:
-                    success = connector.delete_email(email.message_id, permanent=False)
+                    success = connector.delete_email(_provider_message_id(email), permanent=False)
                     if success:
                         email.is_deleted = True
                         email.deleted_at = datetime.utcnow()
@@ -226,10 +256,6 @@ async def apply_classification_action(
                         logger.warning(f"Failed to delete email {email_id}")
                         await _log_action(db, email_id, "delete_email", False)
 
-            finally:
-                if connector:
-                    connector.disconnect()
-
             # Update email status
             email.status = ProcessingStatus.CLASSIFIED
             email.processed_at = datetime.utcnow()
@@ -282,6 +308,38 @@ def _get_default_folder_for_category(category: EmailCategory) -> Optional[str]:
     return folder_mapping.get(category)
 
 
+def _plan_action(rule, category: EmailCategory) -> Tuple[Optional[str], bool]:
+    """
+    Decide what to do with a classified email.
+
+    Args:
+        rule: Matched rule or None
+        category: Classification category
+
+    Returns:
+        Tuple (target folder or None, whether to delete)
+    """
+    if rule:
+        return rule.folder, rule.auto_delete
+    return _get_default_folder_for_category(category), category == EmailCategory.SPAM
+
+
+def _provider_message_id(email: Email) -> str:
+    """
+    Get the identifier the provider API expects for an email.
+
+    This is the IMAP UID, Gmail message id or Graph message id stored at
+    sync time; emails synced before it was stored fall back to Message-ID.
+
+    Args:
+        email: Email model instance
+
+    Returns:
+        Provider message identifier
+    """
+    return email.provider_id or email.message_id
+
+
 async def bulk_move_emails(
     email_ids: List[int],
     folder: str
@@ -289,6 +347,8 @@ async def bulk_move_emails(
     """
     Move multiple emails to a folder in batch.
 
+    Emails are grouped by account and each group is moved with one provider
+    operation (move_emails: IMAP UID set, Gmail batch, Graph $batch).
     Handles errors per email and continues processing.
     Updates database in a transaction.
 
@@ -311,49 +371,45 @@ async def bulk_move_emails(
 
     try:
         async with get_db_context() as db:
+            # Get emails, grouped by account
+            by_account: Dict[int, List[Email]] = {}
             for email_id in email_ids:
+                email = await db.get(Email, email_id)
+                if not email:
+                    failed.append({'email_id': email_id, 'error': 'Email not found'})
+                    continue
+                by_account.setdefault(email.account_id, []).append(email)
+
+            for account_id, emails in by_account.items():
+                account = await db.get(EmailAccount, account_id)
+                if not account:
+                    failed.extend({'email_id': email.id, 'error': 'Account not found'} for email in emails)
+                    continue
+
+                # Borrow connector and move the whole group at once
+                by_provider_id = {_provider_message_id(email): email for email in emails}
                 try:
-                    # Get email and account
-                    email = await db.get(Email, email_id)
-                    if not email:
-                        failed.append({'email_id': email_id, 'error': 'Email not found'})
-                        continue
-
-                    account = await db.get(EmailAccount, email.account_id)
-                    if not account:
-                        failed.append({'email_id': email_id, 'error': 'Account not found'})
-                        continue
-
-                    # Create connector and move
-                    connector = None
-                    try:
-                        connector = await _get_connector_for_account(account)
-                        connector.connect()
-
-                        success = connector.move_email(email.message_id, folder)
-
-                        if success:
-                            # Update email in DB
-                            email.archived_folder = folder
-                            email.status = ProcessingStatus.ARCHIVED
-                            succeeded.append(email_id)
-
-                            await _log_action(db, email_id, "bulk_move", True, {
-                                'folder': folder
-                            })
-                        else:
-                            failed.append({'email_id': email_id, 'error': 'Move operation failed'})
-                            await _log_action(db, email_id, "bulk_move", False, {
-                                'folder': folder
-                            })
+                    with _borrow_connector(account) as connector:
+                        results = connector.move_emails(list(by_provider_id), folder)
+                except Exception as e:
+                    logger.error(f"Error moving {len(emails)} emails of account {account_id}: {e}", exc_info=True)
+                    failed.extend({'email_id': email.id, 'error': str(e)} for email in emails)
+                    continue
 
-                    finally:
-                        if connector:
-                            connector.disconnect()
+                for provider_id, email in by_provider_id.items():
+                    success = bool(results.get(provider_id))
+                    if success:
+                        # Update email in DB
+                        email.archived_folder = folder
+                        email.status = ProcessingStatus.ARCHIVED
+                        succeeded.append(email.id)
+                    else:
+                        failed.append({'email_id': email.id, 'error': 'Move operation failed'})
 
-                except Exception as e:
-                    logger.error(f"Error moving email {email_id}: {e}", exc_info=True)
-                    failed.append({'email_id': email_id, 'error': str(e)})
+                    await _log_action(db, email.id, "bulk_move", success, {
+                        'folder': folder,
+                        'batch_size': len(emails)
+                    }, commit=False)
 
             # Commit all changes
             await db.commit()
@@ -432,16 +488,11 @@ async def apply_label(
                     'error': f'Labels are only supported for Gmail accounts (account type: {account.account_type.value})'
                 }
 
-            # Create Gmail connector
-            connector = None
-            try:
-                connector = await _get_connector_for_account(account)
-                connector.connect()
-
-                # Apply label using Gmail API
-                # Note: GmailConnector should implement apply_label method
+            # Borrow Gmail connector
+            with _borrow_connector(account) as connector:
+                # Apply label using Gmail API (batchModify)
                 if hasattr(connector, 'apply_label'):
-                    success = connector.apply_label(email.message_id, label)
+                    success = connector.apply_label(_provider_message_id(email), label)
 
                     if success:
                         await _log_action(db, email_id, "apply_label", True, {
@@ -464,10 +515,6 @@ async def apply_label(
                         'error': 'Gmail connector does not support label operations'
                     }
 
-            finally:
-                if connector:
-                    connector.disconnect()
-
     except Exception as e:
         logger.error(f"Error applying label to email {email_id}: {e}", exc_info=True)
         return {
@@ -478,13 +525,18 @@ async def apply_label(
 
 async def bulk_classify_pending_emails(limit: int = 100) -> Dict[str, Any]:
     """
-    Classify all pending emails in batch.
-
-    This function:
-    1. Fetches pending emails from database
-    2. Classifies each using rules first, then LLM if needed
-    3. Applies appropriate actions
-    4. Updates database
+    Classify all pending emails in batch, then apply actions per account.
+
+    This function runs in two phases:
+    1. Classifies every pending email (rules first, then sender history,
+       then embedding nearest neighbours if enabled, then LLM) and records
+       the resulting action; emails go to the LLM OLLAMA_BATCH_SIZE per
+       prompt, requests run concurrently within an adaptive window
+       (OLLAMA_MAX_CONCURRENCY) and results are committed every
+       CLASSIFY_COMMIT_BATCH_SIZE emails
+    2. Groups move/delete actions by (account, action, folder) and executes
+       each group as one provider operation (move_emails/delete_emails:
+       IMAP UID set, Gmail batch, Graph $batch), committing results once
 
     Args:
         limit: Maximum number of emails to process
@@ -494,7 +546,9 @@ async def bulk_classify_pending_emails(limit: int = 100) -> Dict[str, Any]:
             'status': 'success',
             'processed': int,
             'classified': int,
-            'errors': int
+            'errors': int,
+            'actions_applied': int,
+            'actions_failed': int
         }
     """
     logger.info(f"Starting bulk classification of pending emails (limit: {limit})")
@@ -502,9 +556,14 @@ async def bulk_classify_pending_emails(limit: int = 100) -> Dict[str, Any]:
     processed = 0
     classified = 0
     errors = 0
+    actions_applied = 0
+    actions_failed = 0
 
     try:
         async with get_db_context() as db:
+            # Emails left PROCESSING by an interrupted run go back to the queue
+            await _requeue_stale_emails(db)
+
             # Get pending emails
             query = select(Email).where(
                 Email.status == ProcessingStatus.PENDING
@@ -515,77 +574,112 @@ async def bulk_classify_pending_emails(limit: int = 100) -> Dict[str, Any]:
 
             logger.info(f"Found {len(emails)} pending emails to classify")
 
-            # Import classifier
-            from worker.classifiers.ollama_classifier import classifier
+            # Load the model and its system prompt before the first request
+            if emails:
+                await classifier.warm_up()
+                if preclassifier.enabled:
+                    if not preclassifier.bootstrapped:
+                        await _bootstrap_preclassifier(db)
+                    else:
+                        await _apply_user_corrections(db)
 
-            for email in emails:
-                try:
-                    processed += 1
-
-                    # Build email data
-                    email_data = {
-                        'subject': email.subject,
-                        'sender': email.sender,
-                        'body_preview': email.body_preview,
-                        'has_attachments': email.has_attachments,
-                        'attachment_names': []
-                    }
+            # Senders with a long, consistent history skip the LLM
+            sender_classifications = {}
+            if settings.SENDER_FAST_PATH_ENABLED:
+                sender_classifications = await load_sender_classifications(
+                    db, ((email.account_id, email.sender) for email in emails)
+                )
+            sender_counts = {}
+
+            # Phase 1: classify everything (LLM calls run concurrently within
+            # an adaptive in-flight window), collect actions, commit in batches
+            classified_emails = []
+            groups: Dict[Tuple[int, str, Optional[str]], List[Email]] = {}
+            limiter = AdaptiveLimiter(
+                max_limit=settings.OLLAMA_MAX_CONCURRENCY,
+                min_limit=settings.OLLAMA_MIN_CONCURRENCY,
+                target_latency=settings.OLLAMA_TARGET_LATENCY
+            )
 
-                    # Try rules first
-                    rule = rules_parser.find_matching_rule(email_data)
+            batch_size = max(1, settings.OLLAMA_BATCH_SIZE)
+            commit_batch_size = max(1, settings.CLASSIFY_COMMIT_BATCH_SIZE)
+            tasks = [
+                asyncio.create_task(
+                    _classify_pending_batch(emails[i:i + batch_size], limiter, sender_classifications)
+                )
+                for i in range(0, len(emails), batch_size)
+            ]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    for email, outcome in await next_done:
+                        processed += 1
 
-                    if rule:
-                        # Rule matched - use rule category
-                        category = rule.category
-                        confidence = 95  # High confidence for rule-based
-                        reason = f"Matched rule: {rule.name}"
+                        if isinstance(outcome, Exception):
+                            logger.error(f"Error classifying email {email.id}: {outcome}", exc_info=outcome)
+                            errors += 1
 
-                    else:
-                        # No rule - use LLM classification
-                        result = await classifier.classify_email(
-                            subject=email.subject,
-                            sender=email.sender,
-                            body_preview=email.body_preview or "",
-                            has_attachments=email.has_attachments
-                        )
-
-                        category = result['category']
-                        confidence = result['confidence']
-                        reason = result['reason']
-
-                    # Update email classification
-                    email.category = category
-                    email.classification_confidence = confidence
-                    email.classification_reason = reason
-                    email.status = ProcessingStatus.PROCESSING
-
-                    await db.commit()
-
-                    # Apply actions (in background to avoid blocking)
-                    await apply_classification_action(
-                        email_id=email.id,
-                        category=category,
-                        confidence=confidence,
-                        rule_matched=rule.name if rule else None
-                    )
-
-                    classified += 1
+                            # Mark as error
+                            email.status = ProcessingStatus.ERROR
+                        else:
+                            rule, result, elapsed_ms = outcome
+
+                            # Update email classification
+                            email.category = result['category']
+                            email.classification_confidence = result['confidence']
+                            email.classification_reason = result['reason']
+                            email.classification_source = result.get('source')
+                            email.status = ProcessingStatus.PROCESSING
+                            email.processing_time_ms = elapsed_ms
+
+                            # Record the action to run in phase 2
+                            target_folder, should_delete = _plan_action(rule, result['category'])
+                            if should_delete:
+                                groups.setdefault((email.account_id, 'delete', None), []).append(email)
+                            elif target_folder:
+                                groups.setdefault((email.account_id, 'move', target_folder), []).append(email)
+
+                            classified_emails.append(email)
+                            classified += 1
+                            count_classification(sender_counts, email.account_id, email.sender, result)
+
+                        # Write results (and sender statistics) back in batches
+                        if processed % commit_batch_size == 0:
+                            await record_sender_classifications(db, sender_counts)
+                            sender_counts.clear()
+                            await db.commit()
+            finally:
+                for task in tasks:
+                    task.cancel()
 
-                except Exception as e:
-                    logger.error(f"Error classifying email {email.id}: {e}", exc_info=True)
-                    errors += 1
+            # Persist remaining classifications before touching the mailboxes
+            await record_sender_classifications(db, sender_counts)
+            await db.commit()
+
+            # Phase 2: one provider operation per (account, action, folder)
+            for (account_id, action, folder), group in groups.items():
+                succeeded = await _execute_action_group(db, account_id, action, folder, group)
+                actions_applied += succeeded
+                actions_failed += len(group) - succeeded
 
-                    # Mark as error
-                    email.status = ProcessingStatus.ERROR
-                    await db.commit()
+            processed_at = datetime.utcnow()
+            for email in classified_emails:
+                email.status = ProcessingStatus.CLASSIFIED
+                email.processed_at = processed_at
+
+            await db.commit()
 
-        logger.info(f"Bulk classification completed: {classified}/{processed} classified, {errors} errors")
+        logger.info(
+            f"Bulk classification completed: {classified}/{processed} classified, {errors} errors, "
+            f"{actions_applied} actions applied in {len(groups)} groups, {actions_failed} failed"
+        )
 
         return {
             'status': 'success',
             'processed': processed,
             'classified': classified,
-            'errors': errors
+            'errors': errors,
+            'actions_applied': actions_applied,
+            'actions_failed': actions_failed
         }
 
     except Exception as e:
@@ -597,3 +691,291 @@ async def bulk_classify_pending_emails(limit: int = 100) -> Dict[str, Any]:
             'classified': classified,
             'errors': errors
         }
+
+
+async def _requeue_stale_emails(db: AsyncSession) -> int:
+    """
+    Put emails stuck in PROCESSING back to PENDING.
+
+    Emails stay PROCESSING between their classification and the execution of
+    their action; if the worker dies in between, nothing would pick them up
+    again. Rows untouched for CLASSIFY_PROCESSING_TIMEOUT seconds are
+    considered abandoned.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Number of emails requeued
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.CLASSIFY_PROCESSING_TIMEOUT)
+    result = await db.execute(
+        update(Email)
+        .where(Email.status == ProcessingStatus.PROCESSING, Email.updated_at < cutoff)
+        .values(status=ProcessingStatus.PENDING)
+    )
+    await db.commit()
+
+    requeued = result.rowcount or 0
+    if requeued:
+        logger.warning(f"Requeued {requeued} emails left in processing since before {cutoff.isoformat()}")
+    return requeued
+
+
+async def _classify_pending_batch(
+    emails: List[Email],
+    limiter: AdaptiveLimiter,
+    sender_classifications: Optional[Dict[Tuple[int, str], Dict]] = None
+):
+    """
+    Classify a batch of emails with rules first, then the LLM within the limiter window.
+
+    Emails not matched by a rule are classified from their sender's history
+    when it is consistent, then compared to already classified emails
+    (embedding nearest neighbours, when enabled); the remaining ones are
+    sent to the LLM together (classifier.classify_batch, one prompt for the
+    batch) when there are several of them.
+
+    Args:
+        emails: Pending emails (at most OLLAMA_BATCH_SIZE)
+        limiter: Shared in-flight window for LLM requests
+        sender_classifications: Sender fast-path results (load_sender_classifications)
+
+    Returns:
+        List of (email, (rule, result dict, elapsed ms)) or (email, exception)
+    """
+    start_time = datetime.utcnow()
+    outcomes = []
+    llm_emails = []
+
+    for email in emails:
+        try:
+            email_data = {
+                'subject': email.subject,
+                'sender': email.sender,
+                'body_preview': email.body_preview,
+                'has_attachments': email.has_attachments,
+                'attachment_names': []
+            }
+
+            # Try rules first
+            rule = rules_parser.find_matching_rule(email_data)
+
+            if rule:
+                # Rule matched - use rule category
+                result = {
+                    'category': rule.category,
+                    'confidence': 95,  # High confidence for rule-based
+                    'reason': f"Matched rule: {rule.name}",
+                    'source': RULE_SOURCE
+                }
+                elapsed_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
+                outcomes.append((email, (rule, result, elapsed_ms)))
+                continue
+
+            # Sender history fast path
+            result = sender_classification(sender_classifications or {}, email.account_id, email.sender)
+            if result:
+                elapsed_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
+                outcomes.append((email, (None, result, elapsed_ms)))
+            else:
+                llm_emails.append(email)
+
+        except Exception as e:
+            outcomes.append((email, e))
+
+    if not llm_emails:
+        return outcomes
+
+    # No rule - try nearest neighbours among already classified emails
+    # (embedding calls stay outside the limiter: their latency is not LLM latency)
+    vectors = {}
+    if preclassifier.enabled:
+        novel_emails = []
+        for email in llm_emails:
+            vectors[id(email)] = await preclassifier.embed_email({
+                'subject': email.subject,
+                'sender': email.sender,
+                'body_preview': email.body_preview
+            })
+
+        for email in llm_emails:
+            result = preclassifier.predict(vectors[id(email)])
+            if result:
+                elapsed_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
+                outcomes.append((email, (None, result, elapsed_ms)))
+            else:
+                novel_emails.append(email)
+
+        llm_emails = novel_emails
+        if not llm_emails:
+            return outcomes
+
+    # Novel email - use LLM classification
+    try:
+        try:
+            # LLM outages propagate through the slot so the limiter shrinks the window
+            async with limiter.slot():
+                if len(llm_emails) == 1:
+                    email = llm_emails[0]
+                    results = [await classifier.classify_email(
+                        subject=email.subject,
+                        sender=email.sender,
+                        body_preview=email.body_preview or "",
+                        has_attachments=email.has_attachments,
+                        raise_unavailable=True
+                    )]
+                else:
+                    results = await classifier.classify_batch([
+                        {
+                            'subject': email.subject,
+                            'sender': email.sender,
+                            'body_preview': email.body_preview or "",
+                            'has_attachments': email.has_attachments
+                        }
+                        for email in llm_emails
+                    ], raise_unavailable=True)
+        except LLMBackendError as e:
+            results = [error_classification(e) for _ in llm_emails]
+
+        elapsed_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
+        for email, result in zip(llm_emails, results):
+            outcomes.append((email, (None, result, elapsed_ms)))
+            preclassifier.learn(vectors.get(id(email)), result, email.id)
+
+    except Exception as e:
+        outcomes.extend((email, e) for email in llm_emails)
+
+    return outcomes
+
+
+async def _bootstrap_preclassifier(db: AsyncSession) -> None:
+    """
+    Fill the nearest-neighbour index with recent high-confidence classifications.
+
+    Only labels from rules, the LLM or the user are used: fast-path, cache
+    and k-NN results derive from those and would feed the index its own output.
+
+    Args:
+        db: Database session
+    """
+    # User reclassifications made from now on are picked up by _apply_user_corrections
+    preclassifier.corrections_seen_at = datetime.utcnow()
+
+    query = select(Email).where(
+        or_(
+            Email.status == ProcessingStatus.CLASSIFIED,
+            Email.classification_source == USER_SOURCE
+        ),
+        Email.classification_source.in_((*COUNTED_SOURCES, USER_SOURCE)),
+        Email.category != EmailCategory.UNKNOWN,
+        Email.classification_confidence >= settings.EMBEDDING_MIN_CONFIDENCE
+    ).order_by(Email.processed_at.desc()).limit(settings.EMBEDDING_BOOTSTRAP_SIZE)
+
+    result = await db.execute(query)
+    await preclassifier.bootstrap(
+        {
+            'id': email.id,
+            'subject': email.subject,
+            'sender': email.sender,
+            'body_preview': email.body_preview,
+            'category': email.category,
+            'confidence': email.classification_confidence
+        }
+        for email in result.scalars().all()
+    )
+
+
+async def _apply_user_corrections(db: AsyncSession) -> None:
+    """
+    Bring user reclassifications made through the API into this worker's index.
+
+    The index lives in the worker process, so the API cannot update it;
+    corrections are read back from the database at the start of each run.
+
+    Args:
+        db: Database session
+    """
+    query = select(Email).where(Email.classification_source == USER_SOURCE)
+    if preclassifier.corrections_seen_at is not None:
+        query = query.where(Email.updated_at > preclassifier.corrections_seen_at)
+    query = query.order_by(Email.updated_at).limit(settings.EMBEDDING_BOOTSTRAP_SIZE)
+
+    result = await db.execute(query)
+    await preclassifier.apply_corrections(
+        {
+            'id': email.id,
+            'subject': email.subject,
+            'sender': email.sender,
+            'body_preview': email.body_preview,
+            'category': email.category,
+            'confidence': email.classification_confidence,
+            'updated_at': email.updated_at
+        }
+        for email in result.scalars().all()
+    )
+
+
+async def _execute_action_group(
+    db: AsyncSession,
+    account_id: int,
+    action: str,
+    folder: Optional[str],
+    emails: List[Email]
+) -> int:
+    """
+    Execute one grouped action on emails of a single account.
+
+    Updates the emails and adds processing logs without committing.
+
+    Args:
+        db: Database session
+        account_id: Account owning all the emails
+        action: "move" or "delete"
+        folder: Destination folder for "move"
+        emails: Emails to act on
+
+    Returns:
+        Number of emails the action succeeded for
+    """
+    by_provider_id = {_provider_message_id(email): email for email in emails}
+    results: Dict[str, bool] = {}
+
+    try:
+        account = await db.get(EmailAccount, account_id)
+        if not account:
+            raise EmailActionError(f"Account {account_id} not found")
+
+        with _borrow_connector(account) as connector:
+            if action == 'move':
+                results = connector.move_emails(list(by_provider_id), folder)
+            else:
+                results = connector.delete_emails(list(by_provider_id), permanent=False)
+
+    except Exception as e:
+        logger.error(
+            f"Grouped {action} of {len(emails)} emails for account {account_id} failed: {e}",
+            exc_info=True
+        )
+
+    now = datetime.utcnow()
+    succeeded = 0
+    for provider_id, email in by_provider_id.items():
+        success = bool(results.get(provider_id))
+        if success:
+            succeeded += 1
+            if action == 'move':
+                email.archived_folder = folder
+            else:
+                email.is_deleted = True
+                email.deleted_at = now
+
+        details = {'category': email.category.value if email.category else None, 'batch_size': len(emails)}
+        if action == 'move':
+            details['folder'] = folder
+        else:
+            details['permanent'] = False
+        await _log_action(db, email.id, f"{action}_email", success, details, commit=False)
+
+    logger.info(f"Grouped {action} for account {account_id}: {succeeded}/{len(emails)} succeeded")
+    return succeeded
@@ -3,7 +3,9 @@
 """
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_init, worker_process_shutdown
 from shared.config import settings
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -59,6 +61,32 @@
 }
 
 
+@worker_process_init.connect
+def open_classifier_client(**kwargs):
+    """Ouvrir le client HTTP Ollama partagé par les tâches du process."""
+    from worker.classifiers.ollama_classifier import classifier
+    classifier.open_client()
+
+
+@worker_process_shutdown.connect
+def close_classifier_client(**kwargs):
+    """Fermer proprement les connexions keep-alive vers Ollama."""
+    from worker.classifiers.ollama_classifier import classifier
+    try:
+        loop = asyncio.get_event_loop()
+        if not loop.is_closed():
+            loop.run_until_complete(classifier.close_client())
+    except Exception as e:
+        logger.warning(f"Error closing Ollama client: {e}")
+
+
+@worker_process_shutdown.connect
+def close_connector_pool(**kwargs):
+    """Fermer les connexions IMAP/Gmail/Graph gardées par le pool du process."""
+    from shared.integrations import get_connector_pool
+    get_connector_pool().close_all()
+
+
 @celery_app.task(bind=True)
 def debug_task(self):
     """Tâche de test pour vérifier que Celery fonctionne"""
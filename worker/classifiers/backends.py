@@ -0,0 +1,539 @@
+"""
+Backends LLM interchangeables et routeur avec bascule selon la latence.
+
+Un backend sait compléter un couple (prompt système, message utilisateur) :
+- OllamaBackend : /api/chat d'un serveur Ollama (streaming, schéma JSON)
+- OpenAICompatibleBackend : /v1/chat/completions (llama.cpp, vLLM, LM Studio...)
+- AnthropicBackend : API Messages, en dernier recours (USE_ANTHROPIC_FALLBACK)
+
+LLMRouter choisit, pour chaque requête, le backend disponible dont la
+latence médiane (p50) observée est la plus basse :
+- un échec compte comme une latence de failure_penalty secondes : un backend
+  qui échoue passe derrière ceux qui répondent
+- circuit breaker : après failure_threshold échecs consécutifs, un backend
+  est écarté pendant reset_timeout secondes, puis retenté sur une requête
+- bascule : en cas d'échec, la requête repart sur le backend suivant
+- hedging : si la réponse tarde (plus de max(hedge_after, 2 x p50)), la même
+  requête est envoyée au backend suivant et la première réponse l'emporte
+- les backends de secours (fallback=True) ne servent qu'après l'échec de
+  tous les autres et ne reçoivent pas de requêtes de hedging
+"""
+import asyncio
+import json
+import logging
+import statistics
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class LLMBackendError(Exception):
+    """Aucun backend LLM n'a pu répondre."""
+    pass
+
+
+class JsonStreamScanner:
+    """
+    Détecter la fin de la première valeur JSON (objet ou tableau) d'un flux de texte.
+
+    Le texte avant la première accolade/crochet est ignoré pour l'équilibrage
+    (le LLM ajoute parfois une phrase d'introduction) ; les accolades et
+    crochets contenus dans les chaînes JSON ne comptent pas.
+    """
+
+    def __init__(self):
+        self.text = ''
+        self.complete = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Ajouter un fragment de texte.
+
+        Args:
+            chunk: Tokens reçus
+
+        Returns:
+            True dès que la première valeur JSON est complète
+        """
+        if self.complete:
+            return True
+
+        for position, char in enumerate(chunk):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"' and self._depth:
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]' and self._depth:
+                self._depth -= 1
+                if not self._depth:
+                    self.text += chunk[:position + 1]
+                    self.complete = True
+                    return True
+
+        self.text += chunk
+        return False
+
+
+class LLMBackend(ABC):
+    """Interface commune des backends LLM."""
+
+    def __init__(self, name: str, fallback: bool = False):
+        """
+        Args:
+            name: Nom affiché dans les logs (ex: "ollama@http://ollama:11434")
+            fallback: Backend de dernier recours
+        """
+        self.name = name
+        self.fallback = fallback
+
+    @abstractmethod
+    async def complete(
+        self,
+        system: str,
+        prompt: str,
+        num_predict: int,
+        schema: Optional[Dict] = None
+    ) -> str:
+        """
+        Générer la réponse à un message utilisateur.
+
+        Args:
+            system: Prompt système
+            prompt: Message utilisateur
+            num_predict: Nombre max de tokens générés
+            schema: Schéma JSON imposé à la réponse (si supporté)
+
+        Returns:
+            Texte généré
+        """
+        pass
+
+    async def warm_up(self, system: str) -> bool:
+        """Préparer le backend (chargement du modèle) ; rien à faire par défaut."""
+        return True
+
+
+class OllamaBackend(LLMBackend):
+    """Serveur Ollama, via /api/chat."""
+
+    def __init__(
+        self,
+        host: str,
+        model: str,
+        client: Callable[[], httpx.AsyncClient],
+        keep_alive: Optional[str] = None,
+        stream: bool = True,
+        structured_output: bool = True
+    ):
+        """
+        Args:
+            host: URL du serveur Ollama
+            model: Modèle
+            client: Renvoie le client HTTP partagé du process
+            keep_alive: Durée de maintien du modèle en mémoire
+            stream: Lire en streaming et s'arrêter dès que le JSON est complet
+            structured_output: Passer le schéma JSON dans "format"
+        """
+        super().__init__(f"ollama@{host}")
+        self.host = host
+        self.model = model
+        self.keep_alive = keep_alive
+        self.stream = stream
+        self.structured_output = structured_output
+        self._client = client
+
+    async def complete(self, system, prompt, num_predict, schema=None) -> str:
+        url = f"{self.host}/api/chat"
+
+        payload = self._chat_payload(system, [{"role": "user", "content": prompt}])
+        payload["options"]["num_predict"] = num_predict
+        if self.structured_output and schema:
+            payload["format"] = schema
+
+        client = self._client()
+        if self.stream:
+            payload["stream"] = True
+            return await self._stream_until_json(client, url, payload)
+
+        response = await client.post(url, json=payload)
+        response.raise_for_status()
+        result = response.json()
+        return result.get('message', {}).get('content', '')
+
+    async def warm_up(self, system: str) -> bool:
+        """
+        Charger le modèle et pré-calculer le prompt système
+
+        Envoie le message système seul (1 token généré) pour que le modèle soit
+        en mémoire et le cache KV du préfixe rempli avant le premier email.
+        """
+        payload = self._chat_payload(system, [])
+        payload["options"]["num_predict"] = 1
+
+        try:
+            response = await self._client().post(f"{self.host}/api/chat", json=payload)
+            response.raise_for_status()
+            return True
+        except httpx.HTTPError as e:
+            logger.warning(f"Ollama warm-up failed on {self.host}: {e}")
+            return False
+
+    def _chat_payload(self, system: str, messages: List[Dict]) -> Dict:
+        """Construire la requête /api/chat avec le message système fixe"""
+        return {
+            "model": self.model,
+            "messages": [{"role": "system", "content": system}] + messages,
+            "stream": False,
+            "keep_alive": self.keep_alive,  # Garder le modèle chargé entre deux beats
+            "options": {
+                "temperature": 0.1,  # Peu de créativité, plus de cohérence
+                "top_p": 0.9,
+            }
+        }
+
+    async def _stream_until_json(self, client: httpx.AsyncClient, url: str, payload: Dict) -> str:
+        """
+        Lire une réponse en streaming jusqu'à la fin de la première valeur JSON
+
+        Fermer la réponse avant la fin coupe la connexion : Ollama arrête alors
+        la génération au lieu de produire du texte qui serait ignoré au parsing.
+        """
+        scanner = JsonStreamScanner()
+        async with client.stream("POST", url, json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get('error'):
+                    raise httpx.HTTPError(chunk['error'])
+                if scanner.feed(chunk.get('message', {}).get('content', '')):
+                    if not chunk.get('done'):
+                        logger.debug("Complete JSON received, stopping Ollama generation early")
+                    break
+                if chunk.get('done'):
+                    break
+
+        return scanner.text
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """Serveur local compatible OpenAI (llama.cpp server, vLLM, LM Studio...)."""
+
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        client: Callable[[], httpx.AsyncClient],
+        api_key: Optional[str] = None,
+        structured_output: bool = True
+    ):
+        """
+        Args:
+            base_url: URL de l'API, avec le préfixe /v1 (ex: http://llamacpp:8080/v1)
+            model: Modèle
+            client: Renvoie le client HTTP partagé du process
+            api_key: Clé API éventuelle (en-tête Authorization)
+            structured_output: Passer le schéma JSON dans response_format
+        """
+        super().__init__(f"openai@{base_url}")
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.api_key = api_key
+        self.structured_output = structured_output
+        self._client = client
+
+    async def complete(self, system, prompt, num_predict, schema=None) -> str:
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": num_predict,
+            "temperature": 0.1,
+            "top_p": 0.9,
+        }
+        if self.structured_output and schema:
+            payload["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "classification", "schema": schema}
+            }
+
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else None
+        response = await self._client().post(f"{self.base_url}/chat/completions", json=payload, headers=headers)
+        response.raise_for_status()
+        choices = response.json().get('choices') or [{}]
+        return choices[0].get('message', {}).get('content') or ''
+
+
+class AnthropicBackend(LLMBackend):
+    """API Messages d'Anthropic, utilisée en dernier recours."""
+
+    API_URL = "https://api.anthropic.com/v1/messages"
+    API_VERSION = "2023-06-01"
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        client: Callable[[], httpx.AsyncClient],
+        api_url: Optional[str] = None
+    ):
+        """
+        Args:
+            api_key: Clé API Anthropic
+            model: Modèle
+            client: Renvoie le client HTTP partagé du process
+            api_url: URL de l'API (défaut : API_URL)
+        """
+        super().__init__(f"anthropic:{model}", fallback=True)
+        self.api_key = api_key
+        self.model = model
+        self.api_url = api_url or self.API_URL
+        self._client = client
+
+    async def complete(self, system, prompt, num_predict, schema=None) -> str:
+        payload = {
+            "model": self.model,
+            "system": system,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": num_predict,
+            "temperature": 0.1,
+        }
+        headers = {
+            "x-api-key": self.api_key,
+            "anthropic-version": self.API_VERSION,
+        }
+
+        response = await self._client().post(self.api_url, json=payload, headers=headers)
+        response.raise_for_status()
+        return ''.join(
+            block.get('text', '')
+            for block in response.json().get('content', [])
+            if block.get('type') == 'text'
+        )
+
+
+class _BackendState:
+    """Latences et état du circuit breaker d'un backend."""
+
+    def __init__(self, backend: LLMBackend, window: int):
+        self.backend = backend
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    @property
+    def p50(self) -> float:
+        # Backend jamais essayé : 0 pour qu'il soit essayé (un échec compte
+        # comme une latence de failure_penalty)
+        return statistics.median(self.latencies) if self.latencies else 0.0
+
+
+class LLMRouter:
+    """Routeur de requêtes LLM entre plusieurs backends."""
+
+    def __init__(
+        self,
+        backends: List[LLMBackend],
+        hedge_after: float = 15.0,
+        failure_threshold: int = 3,
+        reset_timeout: float = 60.0,
+        latency_window: int = 50,
+        failure_penalty: float = 120.0
+    ):
+        """
+        Initialiser le routeur.
+
+        Args:
+            backends: Backends disponibles
+            hedge_after: Délai min (secondes) avant d'envoyer la requête à un
+                second backend (0 = pas de hedging)
+            failure_threshold: Échecs consécutifs avant ouverture du circuit
+            reset_timeout: Secondes avant de retenter un backend écarté
+            latency_window: Nombre de latences gardées pour le calcul du p50
+            failure_penalty: Latence (secondes) enregistrée pour un échec
+        """
+        self.hedge_after = hedge_after
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failure_penalty = failure_penalty
+        self._states = [_BackendState(backend, latency_window) for backend in backends]
+
+    @property
+    def backends(self) -> List[LLMBackend]:
+        return [state.backend for state in self._states]
+
+    async def complete(
+        self,
+        system: str,
+        prompt: str,
+        num_predict: int,
+        schema: Optional[Dict] = None
+    ) -> str:
+        """
+        Envoyer une requête au meilleur backend disponible.
+
+        Args:
+            system: Prompt système
+            prompt: Message utilisateur
+            num_predict: Nombre max de tokens générés
+            schema: Schéma JSON imposé à la réponse
+
+        Returns:
+            Texte généré par le premier backend ayant répondu
+
+        Raises:
+            LLMBackendError: Si aucun backend n'a pu répondre
+        """
+        text, _ = await self.complete_with_backend(system, prompt, num_predict, schema)
+        return text
+
+    async def complete_with_backend(
+        self,
+        system: str,
+        prompt: str,
+        num_predict: int,
+        schema: Optional[Dict] = None
+    ) -> Tuple[str, LLMBackend]:
+        """
+        Comme complete(), en indiquant le backend qui a répondu.
+
+        Returns:
+            (texte généré, backend ayant répondu)
+
+        Raises:
+            LLMBackendError: Si aucun backend n'a pu répondre
+        """
+        candidates = self._candidates()
+        if not candidates:
+            raise LLMBackendError("All LLM backends are unavailable (circuit open)")
+
+        errors = []
+        pending: Dict[asyncio.Task, _BackendState] = {}
+        launched = 0
+
+        def launch() -> None:
+            nonlocal launched
+            state = candidates[launched]
+            launched += 1
+            task = asyncio.create_task(self._call(state, system, prompt, num_predict, schema))
+            pending[task] = state
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if len(pending) == 1 and launched < len(candidates) and not candidates[launched].backend.fallback:
+                    timeout = self._hedge_delay(next(iter(pending.values())))
+
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # Réponse lente : même requête au backend suivant
+                    slow = next(iter(pending.values()))
+                    logger.info(
+                        f"LLM backend {slow.backend.name} slower than {timeout:.1f}s, "
+                        f"hedging on {candidates[launched].backend.name}"
+                    )
+                    launch()
+                    continue
+
+                for task in done:
+                    state = pending.pop(task)
+                    if task.exception() is None:
+                        return task.result(), state.backend
+                    errors.append(f"{state.backend.name}: {task.exception()}")
+                    logger.warning(f"LLM backend {state.backend.name} failed: {task.exception()}")
+
+                if not pending and launched < len(candidates):
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise LLMBackendError("; ".join(errors))
+
+    async def warm_up(self, system: str) -> bool:
+        """
+        Préparer tous les backends principaux.
+
+        Returns:
+            True si au moins un backend est prêt
+        """
+        results = await asyncio.gather(
+            *(state.backend.warm_up(system) for state in self._states if not state.backend.fallback)
+        )
+        return any(results)
+
+    def stats(self) -> List[Dict]:
+        """
+        État des backends.
+
+        Returns:
+            Liste de dicts {"name", "p50", "samples", "failures", "open"}
+        """
+        now = time.monotonic()
+        return [
+            {
+                'name': state.backend.name,
+                'p50': state.p50,
+                'samples': len(state.latencies),
+                'failures': state.consecutive_failures,
+                'open': state.open_until > now
+            }
+            for state in self._states
+        ]
+
+    def _candidates(self) -> List[_BackendState]:
+        """Backends utilisables, par p50 croissant, les secours en dernier."""
+        now = time.monotonic()
+        available = [state for state in self._states if state.open_until <= now]
+        return sorted(available, key=lambda state: (state.backend.fallback, state.p50))
+
+    def _hedge_delay(self, state: _BackendState) -> Optional[float]:
+        """Délai d'attente avant hedging (None = pas de hedging)."""
+        if not self.hedge_after:
+            return None
+        return max(self.hedge_after, 2 * state.p50)
+
+    async def _call(self, state: _BackendState, system, prompt, num_predict, schema) -> str:
+        """Appeler un backend en mettant à jour ses latences et son circuit."""
+        started = time.monotonic()
+        try:
+            result = await state.backend.complete(system, prompt, num_predict, schema)
+        except asyncio.CancelledError:
+            # Perdant d'un hedging : sa latence est au moins celle-ci
+            state.latencies.append(time.monotonic() - started)
+            raise
+        except Exception:
+            state.latencies.append(max(time.monotonic() - started, self.failure_penalty))
+            state.consecutive_failures += 1
+            if state.consecutive_failures >= self.failure_threshold:
+                state.open_until = time.monotonic() + self.reset_timeout
+                logger.warning(
+                    f"LLM backend {state.backend.name} failed {state.consecutive_failures} times, "
+                    f"circuit open for {self.reset_timeout:.0f}s"
+                )
+            raise
+
+        state.latencies.append(time.monotonic() - started)
+        state.consecutive_failures = 0
+        state.open_until = 0.0
+        return result
@@ -0,0 +1,286 @@
+"""
+Cache des résultats de classification, adressé par le contenu.
+
+Les newsletters, notifications et promotions d'un même expéditeur ont des
+sujets et aperçus quasi identiques : la clé est un hash de la version
+normalisée (adresse de l'expéditeur, modèle de sujet, aperçu du corps, pièces
+jointes) plus le modèle LLM et la version du prompt, pour qu'un changement de
+l'un ou de l'autre invalide naturellement le cache.
+
+Stockage Redis (déjà utilisé comme broker Celery) :
+- {prefix}:{hash} : classification JSON, avec TTL
+- {prefix}:lru : sorted set clé -> dernier accès, pour évincer les entrées
+  les moins récemment utilisées au-delà de max_entries (le broker Celery
+  tourne en noeviction, Redis n'évince donc rien lui-même)
+- {prefix}:stats : compteurs hits / misses
+
+Le cache ne bloque jamais la classification : en cas d'erreur Redis, il se
+comporte comme un miss et reste désactivé quelques secondes.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from email.utils import parseaddr
+from typing import Dict, List, Optional
+
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+
+from api.models import EmailCategory
+
+logger = logging.getLogger(__name__)
+
+# Origine des classifications lues dans le cache (clé 'source')
+CACHE_SOURCE = 'cache'
+
+_DIGITS = re.compile(r'\d+')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def extract_sender_address(sender: str) -> str:
+    """
+    Extraire l'adresse email normalisée d'un champ From.
+
+    Args:
+        sender: Valeur brute, ex: '"ACME" <Billing@ACME.com>'
+
+    Returns:
+        Adresse en minuscules, ex: 'billing@acme.com'
+    """
+    _, address = parseaddr(sender or '')
+    return (address or sender or '').strip().lower()
+
+
+def normalize_text(text: str) -> str:
+    """
+    Réduire un texte à son modèle : minuscules, nombres remplacés par '#',
+    espaces fusionnés ('Commande 12345' et 'Commande 67890' donnent la même clé).
+
+    Args:
+        text: Sujet ou aperçu du corps
+
+    Returns:
+        Texte normalisé
+    """
+    text = _DIGITS.sub('#', (text or '').lower())
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+class ClassificationCache:
+    """Cache Redis des classifications, avec TTL, éviction LRU et compteurs."""
+
+    # Durée pendant laquelle le cache est ignoré après une erreur Redis
+    RETRY_AFTER = 30.0
+
+    def __init__(
+        self,
+        redis_url: str,
+        ttl: int = 604800,
+        max_entries: int = 50000,
+        prefix: str = "email-agent:classification"
+    ):
+        """
+        Initialiser le cache (la connexion Redis est ouverte au premier appel).
+
+        Args:
+            redis_url: URL Redis
+            ttl: Durée de vie d'une entrée (secondes)
+            max_entries: Nombre max d'entrées avant éviction LRU
+            prefix: Préfixe des clés Redis
+        """
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.prefix = prefix
+
+        # Compteurs du process (les compteurs globaux sont dans {prefix}:stats)
+        self.hits = 0
+        self.misses = 0
+
+        self._redis: Optional[aioredis.Redis] = None
+        self._redis_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._retry_at = 0.0
+
+    @property
+    def _lru_key(self) -> str:
+        return f"{self.prefix}:lru"
+
+    @property
+    def _stats_key(self) -> str:
+        return f"{self.prefix}:stats"
+
+    def make_key(
+        self,
+        subject: str,
+        sender: str,
+        body_preview: str,
+        has_attachments: bool,
+        attachment_names: Optional[List[str]],
+        model: str,
+        prompt_version: str
+    ) -> str:
+        """
+        Calculer la clé de cache d'un email.
+
+        Args:
+            subject: Sujet
+            sender: Expéditeur (champ From brut)
+            body_preview: Aperçu du corps
+            has_attachments: Présence de pièces jointes
+            attachment_names: Noms des pièces jointes
+            model: Modèle LLM
+            prompt_version: Version des prompts de classification
+
+        Returns:
+            Clé Redis
+        """
+        parts = [
+            extract_sender_address(sender),
+            normalize_text(subject),
+            normalize_text((body_preview or '')[:1000]),
+            bool(has_attachments),
+            sorted(normalize_text(name) for name in attachment_names or []),
+            model,
+            prompt_version
+        ]
+        digest = hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode()).hexdigest()
+        return f"{self.prefix}:{digest}"
+
+    async def get(self, key: str) -> Optional[Dict]:
+        """
+        Lire une classification en cache et la marquer comme récemment utilisée.
+
+        Args:
+            key: Clé calculée par make_key()
+
+        Returns:
+            Classification (même format que classify_email) ou None
+        """
+        redis = self._get_redis()
+        if redis is None:
+            self.misses += 1
+            return None
+
+        try:
+            raw = await redis.get(key)
+            async with redis.pipeline(transaction=False) as pipe:
+                if raw is not None:
+                    pipe.zadd(self._lru_key, {key: time.time()})
+                pipe.hincrby(self._stats_key, 'hits' if raw is not None else 'misses', 1)
+                await pipe.execute()
+        except RedisError as e:
+            self._disable(e)
+            self.misses += 1
+            return None
+
+        if raw is None:
+            self.misses += 1
+            return None
+
+        try:
+            data = json.loads(raw)
+            classification = {
+                'category': EmailCategory(data['category']),
+                'confidence': int(data['confidence']),
+                'reason': data['reason'],
+                'source': CACHE_SOURCE
+            }
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Invalid classification cache entry {key}: {e}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return classification
+
+    async def set(self, key: str, classification: Dict) -> None:
+        """
+        Enregistrer une classification et évincer les entrées les plus anciennes.
+
+        Args:
+            key: Clé calculée par make_key()
+            classification: Résultat de classify_email
+        """
+        redis = self._get_redis()
+        if redis is None:
+            return
+
+        category = classification['category']
+        payload = json.dumps({
+            'category': category.value if isinstance(category, EmailCategory) else category,
+            'confidence': classification['confidence'],
+            'reason': classification['reason']
+        }, ensure_ascii=False)
+
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.set(key, payload, ex=self.ttl)
+                pipe.zadd(self._lru_key, {key: time.time()})
+                pipe.zcard(self._lru_key)
+                *_, size = await pipe.execute()
+
+            if size > self.max_entries:
+                evicted = await redis.zpopmin(self._lru_key, size - self.max_entries)
+                if evicted:
+                    await redis.delete(*[member for member, _ in evicted])
+        except RedisError as e:
+            self._disable(e)
+
+    async def stats(self) -> Dict[str, int]:
+        """
+        Compteurs globaux du cache (tous les process).
+
+        Returns:
+            Dict {"hits": int, "misses": int, "entries": int}
+        """
+        redis = self._get_redis()
+        if redis is None:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': 0}
+
+        try:
+            counters = await redis.hgetall(self._stats_key)
+            entries = await redis.zcard(self._lru_key)
+        except RedisError as e:
+            self._disable(e)
+            return {'hits': self.hits, 'misses': self.misses, 'entries': 0}
+
+        return {
+            'hits': int(counters.get('hits', 0)),
+            'misses': int(counters.get('misses', 0)),
+            'entries': entries
+        }
+
+    async def close(self) -> None:
+        """Fermer la connexion Redis (arrêt du process)."""
+        if self._redis is not None:
+            try:
+                await self._redis.aclose()
+            except (RedisError, RuntimeError) as e:
+                logger.debug(f"Error closing classification cache connection: {e}")
+        self._redis = None
+        self._redis_loop = None
+
+    def _get_redis(self) -> Optional[aioredis.Redis]:
+        """
+        Récupérer le client Redis pour la boucle d'événements courante.
+
+        Returns:
+            Client Redis, ou None si le cache est suspendu après une erreur
+        """
+        if time.monotonic() < self._retry_at:
+            return None
+
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._redis_loop is not loop:
+            # Les connexions appartiennent à la boucle qui les a ouvertes
+            self._redis = aioredis.Redis.from_url(self.redis_url, decode_responses=True)
+            self._redis_loop = loop
+        return self._redis
+
+    def _disable(self, error: Exception) -> None:
+        """Suspendre le cache après une erreur Redis (fail open)."""
+        logger.warning(f"Classification cache unavailable, skipping for {self.RETRY_AFTER:.0f}s: {error}")
+        self._retry_at = time.monotonic() + self.RETRY_AFTER
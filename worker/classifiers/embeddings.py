@@ -0,0 +1,363 @@
+"""
+Pré-classification par plus proches voisins sur des embeddings.
+
+La plupart des emails ressemblent à des emails déjà classifiés avec une bonne
+confiance. Entre les règles et le LLM, chaque email est encodé par un petit
+modèle d'embedding servi par Ollama (/api/embeddings), puis comparé (cosinus)
+aux emails déjà classifiés gardés dans un index en mémoire (matrice NumPy).
+Si les k plus proches voisins sont assez similaires et s'accordent sur une
+catégorie, elle est retenue sans appel au LLM ; sinon l'email est nouveau et
+part au LLM, dont le résultat enrichit l'index.
+
+L'index est propre à chaque process worker : une reclassification par
+l'utilisateur (PATCH /emails/{id}/category, côté API) ne l'atteint pas
+directement. Chaque entrée garde l'id de son email ; au début de chaque
+classification en masse, le worker relit les emails reclassifiés par
+l'utilisateur depuis son dernier passage (apply_corrections) et corrige
+l'entrée correspondante, ou ajoute l'email s'il n'était pas dans l'index.
+Une correction est donc prise en compte au plus tard au lot suivant.
+
+NumPy est optionnel : sans lui, la pré-classification est désactivée.
+"""
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    np = None
+
+from shared.config import settings
+from api.models import EmailCategory
+
+logger = logging.getLogger(__name__)
+
+# Origine des classifications par plus proches voisins (clé 'source')
+EMBEDDING_SOURCE = 'embedding'
+
+
+def embedding_text(subject: str, sender: str, body_preview: str) -> str:
+    """
+    Construire le texte encodé pour un email.
+
+    Args:
+        subject: Sujet
+        sender: Expéditeur
+        body_preview: Aperçu du corps
+
+    Returns:
+        Texte court (expéditeur, sujet, début du corps)
+    """
+    return f"From: {sender or ''}\nSubject: {subject or ''}\n{(body_preview or '')[:500]}"
+
+
+class EmbeddingIndex:
+    """Index en mémoire de vecteurs normalisés, recherche par similarité cosinus."""
+
+    def __init__(self, max_size: int = 5000):
+        """
+        Initialiser l'index.
+
+        Args:
+            max_size: Nombre max de vecteurs ; au-delà, les plus anciens sont remplacés
+        """
+        self.max_size = max_size
+        self._matrix = None  # (max_size, dim), alloué au premier ajout
+        self._categories: List[Optional[EmailCategory]] = [None] * max_size
+        self._keys: List[Optional[int]] = [None] * max_size
+        self._slots: Dict[int, int] = {}  # clé -> position dans le buffer
+        self._size = 0
+        self._next = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, vector: Sequence[float], category: EmailCategory, key: Optional[int] = None) -> None:
+        """
+        Ajouter un email classifié à l'index.
+
+        Args:
+            vector: Embedding de l'email
+            category: Catégorie retenue
+            key: Identifiant de l'email (permet de corriger sa catégorie)
+        """
+        normalized = self._normalize(vector)
+        if normalized is None:
+            return
+
+        if self._matrix is None:
+            self._matrix = np.zeros((self.max_size, normalized.shape[0]), dtype=np.float32)
+        elif normalized.shape[0] != self._matrix.shape[1]:
+            logger.warning("Embedding dimension changed (model changed?), resetting index")
+            self.clear()
+            self._matrix = np.zeros((self.max_size, normalized.shape[0]), dtype=np.float32)
+
+        # Un email déjà présent est remplacé plutôt que dupliqué
+        slot = self._slots.get(key) if key is not None else None
+        if slot is not None:
+            self._matrix[slot] = normalized
+            self._categories[slot] = category
+            return
+
+        # Buffer circulaire : l'entrée la plus ancienne est remplacée
+        evicted = self._keys[self._next]
+        if evicted is not None:
+            self._slots.pop(evicted, None)
+        self._matrix[self._next] = normalized
+        self._categories[self._next] = category
+        self._keys[self._next] = key
+        if key is not None:
+            self._slots[key] = self._next
+        self._next = (self._next + 1) % self.max_size
+        self._size = min(self._size + 1, self.max_size)
+
+    def nearest(self, vector: Sequence[float], k: int) -> List[Tuple[float, EmailCategory]]:
+        """
+        Trouver les k vecteurs les plus similaires.
+
+        Args:
+            vector: Embedding recherché
+            k: Nombre de voisins
+
+        Returns:
+            Liste de (similarité cosinus, catégorie), la plus similaire en premier
+        """
+        normalized = self._normalize(vector)
+        if normalized is None or not self._size or normalized.shape[0] != self._matrix.shape[1]:
+            return []
+
+        similarities = self._matrix[:self._size] @ normalized
+        k = min(k, self._size)
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top])]
+        return [(float(similarities[i]), self._categories[i]) for i in top]
+
+    def relabel(self, key: int, category: EmailCategory) -> bool:
+        """
+        Corriger la catégorie d'un email de l'index.
+
+        Args:
+            key: Identifiant de l'email
+            category: Nouvelle catégorie
+
+        Returns:
+            True si l'email était dans l'index
+        """
+        slot = self._slots.get(key)
+        if slot is None:
+            return False
+        self._categories[slot] = category
+        return True
+
+    def clear(self) -> None:
+        """Vider l'index."""
+        self._matrix = None
+        self._categories = [None] * self.max_size
+        self._keys = [None] * self.max_size
+        self._slots = {}
+        self._size = 0
+        self._next = 0
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]):
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        if array.ndim != 1 or not norm:
+            return None
+        return array / norm
+
+
+class NearestNeighbourClassifier:
+    """Pré-classifieur k-NN, appelé entre les règles et le LLM."""
+
+    def __init__(
+        self,
+        embed: Callable[[str], Awaitable[List[float]]],
+        k: int = 5,
+        min_similarity: float = 0.85,
+        min_agreement: float = 0.8,
+        min_confidence: int = 85,
+        max_size: int = 5000,
+        enabled: bool = True
+    ):
+        """
+        Initialiser le pré-classifieur.
+
+        Args:
+            embed: Coroutine renvoyant l'embedding d'un texte
+            k: Nombre de voisins consultés
+            min_similarity: Similarité cosinus min pour qu'un voisin compte
+            min_agreement: Part min des k voisins d'accord sur la catégorie
+            min_confidence: Confiance min d'une classification pour entrer dans l'index
+            max_size: Taille max de l'index
+            enabled: Activer la pré-classification (ignoré sans NumPy)
+        """
+        self._embed = embed
+        self.k = k
+        self.min_similarity = min_similarity
+        self.min_agreement = min_agreement
+        self.min_confidence = min_confidence
+        self.enabled = enabled and np is not None
+        self.index = EmbeddingIndex(max_size) if self.enabled else None
+        self.bootstrapped = False
+        # Date de la dernière reclassification utilisateur prise en compte
+        self.corrections_seen_at: Optional[datetime] = None
+
+        if enabled and np is None:
+            logger.warning("NumPy is not installed, embedding pre-classifier disabled")
+
+    async def embed_email(self, email: Dict) -> Optional[List[float]]:
+        """
+        Encoder un email.
+
+        Args:
+            email: Dict avec les clés subject, sender, body_preview
+
+        Returns:
+            Embedding, ou None si Ollama n'a pas répondu
+        """
+        text = embedding_text(email.get('subject'), email.get('sender'), email.get('body_preview'))
+        try:
+            return await self._embed(text)
+        except Exception as e:
+            logger.warning(f"Embedding failed, falling back to LLM: {e}")
+            return None
+
+    def predict(self, vector: Optional[Sequence[float]]) -> Optional[Dict]:
+        """
+        Classifier un email d'après ses plus proches voisins.
+
+        Args:
+            vector: Embedding de l'email
+
+        Returns:
+            Classification (même format que classify_email) si les voisins
+            s'accordent, None si l'email est nouveau
+        """
+        if not self.enabled or vector is None or len(self.index) < self.k:
+            return None
+
+        neighbours = [
+            (similarity, category)
+            for similarity, category in self.index.nearest(vector, self.k)
+            # Une entrée remise à UNKNOWN par l'utilisateur ne vote plus
+            if similarity >= self.min_similarity and category != EmailCategory.UNKNOWN
+        ]
+        if not neighbours:
+            return None
+
+        category, votes = Counter(category for _, category in neighbours).most_common(1)[0]
+        agreement = votes / self.k
+        if agreement < self.min_agreement:
+            return None
+
+        similarity = sum(s for s, c in neighbours if c == category) / votes
+        return {
+            'category': category,
+            'confidence': int(min(similarity, 1.0) * agreement * 100),
+            'reason': f"{votes}/{self.k} similar emails classified as {category.value} "
+                      f"(similarity {similarity:.2f})",
+            'source': EMBEDDING_SOURCE
+        }
+
+    def learn(self, vector: Optional[Sequence[float]], classification: Dict, key: Optional[int] = None) -> bool:
+        """
+        Ajouter un email classifié à l'index si la classification est fiable.
+
+        Args:
+            vector: Embedding de l'email
+            classification: Résultat (LLM, règle ou utilisateur)
+            key: Identifiant de l'email
+
+        Returns:
+            True si l'email a été ajouté
+        """
+        if (
+            not self.enabled
+            or vector is None
+            or classification['category'] == EmailCategory.UNKNOWN
+            or (classification['confidence'] or 0) < self.min_confidence
+        ):
+            return False
+
+        self.index.add(vector, classification['category'], key)
+        return True
+
+    async def bootstrap(self, emails: Iterable[Dict]) -> int:
+        """
+        Remplir l'index avec des emails déjà classifiés.
+
+        Args:
+            emails: Dicts avec subject, sender, body_preview, category,
+                confidence et éventuellement id
+
+        Returns:
+            Nombre d'emails ajoutés
+        """
+        self.bootstrapped = True
+        if not self.enabled:
+            return 0
+
+        added = 0
+        for email in emails:
+            vector = await self.embed_email(email)
+            if vector is None:
+                # Ollama indisponible : inutile d'insister, on réessaiera au prochain process
+                break
+            if self.learn(vector, email, email.get('id')):
+                added += 1
+
+        logger.info(f"Embedding index bootstrapped with {added} classified emails")
+        return added
+
+
+    async def apply_corrections(self, emails: Iterable[Dict]) -> int:
+        """
+        Appliquer des reclassifications faites par l'utilisateur.
+
+        corrections_seen_at avance jusqu'à la dernière correction appliquée ;
+        si Ollama ne répond pas, les suivantes seront reprises au prochain appel.
+
+        Args:
+            emails: Dicts avec id, subject, sender, body_preview, category,
+                confidence et updated_at, par updated_at croissant
+
+        Returns:
+            Nombre d'emails corrigés ou ajoutés
+        """
+        if not self.enabled:
+            return 0
+
+        applied = 0
+        for email in emails:
+            if not self.index.relabel(email['id'], email['category']) and email['category'] != EmailCategory.UNKNOWN:
+                vector = await self.embed_email(email)
+                if vector is None:
+                    break
+                self.learn(vector, email, email['id'])
+            applied += 1
+            self.corrections_seen_at = email['updated_at']
+
+        if applied:
+            logger.info(f"Applied {applied} user reclassifications to the embedding index")
+        return applied
+
+
+def _create_preclassifier() -> NearestNeighbourClassifier:
+    from worker.classifiers.ollama_classifier import classifier
+
+    return NearestNeighbourClassifier(
+        embed=classifier.embed,
+        k=settings.EMBEDDING_NEIGHBOURS,
+        min_similarity=settings.EMBEDDING_MIN_SIMILARITY,
+        min_agreement=settings.EMBEDDING_MIN_AGREEMENT,
+        min_confidence=settings.EMBEDDING_MIN_CONFIDENCE,
+        max_size=settings.EMBEDDING_INDEX_MAX_SIZE,
+        enabled=settings.EMBEDDING_PRECLASSIFIER_ENABLED
+    )
+
+
+# Instance globale (index propre à chaque process worker)
+preclassifier = _create_preclassifier()
@@ -0,0 +1,100 @@
+"""
+Limiteur de concurrence adaptatif pour les appels au LLM.
+
+Ollama sert plusieurs requêtes en parallèle (OLLAMA_NUM_PARALLEL), mais au-delà
+de sa capacité les requêtes s'empilent et la latence explose. Le limiteur garde
+une fenêtre de requêtes en vol ajustée en AIMD sur la latence observée :
+- réponse plus rapide que la cible : +1 requête par fenêtre complète réussie
+- réponse plus lente que la cible (ou erreur) : fenêtre multipliée par
+  decrease_factor, au plus une fois par fenêtre (les requêtes parties avant
+  la dernière réduction ne la déclenchent pas à nouveau)
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveLimiter:
+    """Fenêtre de concurrence AIMD pilotée par la latence."""
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        initial_limit: Optional[int] = None,
+        target_latency: float = 20.0,
+        decrease_factor: float = 0.5
+    ):
+        """
+        Initialiser le limiteur.
+
+        Args:
+            max_limit: Nombre max de requêtes en vol
+            min_limit: Nombre min de requêtes en vol
+            initial_limit: Fenêtre de départ (défaut : moitié de max_limit)
+            target_latency: Latence (secondes) au-delà de laquelle la fenêtre réduit
+            decrease_factor: Facteur de réduction multiplicative
+        """
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.target_latency = target_latency
+        self.decrease_factor = decrease_factor
+
+        if initial_limit is None:
+            initial_limit = (self.max_limit + 1) // 2
+        self.limit = float(min(self.max_limit, max(self.min_limit, initial_limit)))
+
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        """Nombre de requêtes actuellement en vol."""
+        return self._in_flight
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Réserver une place dans la fenêtre le temps d'une requête.
+
+        Attend qu'une place se libère si la fenêtre est pleine, puis ajuste
+        la fenêtre selon la durée du bloc.
+        """
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+
+        started = time.monotonic()
+        error: Optional[BaseException] = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            latency = time.monotonic() - started
+            async with self._cond:
+                self._in_flight -= 1
+                self._adjust(started, latency, error)
+                self._cond.notify_all()
+
+    def _adjust(self, started: float, latency: float, error: Optional[BaseException] = None) -> None:
+        """Appliquer AIMD après une requête (verrou tenu)."""
+        if error is not None or latency > self.target_latency:
+            # Une seule réduction par fenêtre de requêtes
+            if started >= self._last_decrease:
+                previous = self.limit
+                self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+                self._last_decrease = time.monotonic()
+                if error is not None:
+                    cause = f"LLM request failed after {latency:.1f}s ({type(error).__name__}: {error})"
+                else:
+                    cause = f"LLM latency {latency:.1f}s above target"
+                logger.info(f"{cause}, concurrency {int(previous)} -> {int(self.limit)}")
+        else:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
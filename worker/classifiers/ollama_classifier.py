@@ -1,17 +1,110 @@
 """
 Email classifier utilisant Ollama (local LLM)
+
+Les requêtes passent par un routeur (worker/classifiers/backends.py) qui peut
+répartir la charge entre plusieurs hôtes Ollama, un serveur compatible OpenAI
+et l'API Anthropic en secours.
 """
+import asyncio
 import httpx
 import json
 import logging
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 from datetime import datetime
 
 from shared.config import settings
 from api.models import EmailCategory
+from worker.classifiers.cache import ClassificationCache
+from worker.classifiers.sender_stats import LLM_SOURCE
+from worker.classifiers.backends import (
+    AnthropicBackend, LLMBackend, LLMBackendError,
+    LLMRouter, OllamaBackend, OpenAICompatibleBackend
+)
 
 logger = logging.getLogger(__name__)
 
+# Version des prompts, incluse dans la clé du cache de classification :
+# à incrémenter à chaque modification des consignes ou du format de sortie
+PROMPT_VERSION = "2"
+
+
+# Consignes communes aux prompts unitaire et par lot, envoyées comme message
+# système identique à chaque appel : Ollama réutilise le cache KV du préfixe
+CLASSIFICATION_INSTRUCTIONS = """Tu es un expert en classification d'emails. Ton objectif est de trier les emails pour une organisation efficace.
+
+RÈGLES DE PRIORITÉ :
+1. "invoice" et "receipt" sont PRIORITAIRES si l'email contient une preuve d'achat/paiement, même s'il s'agit d'un échange professionnel.
+2. "spam" est prioritaire si le contenu est manifestement indésirable.
+3. Si un email relève de plusieurs catégories, choisis la plus spécifique au contenu principal.
+
+Catégories disponibles :
+- invoice: Factures, demandes de paiement (contient montant, TVA, IBAN, ou pièce jointe "facture").
+- receipt: Reçus, confirmations de commande/paiement.
+- document: Envoi de fichiers/documents (Google Drive, WeTransfer, PJ importante sans contexte financier).
+- professional: Échanges pro, réunions, projets, RH.
+- newsletter: Contenu éditorial récurrent, veille.
+- promotion: Offres commerciales, pubs, réductions.
+- social: Notifications LinkedIn, etc.
+- notification: Alertes système, confirmations automatiques (création de compte, sécurité).
+- personal: Famille, amis, contexte non-pro.
+- spam: Arnaques, phishing, junk."""
+
+# Catégories renvoyées par le LLM -> EmailCategory
+CATEGORY_MAPPING = {
+    'invoice': EmailCategory.INVOICE,
+    'receipt': EmailCategory.RECEIPT,
+    'document': EmailCategory.DOCUMENT,
+    'professional': EmailCategory.PROFESSIONAL,
+    'newsletter': EmailCategory.NEWSLETTER,
+    'promotion': EmailCategory.PROMOTION,
+    'social': EmailCategory.SOCIAL,
+    'notification': EmailCategory.NOTIFICATION,
+    'personal': EmailCategory.PERSONAL,
+    'spam': EmailCategory.SPAM,
+}
+
+
+# Schémas JSON passés au paramètre "format" d'Ollama (sortie structurée) :
+# la génération est contrainte à un JSON valide dont la catégorie fait
+# partie de EmailCategory
+_CLASSIFICATION_PROPERTIES = {
+    "category": {"type": "string", "enum": list(CATEGORY_MAPPING)},
+    "confidence": {"type": "integer", "minimum": 0, "maximum": 100},
+    "reason": {"type": "string"},
+}
+
+CLASSIFICATION_SCHEMA = {
+    "type": "object",
+    "properties": _CLASSIFICATION_PROPERTIES,
+    "required": ["category", "confidence", "reason"],
+}
+
+BATCH_CLASSIFICATION_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {"id": {"type": "integer", "minimum": 1}, **_CLASSIFICATION_PROPERTIES},
+        "required": ["id", "category", "confidence", "reason"],
+    },
+}
+
+
+def error_classification(error: Exception) -> Dict:
+    """
+    Classification renvoyée quand le LLM n'a pas pu classifier un email
+
+    Args:
+        error: Erreur rencontrée
+
+    Returns:
+        Classification UNKNOWN avec une confiance nulle
+    """
+    return {
+        'category': EmailCategory.UNKNOWN,
+        'confidence': 0,
+        'reason': f'Error during classification: {str(error)}'
+    }
+
 
 class EmailClassifier:
     """Classificateur d'emails utilisant Ollama"""
@@ -20,17 +113,133 @@ def __init__(self):
         self.ollama_host = settings.OLLAMA_HOST
         self.model = settings.OLLAMA_MODEL
         self.timeout = settings.OLLAMA_TIMEOUT
-        
+
+        # Client HTTP partagé (keep-alive), lié à la boucle d'événements qui l'utilise
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Cache Redis des résultats (emails quasi identiques d'un même expéditeur)
+        self.cache: Optional[ClassificationCache] = None
+        if settings.CLASSIFICATION_CACHE_ENABLED:
+            self.cache = ClassificationCache(
+                settings.REDIS_URL,
+                ttl=settings.CLASSIFICATION_CACHE_TTL,
+                max_entries=settings.CLASSIFICATION_CACHE_MAX_ENTRIES
+            )
+
+        # Backends LLM (hôtes Ollama, serveur compatible OpenAI, Anthropic en secours)
+        self.router = LLMRouter(
+            self._build_backends(),
+            hedge_after=settings.LLM_HEDGE_AFTER,
+            failure_threshold=settings.LLM_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.LLM_CIRCUIT_RESET_TIMEOUT,
+            failure_penalty=settings.OLLAMA_TIMEOUT
+        )
+
+    def _build_backends(self) -> List[LLMBackend]:
+        """Créer les backends LLM configurés"""
+        hosts = [self.ollama_host] + [
+            host.strip() for host in settings.OLLAMA_EXTRA_HOSTS.split(',') if host.strip()
+        ]
+        backends: List[LLMBackend] = [
+            OllamaBackend(
+                host,
+                self.model,
+                client=self._get_client,
+                keep_alive=settings.OLLAMA_KEEP_ALIVE,
+                stream=settings.OLLAMA_STREAM,
+                structured_output=settings.OLLAMA_STRUCTURED_OUTPUT
+            )
+            for host in hosts
+        ]
+
+        if settings.OPENAI_COMPAT_BASE_URL:
+            backends.append(OpenAICompatibleBackend(
+                settings.OPENAI_COMPAT_BASE_URL,
+                settings.OPENAI_COMPAT_MODEL or self.model,
+                client=self._get_client,
+                api_key=settings.OPENAI_COMPAT_API_KEY,
+                structured_output=settings.OLLAMA_STRUCTURED_OUTPUT
+            ))
+
+        if settings.USE_ANTHROPIC_FALLBACK and settings.ANTHROPIC_API_KEY:
+            backends.append(AnthropicBackend(
+                settings.ANTHROPIC_API_KEY,
+                settings.ANTHROPIC_MODEL,
+                client=self._get_client
+            ))
+
+        return backends
+
+    def open_client(self) -> httpx.AsyncClient:
+        """
+        Ouvrir le client HTTP partagé vers Ollama.
+
+        Appelé au démarrage du process (worker Celery, lifespan FastAPI) ;
+        sinon le client est créé au premier appel.
+
+        Returns:
+            Client httpx avec pool de connexions keep-alive
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=settings.OLLAMA_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OLLAMA_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.OLLAMA_KEEPALIVE_EXPIRY
+                )
+            )
+            self._client_loop = None
+        return self._client
+
+    async def close_client(self) -> None:
+        """Fermer le client HTTP partagé et la connexion du cache (arrêt du process)."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._client_loop = None
+
+        if self.cache is not None:
+            await self.cache.close()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Récupérer le client partagé pour la boucle d'événements courante.
+
+        Les connexions d'un AsyncClient appartiennent à la boucle qui les a
+        ouvertes : si la boucle a changé (nouvelle boucle créée par run_async),
+        un nouveau client est créé.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._client_loop not in (None, loop):
+            logger.debug("Event loop changed, recreating Ollama HTTP client")
+            self._client = None
+
+        client = self.open_client()
+        self._client_loop = loop
+        return client
+
     async def classify_email(
         self,
         subject: str,
         sender: str,
         body_preview: str,
         has_attachments: bool = False,
-        attachment_names: Optional[List[str]] = None
+        attachment_names: Optional[List[str]] = None,
+        raise_unavailable: bool = False
     ) -> Dict:
         """
         Classifier un email
+
+        Le résultat est lu puis enregistré dans le cache de classification
+        (si activé) : un email quasi identique à un email déjà classifié ne
+        déclenche pas d'appel au LLM.
+
+        Args:
+            raise_unavailable: Laisser remonter LLMBackendError quand aucun
+                backend ne répond (pour que l'appelant puisse réduire sa
+                concurrence) au lieu de renvoyer une classification UNKNOWN
         
         Returns:
             {
@@ -39,28 +248,178 @@ async def classify_email(
                 'reason': str
             }
         """
+        email = {
+            'subject': subject,
+            'sender': sender,
+            'body_preview': body_preview,
+            'has_attachments': has_attachments,
+            'attachment_names': attachment_names
+        }
+        cache_key = self._cache_key(email)
+        if cache_key:
+            cached = await self.cache.get(cache_key)
+            if cached:
+                return cached
+
+        return await self._classify_uncached(email, cache_key, raise_unavailable)
+
+    async def remember_classification(
+        self,
+        subject: str,
+        sender: str,
+        body_preview: str,
+        has_attachments: bool,
+        classification: Dict,
+        attachment_names: Optional[List[str]] = None
+    ) -> None:
+        """
+        Enregistrer une classification dans le cache (ex: correction utilisateur)
+
+        Les emails au contenu quasi identique recevront cette classification
+        au lieu du résultat précédemment mis en cache.
+        """
+        cache_key = self._cache_key({
+            'subject': subject,
+            'sender': sender,
+            'body_preview': body_preview,
+            'has_attachments': has_attachments,
+            'attachment_names': attachment_names
+        })
+        await self._cache_set(cache_key, classification)
+
+    async def _classify_uncached(
+        self,
+        email: Dict,
+        cache_key: Optional[str],
+        raise_unavailable: bool = False
+    ) -> Dict:
+        """Classifier un email avec le LLM puis mettre le résultat en cache"""
         try:
             # Construire le prompt pour le LLM
-            prompt = self._build_classification_prompt(
-                subject, sender, body_preview, has_attachments, attachment_names
-            )
+            prompt = self._build_classification_prompt(**self._email_kwargs(email))
             
-            # Appeler Ollama
-            response = await self._call_ollama(prompt)
+            # Appeler le LLM
+            response, backend = await self._call_llm(prompt)
             
             # Parser la réponse
             classification = self._parse_llm_response(response)
+            classification['source'] = LLM_SOURCE
+
+            await self._cache_set(cache_key, classification, backend)
             
             return classification
-            
+
+        except LLMBackendError as e:
+            if raise_unavailable:
+                raise
+            return error_classification(e)
+
         except Exception as e:
             logger.error(f"Classification error: {e}")
-            return {
-                'category': EmailCategory.UNKNOWN,
-                'confidence': 0,
-                'reason': f'Error during classification: {str(e)}'
-            }
+            return error_classification(e)
+
+    def _cache_key(self, email: Dict) -> Optional[str]:
+        """Clé de cache d'un email (None si le cache est désactivé)"""
+        if self.cache is None:
+            return None
+        return self.cache.make_key(
+            **self._email_kwargs(email), model=self.model, prompt_version=PROMPT_VERSION
+        )
+
+    async def _cache_set(
+        self,
+        cache_key: Optional[str],
+        classification: Dict,
+        backend: Optional[LLMBackend] = None
+    ) -> None:
+        """
+        Mettre en cache une classification exploitable (pas les échecs du LLM)
+
+        La clé porte le modèle principal (OLLAMA_MODEL) : une réponse d'un
+        autre modèle (backend de secours, serveur compatible OpenAI configuré
+        avec un autre modèle) n'est pas mise en cache sous cette clé.
+
+        Args:
+            cache_key: Clé calculée par _cache_key
+            classification: Classification à enregistrer
+            backend: Backend LLM qui a produit la classification (None pour
+                une classification qui ne vient pas du LLM, ex: correction)
+        """
+        if backend is not None and (backend.fallback or getattr(backend, 'model', None) != self.model):
+            return
+        if cache_key and classification['category'] != EmailCategory.UNKNOWN:
+            await self.cache.set(cache_key, classification)
     
+    async def classify_batch(self, emails: List[Dict], raise_unavailable: bool = False) -> List[Dict]:
+        """
+        Classifier plusieurs emails avec un seul prompt
+
+        Le bloc d'instructions (plus long que la plupart des emails) n'est
+        envoyé qu'une fois pour tout le lot. Le LLM répond par un tableau JSON
+        d'objets {id, category, confidence, reason} ; les emails absents ou
+        mal formés dans la réponse sont reclassifiés un par un. Les emails
+        déjà en cache ne sont pas envoyés au LLM.
+
+        Args:
+            emails: Liste de dicts avec les clés subject, sender, body_preview,
+                has_attachments et attachment_names (optionnelle)
+            raise_unavailable: Voir classify_email ; aucun email n'est alors
+                reclassifié un par un si aucun backend ne répond
+
+        Returns:
+            Liste de classifications (même format que classify_email), dans
+            l'ordre des emails fournis
+        """
+        results: Dict[int, Dict] = {}
+        cache_keys: Dict[int, Optional[str]] = {}
+        for i, email in enumerate(emails, start=1):
+            cache_keys[i] = self._cache_key(email)
+            if cache_keys[i]:
+                cached = await self.cache.get(cache_keys[i])
+                if cached:
+                    results[i] = cached
+
+        # Ids du prompt : position parmi les emails absents du cache
+        pending = [i for i in range(1, len(emails) + 1) if i not in results]
+        if len(pending) > 1:
+            try:
+                prompt = self._build_batch_prompt([emails[i - 1] for i in pending])
+                response, backend = await self._call_llm(
+                    prompt,
+                    num_predict=settings.OLLAMA_NUM_PREDICT * len(pending),
+                    schema=BATCH_CLASSIFICATION_SCHEMA
+                )
+                for position, classification in self._parse_batch_response(response, len(pending)).items():
+                    i = pending[position - 1]
+                    classification['source'] = LLM_SOURCE
+                    results[i] = classification
+                    await self._cache_set(cache_keys[i], classification, backend)
+            except LLMBackendError:
+                if raise_unavailable:
+                    raise
+                logger.error("Batch classification error: no LLM backend available")
+            except Exception as e:
+                logger.error(f"Batch classification error: {e}")
+
+        missing = [i for i in pending if i not in results]
+        if len(pending) > 1 and missing:
+            logger.info(f"Batch classification: {len(missing)}/{len(pending)} emails reclassified singly")
+        for i in missing:
+            results[i] = await self._classify_uncached(emails[i - 1], cache_keys[i], raise_unavailable)
+
+        return [results[i] for i in range(1, len(emails) + 1)]
+
+    @staticmethod
+    def _email_kwargs(email: Dict) -> Dict:
+        """Extraire les arguments de classify_email d'un dict email"""
+        return {
+            'subject': email.get('subject') or '',
+            'sender': email.get('sender') or '',
+            'body_preview': email.get('body_preview') or '',
+            'has_attachments': bool(email.get('has_attachments')),
+            'attachment_names': email.get('attachment_names')
+        }
+
     def _build_classification_prompt(
         self,
         subject: str,
@@ -69,28 +428,9 @@ def _build_classification_prompt(
         has_attachments: bool,
         attachment_names: Optional[List[str]]
     ) -> str:
-        """Construire le prompt pour la classification"""
+        """Construire le message utilisateur pour la classification (les consignes sont dans le message système)"""
         
-        prompt = f"""Tu es un expert en classification d'emails. Ton objectif est de trier les emails pour une organisation efficace.
-
-RÈGLES DE PRIORITÉ :
-1. "invoice" et "receipt" sont PRIORITAIRES si l'email contient une preuve d'achat/paiement, même s'il s'agit d'un échange professionnel.
-2. "spam" est prioritaire si le contenu est manifestement indésirable.
-3. Si un email relève de plusieurs catégories, choisis la plus spécifique au contenu principal.
-
-Catégories disponibles :
-- invoice: Factures, demandes de paiement (contient montant, TVA, IBAN, ou pièce jointe "facture").
-- receipt: Reçus, confirmations de commande/paiement.
-- document: Envoi de fichiers/documents (Google Drive, WeTransfer, PJ importante sans contexte financier).
-- professional: Échanges pro, réunions, projets, RH.
-- newsletter: Contenu éditorial récurrent, veille.
-- promotion: Offres commerciales, pubs, réductions.
-- social: Notifications LinkedIn, etc.
-- notification: Alertes système, confirmations automatiques (création de compte, sécurité).
-- personal: Famille, amis, contexte non-pro.
-- spam: Arnaques, phishing, junk.
-
-INSTRUCTIONS DE SORTIE :
+        prompt = f"""INSTRUCTIONS DE SORTIE :
 - Réponds UNIQUEMENT avec un objet JSON valide.
 - N'écris AUCUN texte avant ou après le JSON.
 - N'utilise PAS de balises markdown (comme ```json).
@@ -104,41 +444,118 @@ def _build_classification_prompt(
 
 EMAIL À CLASSIFIER :
 ---
-Expéditeur: {sender}
-Sujet: {subject}
-Corps (aperçu): {body_preview[:1000]}
-Pièces jointes: {has_attachments}
-{f"Noms des pièces jointes: {', '.join(attachment_names)}" if attachment_names else ""}
+{self._format_email(subject, sender, body_preview, has_attachments, attachment_names)}
 ---"""
         
         return prompt
+
+    def _build_batch_prompt(self, emails: List[Dict]) -> str:
+        """Construire le message utilisateur pour la classification d'un lot d'emails"""
+        blocks = []
+        for i, email in enumerate(emails, start=1):
+            kwargs = self._email_kwargs(email)
+            blocks.append(f"""--- EMAIL id={i} ---
+{self._format_email(**kwargs)}""")
+        emails_text = "\n".join(blocks)
+
+        prompt = f"""INSTRUCTIONS DE SORTIE :
+- Classifie CHAQUE email ci-dessous indépendamment des autres.
+- Réponds UNIQUEMENT avec un tableau JSON valide contenant un objet par email, avec son id.
+- N'écris AUCUN texte avant ou après le JSON.
+- N'utilise PAS de balises markdown (comme ```json).
+
+EXEMPLE DE SORTIE ATTENDUE (pour 2 emails) :
+[
+    {{"id": 1, "category": "invoice", "confidence": 95, "reason": "L'email contient une pièce jointe 'facture_001.pdf'."}},
+    {{"id": 2, "category": "newsletter", "confidence": 80, "reason": "Lettre d'information hebdomadaire."}}
+]
+
+EMAILS À CLASSIFIER ({len(emails)}) :
+{emails_text}
+---"""
+
+        return prompt
+
+    @staticmethod
+    def _format_email(
+        subject: str,
+        sender: str,
+        body_preview: str,
+        has_attachments: bool,
+        attachment_names: Optional[List[str]]
+    ) -> str:
+        """Formater les champs d'un email pour le prompt"""
+        return f"""Expéditeur: {sender}
+Sujet: {subject}
+Corps (aperçu): {body_preview[:1000]}
+Pièces jointes: {has_attachments}
+{f"Noms des pièces jointes: {', '.join(attachment_names)}" if attachment_names else ""}"""
     
-    async def _call_ollama(self, prompt: str) -> str:
-        """Appeler l'API Ollama"""
-        url = f"{self.ollama_host}/api/generate"
-        
+    async def warm_up(self) -> bool:
+        """
+        Charger le modèle et pré-calculer le prompt système sur les backends principaux
+
+        Returns:
+            True si au moins un backend a répondu (la classification reste possible sinon)
+        """
+        return await self.router.warm_up(CLASSIFICATION_INSTRUCTIONS)
+
+    async def embed(self, text: str) -> List[float]:
+        """
+        Calculer l'embedding d'un texte avec le modèle d'embedding d'Ollama
+
+        Args:
+            text: Texte à encoder
+
+        Returns:
+            Vecteur d'embedding
+        """
         payload = {
-            "model": self.model,
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": 0.1,  # Peu de créativité, plus de cohérence
-                "top_p": 0.9,
-            }
+            "model": settings.OLLAMA_EMBEDDING_MODEL,
+            "prompt": text,
+            "keep_alive": settings.OLLAMA_KEEP_ALIVE
         }
-        
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                response = await client.post(url, json=payload)
-                response.raise_for_status()
-                result = response.json()
-                return result.get('response', '')
-            except httpx.TimeoutException:
-                logger.error("Ollama request timeout")
-                raise Exception("LLM request timeout")
-            except httpx.HTTPError as e:
-                logger.error(f"Ollama HTTP error: {e}")
-                raise Exception(f"LLM HTTP error: {e}")
+
+        response = await self._get_client().post(f"{self.ollama_host}/api/embeddings", json=payload)
+        response.raise_for_status()
+        embedding = response.json().get('embedding')
+        if not embedding:
+            raise ValueError(f"Empty embedding returned by model {settings.OLLAMA_EMBEDDING_MODEL}")
+        return embedding
+
+    async def _call_llm(
+        self,
+        prompt: str,
+        num_predict: Optional[int] = None,
+        schema: Optional[Dict] = None
+    ) -> Tuple[str, LLMBackend]:
+        """
+        Envoyer le message utilisateur (avec le message système fixe) au routeur LLM
+
+        Le routeur choisit le backend le plus rapide disponible, bascule sur
+        un autre en cas d'échec et double la requête si la réponse tarde.
+
+        Args:
+            prompt: Message utilisateur
+            num_predict: Nombre max de tokens générés (défaut : OLLAMA_NUM_PREDICT)
+            schema: Schéma JSON de la réponse (défaut : CLASSIFICATION_SCHEMA)
+
+        Returns:
+            (texte généré, backend qui a répondu)
+
+        Raises:
+            LLMBackendError: Aucun backend n'a répondu
+        """
+        try:
+            return await self.router.complete_with_backend(
+                CLASSIFICATION_INSTRUCTIONS,
+                prompt,
+                num_predict=num_predict or settings.OLLAMA_NUM_PREDICT,
+                schema=schema or CLASSIFICATION_SCHEMA
+            )
+        except LLMBackendError as e:
+            logger.error(f"LLM request failed on every backend: {e}")
+            raise LLMBackendError(f"LLM unavailable: {e}") from e
     
     def _parse_llm_response(self, response: str) -> Dict:
         """Parser la réponse du LLM"""
@@ -159,21 +576,7 @@ def _parse_llm_response(self, response: str) -> Dict:
             # Valider les champs
             category_str = data.get('category', 'unknown').lower()
             
-            # Mapper vers EmailCategory
-            category_mapping = {
-                'invoice': EmailCategory.INVOICE,
-                'receipt': EmailCategory.RECEIPT,
-                'document': EmailCategory.DOCUMENT,
-                'professional': EmailCategory.PROFESSIONAL,
-                'newsletter': EmailCategory.NEWSLETTER,
-                'promotion': EmailCategory.PROMOTION,
-                'social': EmailCategory.SOCIAL,
-                'notification': EmailCategory.NOTIFICATION,
-                'personal': EmailCategory.PERSONAL,
-                'spam': EmailCategory.SPAM,
-            }
-            
-            category = category_mapping.get(category_str, EmailCategory.UNKNOWN)
+            category = CATEGORY_MAPPING.get(category_str, EmailCategory.UNKNOWN)
             confidence = min(100, max(0, int(data.get('confidence', 50))))
             reason = data.get('reason', 'No reason provided')
             
@@ -190,6 +593,55 @@ def _parse_llm_response(self, response: str) -> Dict:
             # Fallback: classification basique par règles
             return self._fallback_classification(response)
     
+    def _parse_batch_response(self, response: str, count: int) -> Dict[int, Dict]:
+        """
+        Parser la réponse du LLM pour un lot d'emails
+
+        Seuls les éléments valides sont retenus : id entier entre 1 et count,
+        non dupliqué, catégorie connue et confiance numérique.
+
+        Args:
+            response: Réponse brute du LLM
+            count: Nombre d'emails du lot
+
+        Returns:
+            Dict {id: classification} des éléments valides
+        """
+        response = response.strip()
+        start = response.find('[')
+        end = response.rfind(']') + 1
+        if start == -1 or end == 0:
+            logger.error(f"No JSON array in batch response: {response[:200]}")
+            return {}
+
+        try:
+            items = json.loads(response[start:end])
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse batch LLM response: {e}")
+            return {}
+
+        results: Dict[int, Dict] = {}
+        for item in items if isinstance(items, list) else []:
+            try:
+                email_id = int(item['id'])
+                category = CATEGORY_MAPPING[str(item['category']).lower()]
+                confidence = min(100, max(0, int(item.get('confidence', 50))))
+            except (TypeError, KeyError, ValueError):
+                logger.debug(f"Malformed batch item: {item}")
+                continue
+
+            if not 1 <= email_id <= count or email_id in results:
+                logger.debug(f"Unexpected or duplicate id in batch response: {email_id}")
+                continue
+
+            results[email_id] = {
+                'category': category,
+                'confidence': confidence,
+                'reason': item.get('reason') or 'No reason provided'
+            }
+
+        return results
+
     def _fallback_classification(self, response: str) -> Dict:
         """Classification de secours basée sur des règles simples"""
         return {
@@ -0,0 +1,236 @@
+"""
+Chemin rapide par réputation de l'expéditeur.
+
+La table sender_category_stats compte, par utilisateur, adresse d'expéditeur
+et catégorie, les classifications retenues avec une confiance suffisante.
+Elle est mise à jour au fil de la classification. Quand un expéditeur a au moins
+SENDER_FAST_PATH_MIN_COUNT classifications et qu'une catégorie en représente
+au moins SENDER_FAST_PATH_MIN_AGREEMENT, ses nouveaux emails sont classifiés
+directement depuis ces statistiques, sans LLM.
+
+Seules les classifications des règles et du LLM sont comptées : les
+résultats du cache, des plus proches voisins et du chemin rapide dérivent de
+classifications déjà comptées et renforceraient l'historique par lui-même.
+
+Une reclassification par l'utilisateur efface les statistiques de
+l'expéditeur : il repasse par le LLM jusqu'à ce qu'un historique cohérent
+se reconstitue.
+
+La réputation est propre à chaque utilisateur (EmailAccount.user_id) : les
+classifications et corrections d'un utilisateur ne changent pas le
+traitement des emails des autres. Les fonctions reçoivent l'id du compte
+de l'email ; les comptes d'un même utilisateur partagent son historique.
+"""
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.config import settings
+from api.models import EmailAccount, EmailCategory, SenderCategoryStat
+from worker.classifiers.cache import extract_sender_address
+
+logger = logging.getLogger(__name__)
+
+# Origine d'une classification (clé 'source')
+RULE_SOURCE = 'rule'
+LLM_SOURCE = 'llm'
+SENDER_STATS_SOURCE = 'sender_stats'
+USER_SOURCE = 'user'
+
+# Observations indépendantes, seules comptées dans les statistiques
+COUNTED_SOURCES = (RULE_SOURCE, LLM_SOURCE)
+
+
+async def load_sender_classifications(
+    db: AsyncSession,
+    senders: Iterable[Tuple[int, str]]
+) -> Dict[Tuple[int, str], Dict]:
+    """
+    Charger les classifications du chemin rapide pour un ensemble d'expéditeurs.
+
+    Args:
+        db: Session de base de données
+        senders: Couples (id du compte, champ From brut normalisé ici)
+
+    Returns:
+        Dict {(id du compte, adresse): classification} pour les seuls
+        expéditeurs dont l'historique chez le propriétaire du compte est
+        assez long et cohérent
+    """
+    pairs = {(account_id, extract_sender_address(sender)) for account_id, sender in senders if sender}
+    pairs = {(account_id, address) for account_id, address in pairs if address}
+    if not pairs:
+        return {}
+
+    # Statistiques du propriétaire de chaque compte
+    result = await db.execute(
+        select(SenderCategoryStat, EmailAccount.id)
+        .join(EmailAccount, EmailAccount.user_id == SenderCategoryStat.user_id)
+        .where(
+            EmailAccount.id.in_({account_id for account_id, _ in pairs}),
+            SenderCategoryStat.sender.in_({address for _, address in pairs})
+        )
+    )
+
+    history: Dict[Tuple[int, str], list] = {}
+    for stat, account_id in result.all():
+        if (account_id, stat.sender) in pairs:
+            history.setdefault((account_id, stat.sender), []).append(stat)
+
+    classifications = {}
+    for (account_id, address), stats in history.items():
+        total = sum(stat.count for stat in stats)
+        best = max(stats, key=lambda stat: stat.count)
+        agreement = best.count / total if total else 0
+        if best.count < settings.SENDER_FAST_PATH_MIN_COUNT or agreement < settings.SENDER_FAST_PATH_MIN_AGREEMENT:
+            continue
+
+        average_confidence = best.confidence_sum / best.count
+        classifications[(account_id, address)] = {
+            'category': best.category,
+            'confidence': int(average_confidence * agreement),
+            'reason': f"Sender history: {best.count}/{total} previous emails from {address} "
+                      f"classified as {best.category.value}",
+            'source': SENDER_STATS_SOURCE
+        }
+
+    return classifications
+
+
+def sender_classification(
+    classifications: Dict[Tuple[int, str], Dict],
+    account_id: int,
+    sender: str
+) -> Optional[Dict]:
+    """
+    Classification du chemin rapide pour un email.
+
+    Args:
+        classifications: Résultat de load_sender_classifications()
+        account_id: Compte de l'email
+        sender: Champ From brut de l'email
+
+    Returns:
+        Classification ou None
+    """
+    return classifications.get((account_id, extract_sender_address(sender)))
+
+
+def count_classification(
+    counts: Dict[Tuple[int, str, EmailCategory], List[int]],
+    account_id: int,
+    sender: str,
+    classification: Dict
+) -> None:
+    """
+    Ajouter une classification aux compteurs à enregistrer (si elle est fiable
+    et vient d'une règle ou du LLM).
+
+    Args:
+        counts: Dict {(id du compte, adresse, catégorie): [nombre, somme des confiances]}
+        account_id: Compte de l'email
+        sender: Champ From brut
+        classification: Résultat de la classification
+    """
+    address = extract_sender_address(sender)
+    category = classification['category']
+    confidence = classification['confidence'] or 0
+    if (
+        not address
+        or category == EmailCategory.UNKNOWN
+        or confidence < settings.SENDER_STATS_MIN_CONFIDENCE
+        or classification.get('source') not in COUNTED_SOURCES
+    ):
+        return
+
+    totals = counts.setdefault((account_id, address, category), [0, 0])
+    totals[0] += 1
+    totals[1] += confidence
+
+
+async def record_sender_classifications(
+    db: AsyncSession,
+    counts: Dict[Tuple[int, str, EmailCategory], List[int]]
+) -> None:
+    """
+    Enregistrer les compteurs accumulés (INSERT ou incrément) pour le
+    propriétaire de chaque compte.
+
+    Args:
+        db: Session de base de données (la transaction reste à la charge de l'appelant)
+        counts: Compteurs remplis par count_classification()
+    """
+    if not counts:
+        return
+
+    result = await db.execute(
+        select(EmailAccount.id, EmailAccount.user_id)
+        .where(EmailAccount.id.in_({account_id for account_id, _, _ in counts}))
+    )
+    owners = dict(result.all())
+
+    # Les comptes d'un même utilisateur alimentent le même historique
+    user_counts: Dict[Tuple[int, str, EmailCategory], List[int]] = {}
+    for (account_id, address, category), (count, confidence_sum) in counts.items():
+        user_id = owners.get(account_id)
+        if user_id is None:
+            continue
+        totals = user_counts.setdefault((user_id, address, category), [0, 0])
+        totals[0] += count
+        totals[1] += confidence_sum
+
+    now = datetime.utcnow()
+
+    # Ordre stable des upserts (évite les interblocages entre workers)
+    for (user_id, address, category), (count, confidence_sum) in sorted(user_counts.items(), key=_sort_key):
+        stmt = pg_insert(SenderCategoryStat).values(
+            user_id=user_id,
+            sender=address,
+            category=category,
+            count=count,
+            confidence_sum=confidence_sum,
+            last_seen=now,
+            created_at=now,
+            updated_at=now
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_sender_category_stats_user_sender_category",
+            set_={
+                'count': SenderCategoryStat.count + count,
+                'confidence_sum': SenderCategoryStat.confidence_sum + confidence_sum,
+                'last_seen': now,
+                'updated_at': now
+            }
+        )
+        await db.execute(stmt)
+
+
+async def invalidate_sender(db: AsyncSession, account_id: int, sender: str) -> None:
+    """
+    Effacer l'historique d'un expéditeur chez le propriétaire d'un compte
+    (reclassification par l'utilisateur).
+
+    Args:
+        db: Session de base de données (la transaction reste à la charge de l'appelant)
+        account_id: Compte de l'email reclassifié
+        sender: Champ From brut
+    """
+    address = extract_sender_address(sender)
+    if address:
+        owner = select(EmailAccount.user_id).where(EmailAccount.id == account_id).scalar_subquery()
+        await db.execute(
+            delete(SenderCategoryStat).where(
+                SenderCategoryStat.user_id == owner,
+                SenderCategoryStat.sender == address
+            )
+        )
+        logger.info(f"Sender statistics invalidated for {address} (account {account_id})")
+
+
+def _sort_key(item):
+    (user_id, address, category), _ = item
+    return user_id, address, category.value
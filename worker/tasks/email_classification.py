@@ -74,6 +74,11 @@ def classify_single_email(email_id: int):
         from api.database import get_db_context
         from api.models import Email, ProcessingStatus
         from worker.classifiers.ollama_classifier import classifier
+        from worker.classifiers.sender_stats import (
+            RULE_SOURCE, count_classification, load_sender_classifications,
+            record_sender_classifications, sender_classification
+        )
+        from shared.config import settings
         from worker.rules import rules_parser
         from worker.actions import apply_classification_action
         from sqlalchemy import select
@@ -106,14 +111,22 @@ async def _classify():
                     confidence = 95
                     reason = f"Matched rule: {rule.name}"
                     rule_name = rule.name
+                    result = {'category': category, 'confidence': confidence, 'source': RULE_SOURCE}
                 else:
-                    # Use LLM
-                    result = await classifier.classify_email(
-                        subject=email.subject,
-                        sender=email.sender,
-                        body_preview=email.body_preview or "",
-                        has_attachments=email.has_attachments
-                    )
+                    # Sender history fast path, then LLM
+                    result = None
+                    if settings.SENDER_FAST_PATH_ENABLED:
+                        result = sender_classification(
+                            await load_sender_classifications(db, [(email.account_id, email.sender)]),
+                            email.account_id, email.sender
+                        )
+                    if result is None:
+                        result = await classifier.classify_email(
+                            subject=email.subject,
+                            sender=email.sender,
+                            body_preview=email.body_preview or "",
+                            has_attachments=email.has_attachments
+                        )
 
                     category = result['category']
                     confidence = result['confidence']
@@ -124,8 +137,13 @@ async def _classify():
                 email.category = category
                 email.classification_confidence = confidence
                 email.classification_reason = reason
+                email.classification_source = result.get('source')
                 email.status = ProcessingStatus.PROCESSING
 
+                sender_counts = {}
+                count_classification(sender_counts, email.account_id, email.sender, result)
+                await record_sender_classifications(db, sender_counts)
+
                 await db.commit()
 
                 # Apply actions
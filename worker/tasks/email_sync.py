@@ -6,17 +6,24 @@
 import asyncio
 import json
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from datetime import datetime
 from typing import Optional, Dict, Any
 import datetime as dt_module
 
 from api.database import get_db_context
-from api.models import EmailAccount, Email, AccountType, ProcessingStatus
+from api.models import EmailAccount, Email, SyncState, AccountType, ProcessingStatus
+from shared.config import settings
 from shared.security import decrypt_password
-from shared.integrations import ImapConnector, GmailConnector, MicrosoftConnector
+from shared.integrations import (
+    ImapConnector, GmailConnector, MicrosoftConnector, ConnectorPoolTimeout, get_connector_pool
+)
 
 logger = logging.getLogger(__name__)
 
+# Taille max d'un INSERT multi-lignes (asyncpg limite une requête à 32767 paramètres)
+INSERT_CHUNK_SIZE = 1000
+
 
 def run_async(coro):
     """
@@ -85,47 +92,182 @@ async def _get_account_details(account_id: int):
             "last_sync": account.last_sync
         }
 
-async def _save_emails(account_id: int, emails_data: list):
+async def _get_sync_state(account_id: int, folder: str) -> Optional[Dict[str, Any]]:
+    """
+    Récupérer le curseur de synchronisation d'un dossier.
+
+    Args:
+        account_id: ID du compte email
+        folder: Nom du dossier
+
+    Returns:
+        État du connecteur, ou None si jamais synchronisé
+    """
+    async with get_db_context() as db:
+        query = select(SyncState).where(
+            SyncState.account_id == account_id,
+            SyncState.folder == folder
+        )
+        result = await db.execute(query)
+        sync_state = result.scalar_one_or_none()
+        if not sync_state or not sync_state.state:
+            return None
+        return dict(sync_state.state)
+
+
+async def _get_backfill_state(account_id: int, folder: str) -> Dict[str, Any]:
+    """
+    Récupérer la progression du backfill d'un dossier.
+
+    Args:
+        account_id: ID du compte email
+        folder: Nom du dossier
+
+    Returns:
+        Dict {"cursor", "completed", "pages", "imported"} (vide si jamais lancé)
+    """
+    async with get_db_context() as db:
+        query = select(SyncState).where(
+            SyncState.account_id == account_id,
+            SyncState.folder == folder
+        )
+        result = await db.execute(query)
+        sync_state = result.scalar_one_or_none()
+        if not sync_state or not sync_state.backfill_state:
+            return {}
+        return dict(sync_state.backfill_state)
+
+
+async def _upsert_sync_state(db, account_id: int, folder: str, **values) -> None:
+    """
+    Enregistrer le curseur de synchronisation d'un dossier (INSERT ou UPDATE).
+
+    Args:
+        db: Session de base de données (la transaction reste à la charge de l'appelant)
+        account_id: ID du compte email
+        folder: Nom du dossier
+        **values: Colonnes à mettre à jour (state et/ou backfill_state)
+    """
+    now = datetime.utcnow()
+    stmt = pg_insert(SyncState).values(
+        account_id=account_id,
+        folder=folder,
+        created_at=now,
+        updated_at=now,
+        **values
+    ).on_conflict_do_update(
+        constraint="uq_sync_states_account_folder",
+        set_={**values, "updated_at": now}
+    )
+    await db.execute(stmt)
+
+
+def _provider_id(email_data: Dict[str, Any]) -> Optional[str]:
+    """
+    Extraire l'identifiant du message côté provider (pour les actions).
+
+    Args:
+        email_data: Dict retourné par un connecteur
+
+    Returns:
+        UID IMAP, ID Gmail ou ID Graph (en str), None si absent
+    """
+    for key in ("imap_uid", "gmail_id", "microsoft_id"):
+        if email_data.get(key) is not None:
+            return str(email_data[key])
+    return None
+
+
+async def _insert_emails(
+    db,
+    account_id: int,
+    emails_data: list,
+    status: ProcessingStatus = ProcessingStatus.PENDING
+) -> int:
+    """
+    Insérer en masse les emails d'un lot, en ignorant ceux déjà présents.
+
+    Utilise INSERT ... ON CONFLICT (message_id) DO NOTHING RETURNING id :
+    une requête par tranche de INSERT_CHUNK_SIZE emails au lieu d'un SELECT
+    par message. Le nombre d'ids retournés est exactement le nombre d'emails
+    insérés.
+
+    Args:
+        db: Session de base de données (la transaction reste à la charge de l'appelant)
+        account_id: ID du compte email
+        emails_data: Liste de dicts avec les données des emails
+        status: Statut initial (PENDING : classification et actions à venir)
+
+    Returns:
+        Nombre d'emails réellement insérés
+    """
+    rows = []
+    seen = set()
+    for data in emails_data:
+        # Dédupliquer à l'intérieur du lot (même Message-ID dans plusieurs dossiers)
+        if data["message_id"] in seen:
+            continue
+        seen.add(data["message_id"])
+
+        # Convert timezone-aware dates to naive UTC
+        rows.append({
+            "account_id": account_id,
+            "message_id": data["message_id"],
+            "provider_id": _provider_id(data),
+            "subject": data["subject"],
+            "sender": data["sender"],
+            "date_received": normalize_datetime(data["date_received"]),
+            "body_preview": data["body"][:500] if data["body"] else "",
+            "has_attachments": data["has_attachments"],
+            "attachment_count": data["attachment_count"],
+            "status": status
+        })
+
+    inserted = 0
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        stmt = (
+            pg_insert(Email)
+            .values(rows[start:start + INSERT_CHUNK_SIZE])
+            .on_conflict_do_nothing(index_elements=[Email.message_id])
+            .returning(Email.id)
+        )
+        result = await db.execute(stmt)
+        inserted += len(result.scalars().all())
+
+    return inserted
+
+
+async def _save_emails(
+    account_id: int,
+    emails_data: list,
+    folder: str = "INBOX",
+    sync_state: Optional[Dict[str, Any]] = None
+):
     """
     Sauvegarder les emails en base de données.
 
+    L'insertion, le curseur de synchronisation et la mise à jour du compte
+    (last_sync, total_emails_processed) sont faits dans la même transaction :
+    le curseur n'avance jamais sans que les emails correspondants soient
+    enregistrés.
+
     Args:
         account_id: ID du compte email
         emails_data: Liste de dicts avec les données des emails
+        folder: Dossier synchronisé
+        sync_state: Nouveau curseur retourné par le connecteur (optionnel)
 
     Returns:
         Nombre d'emails sauvegardés
     """
-    if not emails_data:
+    if not emails_data and not sync_state:
         return 0
 
-    count = 0
     async with get_db_context() as db:
-        for data in emails_data:
-            # Vérifier si l'email existe déjà
-            existing = await db.execute(
-                select(Email).where(
-                    Email.account_id == account_id,
-                    Email.message_id == data["message_id"]
-                )
-            )
-            if existing.scalar_one_or_none():
-                continue
-
-            # Créer l'email (convert timezone-aware dates to naive UTC)
-            email = Email(
-                account_id=account_id,
-                message_id=data["message_id"],
-                subject=data["subject"],
-                sender=data["sender"],
-                date_received=normalize_datetime(data["date_received"]),
-                body_preview=data["body"][:500] if data["body"] else "",
-                has_attachments=data["has_attachments"],
-                attachment_count=data["attachment_count"],
-                status=ProcessingStatus.PENDING
-            )
-            db.add(email)
-            count += 1
+        count = await _insert_emails(db, account_id, emails_data)
+
+        if sync_state:
+            await _upsert_sync_state(db, account_id, folder, state=sync_state)
 
         # Update account last_sync et clear error
         account = await db.get(EmailAccount, account_id)
@@ -138,6 +280,46 @@ async def _save_emails(account_id: int, emails_data: list):
     return count
 
 
+async def _save_backfill_page(
+    account_id: int,
+    folder: str,
+    emails_data: list,
+    backfill_state: Dict[str, Any]
+) -> int:
+    """
+    Sauvegarder une page de backfill et sa progression dans la même transaction.
+
+    Contrairement à _save_emails, last_sync n'est pas modifié : le backfill
+    ne doit pas interférer avec le polling. Les emails sont insérés en
+    ARCHIVED et non PENDING : la classification périodique ne les reprend
+    pas (pas d'appel LLM ni d'action sur l'historique).
+
+    Args:
+        account_id: ID du compte email
+        folder: Dossier parcouru
+        emails_data: Emails de la page
+        backfill_state: Progression à enregistrer (cursor, completed, pages)
+
+    Returns:
+        Nombre d'emails sauvegardés
+    """
+    async with get_db_context() as db:
+        count = await _insert_emails(db, account_id, emails_data, status=ProcessingStatus.ARCHIVED)
+
+        backfill_state = {
+            **backfill_state,
+            "imported": backfill_state.get("imported", 0) + count
+        }
+        await _upsert_sync_state(db, account_id, folder, backfill_state=backfill_state)
+
+        account = await db.get(EmailAccount, account_id)
+        if account:
+            account.total_emails_processed = (account.total_emails_processed or 0) + count
+
+        await db.commit()
+    return count
+
+
 async def _update_account_error(account_id: int, error_message: str) -> None:
     """
     Enregistrer une erreur de synchronisation dans le compte.
@@ -274,16 +456,23 @@ async def _update_credentials_if_refreshed(account_id: int, connector) -> None:
     if hasattr(connector, 'get_refreshed_credentials'):
         new_creds = connector.get_refreshed_credentials()
         if new_creds:
-            logger.info(f"Updating refreshed credentials for account {account_id}")
-
-            from shared.security import encrypt_credentials
-            encrypted = encrypt_credentials(new_creds)
+            from shared.security import decrypt_credentials, encrypt_credentials
 
             async with get_db_context() as db:
                 account = await db.get(EmailAccount, account_id)
                 if account:
-                    account.encrypted_credentials = encrypted
+                    # Les connecteurs renvoient toujours leurs credentials :
+                    # on n'écrit (et ne change la version vue par le pool) que
+                    # si le token a réellement été refresh
+                    if decrypt_credentials(account.encrypted_credentials) == new_creds:
+                        return
+
+                    logger.info(f"Updating refreshed credentials for account {account_id}")
+                    account.encrypted_credentials = encrypt_credentials(new_creds)
                     await db.commit()
+
+                    # Le connecteur courant détient déjà le nouveau token
+                    get_connector_pool().set_version(account_id, account.encrypted_credentials)
                     logger.info("Credentials updated successfully")
 
 
@@ -303,9 +492,12 @@ def sync_account(account_id: int):
             logger.error(f"Account {account_id} not found")
             return {'status': 'error', 'message': 'Account not found'}
 
-        # 2. Créer le connecteur approprié
+        # 2. Emprunter un connecteur au pool du worker (créé si besoin)
+        pool = get_connector_pool()
         try:
-            connector = _get_connector(account)
+            connector = pool.acquire(
+                account_id, lambda: _get_connector(account), version=account['encrypted_credentials']
+            )
         except ValueError as e:
             logger.error(f"Failed to create connector for account {account_id}: {e}")
             return {'status': 'error', 'message': str(e)}
@@ -313,18 +505,35 @@ def sync_account(account_id: int):
             logger.warning(f"Account type not yet supported: {e}")
             return {'status': 'skipped', 'message': str(e)}
 
-        # 3. Fetch emails
-        emails = connector.fetch_emails(limit=50, since=account['last_sync'])
-        logger.info(f"Fetched {len(emails)} emails for account {account_id}")
-
-        # 4. Sauvegarder les emails en DB
-        saved_count = run_async(_save_emails(account_id, emails))
+        # 3-4. Fetch par lots depuis le dernier curseur, chaque lot est
+        # sauvegardé (avec son curseur) avant de fetcher le suivant
+        folder = "INBOX"
+        fetched = 0
+        saved_count = 0
+        try:
+            sync_state = run_async(_get_sync_state(account_id, folder))
+            for emails, chunk_state in connector.iter_incremental(
+                folder=folder,
+                limit=settings.SYNC_MAX_EMAILS_PER_POLL,
+                since=account['last_sync'],
+                sync_state=sync_state,
+                chunk_size=settings.SYNC_FETCH_CHUNK_SIZE
+            ):
+                fetched += len(emails)
+                saved_count += run_async(
+                    _save_emails(account_id, emails, folder=folder, sync_state=chunk_state)
+                )
+            logger.info(f"Fetched {fetched} emails for account {account_id}")
 
-        # 5. Mettre à jour les credentials si refresh (OAuth2)
-        run_async(_update_credentials_if_refreshed(account_id, connector))
+            # 5. Mettre à jour les credentials si refresh (OAuth2)
+            run_async(_update_credentials_if_refreshed(account_id, connector))
+        except Exception:
+            # Connexion dans un état inconnu : on la ferme
+            pool.release(connector, discard=True)
+            raise
 
-        # 6. Cleanup
-        connector.disconnect()
+        # 6. Rendre le connecteur au pool
+        pool.release(connector)
 
         # 7. Trigger classification for new emails if any
         if saved_count > 0:
@@ -336,7 +545,7 @@ def sync_account(account_id: int):
         return {
             'account_id': account_id,
             'new_emails': saved_count,
-            'fetched': len(emails),
+            'fetched': fetched,
             'status': 'completed'
         }
 
@@ -347,3 +556,105 @@ def sync_account(account_id: int):
         run_async(_update_account_error(account_id, str(e)))
 
         return {'status': 'error', 'error': str(e)}
+
+
+@shared_task(
+    name='worker.tasks.email_sync.backfill_account',
+    rate_limit=settings.BACKFILL_RATE_LIMIT
+)
+def backfill_account(account_id: int, folder: str = "INBOX", restart: bool = False):
+    """
+    Importer l'historique complet d'un compte, une page par exécution.
+
+    Chaque exécution fetch une page (UIDs pour IMAP, pageToken pour Gmail,
+    @odata.nextLink pour Graph), la sauvegarde avec son curseur, puis se
+    re-planifie après BACKFILL_PAGE_DELAY secondes. Un worker tué reprend
+    donc à la dernière page enregistrée. Le débit est limité séparément du
+    polling (BACKFILL_RATE_LIMIT, BACKFILL_PAGE_DELAY).
+
+    L'historique importé est enregistré en ARCHIVED : il est consultable
+    mais n'est ni classifié ni soumis aux actions (déplacement, suppression
+    des spams), contrairement aux emails du polling. Si le connecteur du
+    compte est occupé (synchro en cours), la page est re-planifiée sans
+    marquer le compte en erreur.
+
+    Args:
+        account_id: ID du compte
+        folder: Dossier à importer
+        restart: Repartir du début même si un backfill est terminé
+    """
+    logger.info(f"Backfilling account {account_id} ({folder})")
+
+    try:
+        account = run_async(_get_account_details(account_id))
+        if not account:
+            logger.error(f"Account {account_id} not found")
+            return {'status': 'error', 'message': 'Account not found'}
+
+        backfill = {} if restart else run_async(_get_backfill_state(account_id, folder))
+        if backfill.get('completed'):
+            logger.info(f"Backfill of account {account_id} already completed")
+            return {'status': 'skipped', 'message': 'Backfill already completed'}
+
+        pool = get_connector_pool()
+        try:
+            connector = pool.acquire(
+                account_id, lambda: _get_connector(account), version=account['encrypted_credentials']
+            )
+        except ValueError as e:
+            logger.error(f"Failed to create connector for account {account_id}: {e}")
+            return {'status': 'error', 'message': str(e)}
+        except NotImplementedError as e:
+            logger.warning(f"Account type not yet supported: {e}")
+            return {'status': 'skipped', 'message': str(e)}
+        except ConnectorPoolTimeout as e:
+            logger.info(f"Connector busy for account {account_id}, backfill page postponed: {e}")
+            backfill_account.apply_async(
+                args=[account_id, folder, restart],
+                countdown=settings.BACKFILL_PAGE_DELAY
+            )
+            return {'status': 'postponed', 'message': str(e)}
+
+        try:
+            emails, next_cursor = connector.fetch_backfill_page(
+                folder=folder,
+                cursor=backfill.get('cursor'),
+                page_size=settings.BACKFILL_PAGE_SIZE
+            )
+            run_async(_update_credentials_if_refreshed(account_id, connector))
+        except NotImplementedError as e:
+            pool.release(connector)
+            logger.warning(f"Backfill not supported: {e}")
+            return {'status': 'skipped', 'message': str(e)}
+        except Exception:
+            pool.release(connector, discard=True)
+            raise
+        pool.release(connector)
+
+        saved_count = run_async(_save_backfill_page(account_id, folder, emails, {
+            'cursor': next_cursor,
+            'completed': next_cursor is None,
+            'pages': backfill.get('pages', 0) + 1,
+            'imported': backfill.get('imported', 0)
+        }))
+
+        if next_cursor:
+            backfill_account.apply_async(
+                args=[account_id, folder],
+                countdown=settings.BACKFILL_PAGE_DELAY
+            )
+        else:
+            logger.info(f"Backfill of account {account_id} ({folder}) completed")
+
+        return {
+            'account_id': account_id,
+            'new_emails': saved_count,
+            'fetched': len(emails),
+            'completed': next_cursor is None,
+            'status': 'completed'
+        }
+
+    except Exception as e:
+        logger.error(f"Error backfilling account {account_id}: {e}", exc_info=True)
+        run_async(_update_account_error(account_id, str(e)))
+        return {'status': 'error', 'error': str(e)}